@@ -0,0 +1,12 @@
+"""
+This package contains the benchmark suite for the hot paths of the cli. Unlike the tests, which only use tiny fixtures,
+the benchmarks build synthetic environments with large inventories (10^3 to 10^6 rewards and packs) in a sqlite
+database and time the commands against them. The results can be saved as a baseline file and later runs are compared
+against it to catch performance regressions.
+
+Run the benchmarks with "make benchmark" or "python -m benchmarks.run --help" from the root of the repository.
+
+CHANGELOG
+
+Added 17.10.2026
+"""
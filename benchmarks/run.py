@@ -0,0 +1,320 @@
+"""
+This module runs the benchmark suite. For every size, it builds a synthetic environment (see "benchmarks.world") and
+times the following benchmarks:
+
+- cold_start: "inventory" in a new python process, including all the imports and the initialization
+- inventory: "inventory" within the already warm process
+- inventory_items: "inventory --items", which streams every single reward
+- packs_open_all: "packs open --all" for all the packs of the benchmark user
+- rewards_use_all: "rewards use --all" for half of the rewards of the benchmark user
+- rewards_list: "rewards list" on the catalog of rewards
+- update: "update" with the mock backend, which grants gold to all the users
+
+Every benchmark is run multiple times and the median is reported. The results can be saved as the baseline file and
+compared against it, in which case the exit code is 1, if any benchmark got slower than the tolerance allows.
+
+CHANGELOG
+
+Added 17.10.2026
+"""
+# standard library
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import tempfile
+import datetime
+import statistics
+import contextlib
+import subprocess
+
+from typing import Callable, Dict, List, Optional
+
+# third party
+import click
+
+# local
+from rewardifycli.main import invoke
+
+from benchmarks.world import World, REWARD_NAME, PACK_NAME
+
+# The root folder of the repository, from which the cold start process imports the cli
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_BASELINE_PATH = os.path.join(ROOT_PATH, 'benchmarks', 'baseline.json')
+
+# The cold start process has to use the config folder of the benchmark environment instead of the installed one
+COLD_START_CODE = (
+    'import sys\n'
+    'from rewardify.env import EnvironmentConfig\n'
+    'EnvironmentConfig.instance().set_folder_path(sys.argv[1])\n'
+    'from rewardifycli.main import invoke\n'
+    'sys.exit(invoke(sys.argv[2:]))\n'
+)
+
+
+# ##############
+# THE BENCHMARKS
+# ##############
+
+
+def run_command(world: World, args: List[str]) -> Callable[[], None]:
+    """
+    Returns a function, which executes the command with the given arguments for the benchmark user within the current
+    process. The output is discarded.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param world:
+    :param args:
+    :return:
+    """
+    def run():
+        with open(os.devnull, mode='w') as devnull, contextlib.redirect_stdout(devnull):
+            exit_code = invoke(['--session', world.token] + args)
+        if exit_code != 0:
+            raise click.ClickException('The command "{}" failed with exit code {}'.format(' '.join(args), exit_code))
+
+    return run
+
+
+def run_cold_start(world: World, args: List[str]) -> Callable[[], None]:
+    """
+    Returns a function, which executes the command with the given arguments for the benchmark user in a new python
+    process.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param world:
+    :param args:
+    :return:
+    """
+    def run():
+        command = [sys.executable, '-c', COLD_START_CODE, world.folder_path, '--session', world.token] + args
+        subprocess.run(command, cwd=ROOT_PATH, stdout=subprocess.DEVNULL, check=True)
+
+    return run
+
+
+def get_benchmarks(world: World) -> Dict[str, Dict]:
+    """
+    Returns a dict, whose keys are the names of the benchmarks and the values dicts with the function to be timed
+    ("run") and whether the benchmark changes the database ("restore"), in which case the database has to be restored
+    before every single run.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param world:
+    :return:
+    """
+    return {
+        'cold_start':       {'run': run_cold_start(world, ['inventory']), 'restore': False},
+        'inventory':        {'run': run_command(world, ['inventory']), 'restore': False},
+        'inventory_items':  {'run': run_command(world, ['inventory', '--items']), 'restore': False},
+        'packs_open_all':   {'run': run_command(world, ['packs', 'open', '--all', PACK_NAME]), 'restore': True},
+        'rewards_use_all':  {'run': run_command(world, ['rewards', 'use', '--all', REWARD_NAME]), 'restore': True},
+        'rewards_list':     {'run': run_command(world, ['rewards', 'list', '--per-page', '1000']), 'restore': False},
+        'update':           {'run': run_command(world, ['update']), 'restore': True}
+    }
+
+
+def measure(world: World, benchmark: Dict, repeat: int) -> Dict:
+    """
+    Runs the given benchmark the given number of times and returns a dict with the "median", the "min" and the "max"
+    time in seconds.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param world:
+    :param benchmark:
+    :param repeat:
+    :return:
+    """
+    durations = []
+    world.restore()
+    for _ in range(repeat):
+        if benchmark['restore']:
+            world.restore()
+
+        start = time.perf_counter()
+        benchmark['run']()
+        durations.append(time.perf_counter() - start)
+
+    return {
+        'median':   statistics.median(durations),
+        'min':      min(durations),
+        'max':      max(durations)
+    }
+
+
+def run_benchmarks(sizes: List[int], repeat: int, users: int, catalog: int, names: Optional[List[str]] = None) -> Dict:
+    """
+    Runs all the benchmarks (or only those with the given names) for all the given sizes and returns the dict with the
+    results. The keys of its "results" dict are the names of the benchmarks with the size in brackets.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param sizes:
+    :param repeat:
+    :param users:
+    :param catalog:
+    :param names:
+    :return:
+    """
+    results = {}
+    for size in sizes:
+        folder_path = tempfile.mkdtemp(prefix='rewardify-benchmark-')
+        try:
+            world = World(folder_path, size, users=users, catalog=catalog)
+
+            start = time.perf_counter()
+            world.build()
+            click.echo('Built the environment with {} rewards and packs in {:.2f} s'.format(
+                size,
+                time.perf_counter() - start
+            ), err=True)
+
+            for name, benchmark in get_benchmarks(world).items():
+                if names and name not in names:
+                    continue
+
+                key = '{}[{}]'.format(name, size)
+                results[key] = measure(world, benchmark, repeat)
+                click.echo('{:<32} {:>10.2f} ms'.format(key, 1000 * results[key]['median']), err=True)
+        finally:
+            shutil.rmtree(folder_path, ignore_errors=True)
+
+    return {
+        'meta': {
+            'date':         datetime.datetime.now().isoformat(),
+            'python':       platform.python_version(),
+            'platform':     platform.platform(),
+            'repeat':       repeat,
+            'users':        users,
+            'catalog':      catalog
+        },
+        'results': results
+    }
+
+
+# ##################
+# BASELINE COMPARING
+# ##################
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[Dict]:
+    """
+    Compares the medians of the given results with the ones of the given baseline and returns a list with a dict for
+    every benchmark, which is part of both. The dicts contain the "name", the "baseline" and "current" median, the
+    "ratio" between them and whether the benchmark has "regressed" by more than the given relative tolerance.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param results:
+    :param baseline:
+    :param tolerance: For example 0.25 means, that a benchmark may take up to 25 percent longer than the baseline
+    :return:
+    """
+    comparisons = []
+    for name, result in results['results'].items():
+        if name not in baseline['results']:
+            continue
+
+        baseline_median = baseline['results'][name]['median']
+        ratio = result['median'] / baseline_median if baseline_median > 0 else 1.0
+        comparisons.append({
+            'name':         name,
+            'baseline':     baseline_median,
+            'current':      result['median'],
+            'ratio':        ratio,
+            'regressed':    ratio > 1 + tolerance
+        })
+
+    return comparisons
+
+
+def format_comparisons(comparisons: List[Dict]) -> str:
+    lines = ['{:<32} {:>12} {:>12} {:>8}'.format('benchmark', 'baseline', 'current', 'ratio')]
+    for comparison in comparisons:
+        lines.append('{:<32} {:>9.2f} ms {:>9.2f} ms {:>7.2f}x{}'.format(
+            comparison['name'],
+            1000 * comparison['baseline'],
+            1000 * comparison['current'],
+            comparison['ratio'],
+            '  REGRESSED' if comparison['regressed'] else ''
+        ))
+
+    return '\n'.join(lines)
+
+
+# ###########
+# THE COMMAND
+# ###########
+
+
+@click.command('benchmark')
+@click.option('-s', '--sizes', 'sizes', default='1000,10000,100000',
+              help='The comma separated numbers of rewards and packs of the benchmark user, for example "1000000"')
+@click.option('-r', '--repeat', 'repeat', type=click.IntRange(min=1), default=3,
+              help='The number of runs of every benchmark, of which the median is reported')
+@click.option('--users', 'users', type=click.IntRange(min=0), default=1000,
+              help='The number of additional users, which are granted gold by the update')
+@click.option('--catalog', 'catalog', type=click.IntRange(min=1), default=1000,
+              help='The number of rewards within the config')
+@click.option('-b', '--benchmark', 'names', multiple=True,
+              help='Only run the benchmark with the given name. Can be given multiple times')
+@click.option('-o', '--output', 'output_path', type=click.Path(dir_okay=False), default=None,
+              help='Write the results into the given JSON file')
+@click.option('--save', 'save', is_flag=True,
+              help='Save the results as the new baseline')
+@click.option('--compare', 'compare_baseline', is_flag=True,
+              help='Compare the results with the baseline and fail, if a benchmark has regressed')
+@click.option('--baseline', 'baseline_path', type=click.Path(dir_okay=False), default=DEFAULT_BASELINE_PATH,
+              help='The path of the baseline file')
+@click.option('--tolerance', 'tolerance', type=click.FloatRange(min=0), default=0.25,
+              help='The relative slow down, which is still accepted when comparing with the baseline')
+def benchmark(sizes, repeat, users, catalog, names, output_path, save, compare_baseline, baseline_path, tolerance):
+    sizes = [int(size) for size in sizes.split(',') if size.strip()]
+    results = run_benchmarks(sizes, repeat, users, catalog, names=list(names))
+
+    content = json.dumps(results, indent=4, sort_keys=True)
+    if output_path is not None:
+        with open(output_path, mode='w') as file:
+            file.write(content)
+
+    if compare_baseline:
+        if not os.path.exists(baseline_path):
+            raise click.ClickException('There is no baseline at "{}". Create it with "--save"'.format(baseline_path))
+
+        with open(baseline_path, mode='r') as file:
+            baseline = json.load(file)
+
+        comparisons = compare(results, baseline, tolerance)
+        click.echo(format_comparisons(comparisons))
+        if any(comparison['regressed'] for comparison in comparisons):
+            raise click.ClickException('Some of the benchmarks are more than {:.0%} slower than the baseline'.format(
+                tolerance
+            ))
+
+    if save:
+        with open(baseline_path, mode='w') as file:
+            file.write(content)
+        click.echo('Saved the baseline to "{}"'.format(baseline_path))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,300 @@
+"""
+This module guards the startup time of the cli. For the main "--help" and the "--help" of every command, it runs a new
+python process with "python -X importtime -m rewardifycli.main", parses the import tree from its stderr and checks it
+against the budget file, which is checked into the repository:
+
+- The total import time of the command may not exceed its budget in milliseconds.
+- The set of eagerly imported heavy modules (like "jinja2", "peewee", "numpy" or the backend plugins) may not grow
+  beyond the modules, which are listed for the command. Importing a heavy module within a module, which every command
+  imports (like "rewardifycli.util"), therefore makes the check fail for every command, which did not import it before.
+
+The report lists the total time and the heavy modules of every command together with the modules, which took the most
+time to import themselves, and the chain of imports, which pulled them in.
+
+Run the check with "make startup" or "python -m benchmarks.startup --help" from the root of the repository.
+
+CHANGELOG
+
+Added 17.10.2026
+"""
+# standard library
+import os
+import re
+import sys
+import json
+import math
+import subprocess
+
+from typing import Dict, List, Optional
+
+# third party
+import click
+
+# local
+from rewardifycli.main import COMMANDS
+
+
+# The root folder of the repository, from which the processes import the cli
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_BUDGET_PATH = os.path.join(ROOT_PATH, 'benchmarks', 'startup_budget.json')
+
+# The modules, which take long to import and should only be imported by the commands, which actually need them.
+# The submodules of a heavy module count as the heavy module itself.
+HEAVY_MODULES = ['jinja2', 'peewee', 'numpy', 'pandas', 'rewardify.backends']
+
+# The number of modules listed for every command in the report
+DEFAULT_TOP = 5
+
+# Longer chains of imports are shortened to their first and last modules within the report
+REPORT_CHAIN_LENGTH = 4
+
+# The name of the main group within the budget and the report. The key of its budget is the empty string.
+MAIN_NAME = 'rewardify'
+
+# A line of the output of "-X importtime" looks like this, where the indentation of the name is the depth of the
+# import within the tree: "import time:       550 |      32253 |   click". The times are in microseconds.
+IMPORT_TIME_PATTERN = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)\s*$')
+
+
+# ###########
+# THE IMPORTS
+# ###########
+
+
+def parse_import_times(text: str) -> List[Dict]:
+    """
+    Parses the given stderr of a process, which was run with "-X importtime", and returns a list with a dict for every
+    imported module. The dicts contain the "name" of the module, the "self" and the "cumulative" import time in
+    microseconds and the "chain" of imports from the top level import down to the module itself.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param text:
+    :return:
+    """
+    entries = []
+    for line in text.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match:
+            self_time, cumulative, indentation, name = match.groups()
+            entries.append({
+                'name':         name,
+                'self':         int(self_time),
+                'cumulative':   int(cumulative),
+                'depth':        len(indentation) // 2
+            })
+
+    # A module is reported once all of its own imports are done, so the children come before their parent. In reverse
+    # order, every module comes after its parent, which is the last module one level above.
+    names = []
+    for entry in reversed(entries):
+        del names[entry['depth']:]
+        names.append(entry['name'])
+        entry['chain'] = list(names)
+        del entry['depth']
+
+    return entries
+
+
+def measure_imports(args: List[str]) -> List[Dict]:
+    """
+    Runs the cli with the given arguments in a new python process with "-X importtime" and returns the parsed imports.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :raises click.ClickException: If the command fails
+    :param args:
+    :return:
+    """
+    command = [sys.executable, '-X', 'importtime', '-m', 'rewardifycli.main'] + args
+    process = subprocess.run(command, cwd=ROOT_PATH, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                             universal_newlines=True)
+    if process.returncode != 0:
+        raise click.ClickException('The command "{}" failed with exit code {}:\n{}'.format(
+            ' '.join(args),
+            process.returncode,
+            process.stderr
+        ))
+
+    return parse_import_times(process.stderr)
+
+
+def get_heavy_modules(entries: List[Dict]) -> List[str]:
+    """
+    Returns the sorted list of the heavy modules, which are part of the given imports.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param entries:
+    :return:
+    """
+    return sorted(
+        module for module in HEAVY_MODULES
+        if any(entry['name'] == module or entry['name'].startswith(module + '.') for entry in entries)
+    )
+
+
+# #########
+# THE CHECK
+# #########
+
+
+def get_command_names() -> List[str]:
+    """
+    Returns the names of all the commands, for which the startup is checked. The empty string is the main group.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :return:
+    """
+    return [''] + list(COMMANDS.keys())
+
+
+def check_command(name: str, budget: Optional[Dict], repeat: int, top: int) -> Dict:
+    """
+    Measures the imports of the "--help" of the command with the given name and returns a dict with the "name", the
+    "total" import time in milliseconds (the fastest of the given number of runs), the imported "heavy" modules, the
+    "top" modules with the longest import times of their own and the "violations" of the given budget of the command.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param name: The name of the command or the empty string for the main group
+    :param budget: The dict with the "total_ms" and the allowed "heavy_modules" or None to only measure
+    :param repeat:
+    :param top:
+    :return:
+    """
+    args = ([name] if name else []) + ['--help']
+    # The import time of the fastest run is the one with the least noise from the rest of the system
+    entries = min((measure_imports(args) for _ in range(repeat)),
+                  key=lambda run: sum(entry['self'] for entry in run))
+
+    total = sum(entry['self'] for entry in entries) / 1000
+    heavy = get_heavy_modules(entries)
+
+    violations = []
+    if budget == {}:
+        violations.append('There is no budget for this command')
+    elif budget is not None:
+        if total > budget['total_ms']:
+            violations.append('The total import time of {:.1f} ms exceeds the budget of {} ms'.format(
+                total,
+                budget['total_ms']
+            ))
+        for module in heavy:
+            if module not in budget['heavy_modules']:
+                chain = next(entry['chain'] for entry in reversed(entries)
+                             if entry['name'] == module or entry['name'].startswith(module + '.'))
+                violations.append('The heavy module "{}" is imported eagerly: {}'.format(module, ' > '.join(chain)))
+
+    return {
+        'name':         name or MAIN_NAME,
+        'total':        total,
+        'heavy':        heavy,
+        'top':          sorted(entries, key=lambda entry: entry['self'], reverse=True)[:top],
+        'violations':   violations
+    }
+
+
+def format_report(results: List[Dict]) -> str:
+    lines = ['{:<12} {:>12}   {}'.format('command', 'imports', 'heavy modules')]
+    for result in results:
+        lines.append('{:<12} {:>9.1f} ms   {}{}'.format(
+            result['name'],
+            result['total'],
+            ', '.join(result['heavy']) or '-',
+            '  OVER BUDGET' if result['violations'] else ''
+        ))
+
+    for result in results:
+        lines += ['', '{} --help'.format(result['name'])]
+        lines += ['  ! {}'.format(violation) for violation in result['violations']]
+        for entry in result['top']:
+            chain = entry['chain']
+            if len(chain) > REPORT_CHAIN_LENGTH:
+                chain = chain[:REPORT_CHAIN_LENGTH // 2] + ['...'] + chain[-REPORT_CHAIN_LENGTH // 2:]
+            lines.append('  {:>9.1f} ms  {}'.format(entry['self'] / 1000, ' > '.join(chain)))
+
+    return '\n'.join(lines)
+
+
+def create_budget(results: List[Dict], headroom: float) -> Dict:
+    """
+    Returns the budget for the given results. The total import time of every command is multiplied by the given
+    headroom and rounded up to the next 50 ms, so that the budget is not exceeded by the noise of a single run.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param results:
+    :param headroom:
+    :return:
+    """
+    return {
+        'heavy_modules': HEAVY_MODULES,
+        'commands': {
+            ('' if result['name'] == MAIN_NAME else result['name']): {
+                'total_ms':         50 * math.ceil(result['total'] * headroom / 50),
+                'heavy_modules':    result['heavy']
+            }
+            for result in results
+        }
+    }
+
+
+# ###########
+# THE COMMAND
+# ###########
+
+
+@click.command('startup')
+@click.option('-c', '--command', 'names', multiple=True,
+              help='Only check the command with the given name. Can be given multiple times')
+@click.option('-r', '--repeat', 'repeat', type=click.IntRange(min=1), default=3,
+              help='The number of runs of every command, of which the fastest is checked')
+@click.option('-t', '--top', 'top', type=click.IntRange(min=0), default=DEFAULT_TOP,
+              help='The number of modules with the longest import times, which are reported for every command')
+@click.option('--budget', 'budget_path', type=click.Path(dir_okay=False), default=DEFAULT_BUDGET_PATH,
+              help='The path of the budget file')
+@click.option('--save', 'save', is_flag=True,
+              help='Save the measured import times and heavy modules as the new budget')
+@click.option('--headroom', 'headroom', type=click.FloatRange(min=1), default=2.0,
+              help='The factor, by which the measured import times are multiplied for the new budget')
+def startup(names, repeat, top, budget_path, save, headroom):
+    budget = {'commands': {}}
+    if not save:
+        if not os.path.exists(budget_path):
+            raise click.ClickException('There is no budget at "{}". Create it with "--save"'.format(budget_path))
+
+        with open(budget_path, mode='r') as file:
+            budget = json.load(file)
+
+    results = []
+    for name in names or get_command_names():
+        command_budget = None if save else budget['commands'].get(name, {})
+        results.append(check_command(name, command_budget, repeat, top))
+
+    click.echo(format_report(results))
+
+    if save:
+        with open(budget_path, mode='w') as file:
+            file.write(json.dumps(create_budget(results, headroom), indent=4, sort_keys=True))
+        click.echo('Saved the budget to "{}"'.format(budget_path))
+    elif any(result['violations'] for result in results):
+        raise click.ClickException('The startup of some of the commands exceeds the budget')
+
+
+if __name__ == '__main__':
+    startup()
@@ -0,0 +1,228 @@
+"""
+This module builds the synthetic environments for the benchmarks: A config folder with a config file, which uses a
+sqlite database within that folder, a catalog of many rewards, many users and one benchmark user with a large
+inventory of rewards and packs.
+
+The database is built once per size and saved as a template. The benchmarks, which change the database (like opening
+all the packs), restore the database from this template before every single run, so that every run starts with exactly
+the same data.
+
+CHANGELOG
+
+Added 17.10.2026
+"""
+# standard library
+import os
+import shutil
+import datetime
+import itertools
+
+from typing import Dict, List
+
+# third party
+from peewee import chunked
+
+from rewardify.env import EnvironmentConfig
+
+from rewardify.models import User, Pack, Reward, DATABASE_PROXY
+
+from rewardify.password import PasswordHash
+
+from rewardify.rarity import Rarity
+
+from rewardify.adapters import RewardParametersAdapter, PackParametersAdapter
+
+# local
+from rewardifycli.util import Resources, SessionToken
+
+
+# The name of the user, who owns the large inventory
+USERNAME = 'bench'
+PASSWORD = 'bench'
+
+# The reward, which makes up half of the inventory, so that "rewards use --all" has a lot to do
+REWARD_NAME = 'Benchmark Reward'
+PACK_NAME = 'Benchmark Pack'
+
+# The number of distinct reward names within the inventory of the benchmark user
+INVENTORY_NAMES = 20
+
+DATABASE_FILE_NAME = 'rewardify.db'
+TEMPLATE_FILE_NAME = 'template.db'
+
+INSERT_BATCH_SIZE = 100
+
+CONFIG_TEMPLATE = '''from rewardify.backends import MockBackend
+
+DATABASE = {database!r}
+
+BACKEND = MockBackend
+
+REWARDS = {rewards!r}
+
+PACKS = {packs!r}
+
+MOCK_BACKEND_USERS = {users!r}
+'''
+
+
+class World:
+    """
+    Instances of this class build and manage the synthetic environment for one size within the given folder.
+
+    CHANGELOG
+
+    Added 17.10.2026
+    """
+    def __init__(self, folder_path: str, size: int, users: int, catalog: int):
+        """
+        The constructor.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param folder_path: The config folder of the environment. It has to exist and should be empty.
+        :param size: The number of rewards and the number of packs of the benchmark user
+        :param users: The number of additional users
+        :param catalog: The number of rewards within the config
+        """
+        self.folder_path = folder_path
+        self.size = size
+        self.users = users
+        self.catalog = catalog
+
+        self.database_path = os.path.join(folder_path, DATABASE_FILE_NAME)
+        self.template_path = os.path.join(folder_path, TEMPLATE_FILE_NAME)
+        self.token = None
+
+    def build(self):
+        """
+        Writes the config file, fills the database and saves it as the template.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :return:
+        """
+        environment_config: EnvironmentConfig = EnvironmentConfig.instance()
+        environment_config.set_folder_path(self.folder_path)
+
+        with open(os.path.join(self.folder_path, 'config.py'), mode='w') as file:
+            file.write(CONFIG_TEMPLATE.format(
+                database={'engine': 'sqlite', 'host': self.database_path, 'database': '', 'user': '', 'password': '',
+                          'port': 0},
+                rewards=self.get_rewards(),
+                packs=self.get_packs(),
+                users=self.get_usernames()
+            ))
+
+        resources: Resources = Resources.instance()
+        resources.reset()
+        resources.provide('config')
+
+        # The items are inserted before the inventory counters are installed. Installing them afterwards computes
+        # them with a single aggregate query, which is a lot faster than the triggers for every single row.
+        environment_config.load_database()
+        environment_config.init()
+        DATABASE_PROXY.create_tables([User, Pack, Reward])
+        with DATABASE_PROXY.atomic():
+            self.insert_users()
+            self.insert_items()
+        DATABASE_PROXY.close()
+
+        resources.provide('database')
+        # All the changes are moved from the WAL file into the database file, so that the template is complete
+        DATABASE_PROXY.execute_sql('PRAGMA wal_checkpoint(TRUNCATE)')
+        DATABASE_PROXY.close()
+        shutil.copyfile(self.database_path, self.template_path)
+
+        self.token = SessionToken.issue(USERNAME)
+
+    def restore(self):
+        """
+        Replaces the database with the template and initializes all the resources, so that the next command does not
+        have to do it.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :return:
+        """
+        if not DATABASE_PROXY.is_closed():
+            DATABASE_PROXY.close()
+
+        for suffix in ['', '-wal', '-shm']:
+            if os.path.exists(self.database_path + suffix):
+                os.unlink(self.database_path + suffix)
+        shutil.copyfile(self.template_path, self.database_path)
+
+        resources: Resources = Resources.instance()
+        resources.reset()
+        resources.provide('config', 'database', 'backend')
+
+    # HELPER METHODS
+    # --------------
+
+    def get_rewards(self) -> Dict[str, Dict]:
+        rewards = {
+            REWARD_NAME: {'cost': 100, 'recycle': 10, 'description': 'for benchmarking', 'rarity': 'common',
+                          'effect': 'gold(1)'}
+        }
+        for index, rarity in zip(range(1, self.catalog), itertools.cycle(Rarity.RARITIES)):
+            rewards['Reward {:07d}'.format(index)] = {
+                'cost': 10 * (index % 100 + 1),
+                'recycle': index % 100 + 1,
+                'description': 'A {} reward for benchmarking'.format(rarity),
+                'rarity': rarity,
+                'effect': ''
+            }
+
+        return rewards
+
+    def get_packs(self) -> Dict[str, Dict]:
+        return {
+            PACK_NAME: {
+                'cost': 100,
+                'description': 'for benchmarking',
+                '1': [0.7, 0.2, 0.08, 0.02],
+                '2': [0.7, 0.2, 0.08, 0.02],
+                '3': [0.7, 0.2, 0.08, 0.02],
+                '4': [0.5, 0.3, 0.15, 0.05],
+                '5': [0.0, 0.5, 0.4, 0.1]
+            }
+        }
+
+    def get_usernames(self) -> List[str]:
+        return [USERNAME] + ['user{:07d}'.format(index) for index in range(self.users)]
+
+    def insert_users(self):
+        # Hashing is slow on purpose. The hash of a password is not hashed again, so all the users share one hash.
+        password = str(PasswordHash(PASSWORD))
+        rows = [{'name': name, 'password': password, 'gold': 0, 'dust': 0} for name in self.get_usernames()]
+        for batch in chunked(rows, INSERT_BATCH_SIZE):
+            User.insert_many(batch).execute()
+
+    def insert_items(self):
+        user_id = User.get(User.name == USERNAME).id
+        date_obtained = datetime.datetime.now()
+        environment_config: EnvironmentConfig = EnvironmentConfig.instance()
+
+        # Half of the rewards are the benchmark reward and the other half is spread over some other names
+        names = list(environment_config.REWARDS.keys())[:INVENTORY_NAMES]
+        parameters = {name: RewardParametersAdapter(name, environment_config.REWARDS[name]).parameters()
+                      for name in names}
+        reward_rows = (
+            {**parameters[REWARD_NAME if index % 2 == 0 else names[index % len(names)]],
+             'user': user_id, 'date_obtained': date_obtained}
+            for index in range(self.size)
+        )
+        for batch in chunked(reward_rows, INSERT_BATCH_SIZE):
+            Reward.insert_many(batch).execute()
+
+        pack_parameters = PackParametersAdapter(PACK_NAME, environment_config.PACKS[PACK_NAME]).parameters()
+        pack_rows = ({**pack_parameters, 'user': user_id, 'date_obtained': date_obtained} for _ in range(self.size))
+        for batch in chunked(pack_rows, INSERT_BATCH_SIZE):
+            Pack.insert_many(batch).execute()
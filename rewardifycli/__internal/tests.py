@@ -10,7 +10,12 @@ from rewardify.models import User
 
 from rewardify._util_test import DBTestMixin, ConfigTestMixin
 
-from rewardifycli.util import UserCredentials
+from rewardifycli import counters
+from rewardifycli import models
+
+from rewardifycli.models import InventoryCounter, UpdateCheckpoint
+
+from rewardifycli.util import UserCredentials, Templater, Resources
 
 
 # ################
@@ -39,10 +44,23 @@ class CLITestMixin:
 
         Added 14.06.2019
 
+        Changed 17.10.2026
+        The output format of the templater is reset to "text", because a previous test might have changed it through
+        the global "--format" option.
+
+        Changed 17.10.2026
+        The initialized resources are reset, so that every test starts without any of them.
+
         :return:
         """
         self.RUNNER = CliRunner()
 
+        templater: Templater = Templater.instance()
+        templater.output_format = 'text'
+
+        resources: Resources = Resources.instance()
+        resources.reset()
+
 
 # ########################
 # ACTUAL TEST BASE CLASSES
@@ -68,7 +86,20 @@ class RewardifycliTestCase(CLITestMixin, ConfigTestMixin, DBTestMixin, unittest.
         ConfigTestMixin.setUp(self)
         CLITestMixin.setUp(self)
 
+        # The test database is created from scratch for every test, so the inventory counters and the other tables
+        # of the cli have to be installed every time as well
+        counters.install()
+        models.install()
+
+        # The test case sets up the config and the database on its own. The commands must not initialize them again,
+        # because that would connect to a different (empty) database.
+        resources: Resources = Resources.instance()
+        resources.mark_provided('config', 'database', 'backend')
+
     def tearDown(self):
+        # The additional tables of the cli are not known to the database test mixin, but they must not survive until
+        # the next test either
+        self.TEST_DATABASE.drop_tables([InventoryCounter, UpdateCheckpoint], safe=True)
         DBTestMixin.tearDown(self)
 
 
@@ -0,0 +1,169 @@
+"""
+This module contains the "batch" command, which reads many rewardify commands from a file (or stdin) and executes all
+of them within one process and one database transaction.
+
+CHANGELOG
+
+Added 17.10.2026
+"""
+# standard library
+import io
+import shlex
+import traceback
+import contextlib
+
+from typing import List, Dict, TextIO
+
+# third party
+import click
+
+from rewardify.models import DATABASE_PROXY
+
+# local
+from rewardifycli.util import Templater, requires
+from rewardifycli.concurrency import write_transaction
+
+# These commands can not be used from within a batch. "serve" would never return and a nested batch would mess up the
+# transaction handling.
+EXCLUDED_COMMANDS = ['batch', 'serve']
+
+
+def parse_line(line: str) -> List[str]:
+    """
+    Given a line from the batch file, this method returns the list of command line arguments for it. Empty lines and
+    comments (starting with "#") result in an empty list. A leading "rewardify" is removed, so that lines can be
+    copied from existing shell scripts as they are.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param line:
+    :return:
+    """
+    args = shlex.split(line, comments=True)
+    if args and args[0] == 'rewardify':
+        args = args[1:]
+    return args
+
+
+def read_lines(file: TextIO) -> List[Dict]:
+    """
+    Reads all the lines from the given file and returns a list with a dict for every line, which contains the "line"
+    number, the "text" of the line, the parsed "args" and the "error" message, if the line could not be parsed (for
+    example because of an unbalanced quote). In that case the args are None.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param file:
+    :return:
+    """
+    lines = []
+    for index, text in enumerate(file, start=1):
+        try:
+            args, error = parse_line(text), None
+        except ValueError as e:
+            args, error = None, str(e)
+        lines.append({'line': index, 'text': text.strip(), 'args': args, 'error': error})
+
+    return lines
+
+
+def execute_line(args: List[str], quiet: bool) -> int:
+    """
+    Executes the command given by the list of command line arguments within this process and returns the exit code.
+    If "quiet" is True, the output of the command is discarded.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param args:
+    :param quiet:
+    :return:
+    """
+    # The import is done here, because the main module is the one importing this module in the first place
+    from rewardifycli.main import invoke
+
+    if args[0] in EXCLUDED_COMMANDS:
+        click.echo('The command "{}" can not be used within a batch'.format(args[0]), err=True)
+        return 1
+
+    # An empty ExitStack does nothing on enter and exit ("contextlib.nullcontext" only exists since python 3.7)
+    with contextlib.ExitStack() as stack:
+        if quiet:
+            stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+
+        try:
+            # The config has already been loaded and the database connected by the "batch" command itself, so the
+            # resources are not initialized again
+            return invoke(args)
+        except Exception:
+            click.echo(traceback.format_exc(), err=True)
+            return 1
+
+
+@click.command('batch')
+@click.argument('file', type=click.File(mode='r'), default='-')
+@click.option('-a', '--atomic', 'atomic', is_flag=True,
+              help='Roll back all the commands, if a single one of them fails')
+@click.option('-q', '--quiet', 'quiet', is_flag=True,
+              help='Only print the summary report and not the output of the single commands')
+@requires('config', 'database')
+def batch(file, atomic, quiet):
+    """
+    Executes the rewardify commands from the given FILE (or stdin), one command per line, within a single process and
+    a single database transaction.
+    """
+    templater: Templater = Templater.instance()
+
+    results: List[Dict] = []
+    failures: List[Dict] = []
+
+    # The whole file is read and parsed before the transaction is started. Reading from stdin may block for an
+    # arbitrary amount of time, during which the batch would otherwise hold the write lock of the database.
+    lines = read_lines(file)
+
+    # All the commands are executed within one transaction, so that the database only has to commit (and sync to the
+    # disk) once. Each command gets its own savepoint though, so that a failing command can be undone on its own,
+    # without affecting the others.
+    # 17.10.2026
+    # The batch holds the write lock of the database from the start, because it would otherwise be the transaction
+    # most likely to fail halfway through, when another process writes at the same time.
+    with write_transaction() as transaction:
+        for line in lines:
+            if line['error'] is not None:
+                # A line, which can not even be parsed, fails just like a command with invalid arguments would
+                click.echo('Line {}: {}'.format(line['line'], line['error']), err=True)
+                command, exit_code = line['text'], 2
+            elif not line['args']:
+                continue
+            else:
+                command = ' '.join(line['args'])
+                with DATABASE_PROXY.atomic() as savepoint:
+                    exit_code = execute_line(line['args'], quiet)
+                    if exit_code != 0:
+                        savepoint.rollback()
+
+            result = {'line': line['line'], 'command': command, 'exit_code': exit_code}
+            results.append(result)
+            if exit_code != 0:
+                failures.append(result)
+                # In atomic mode, a single error means that nothing at all should be changed
+                if atomic:
+                    transaction.rollback()
+                    break
+
+    context = {
+        'total':        len(results),
+        'succeeded':    len(results) - len(failures),
+        'failures':     failures,
+        'atomic':       atomic,
+        'rolled_back':  atomic and len(failures) != 0
+    }
+    templater.echo_template('batch_report.jinja2', context)
+
+    if len(failures) != 0:
+        raise click.Abort()
@@ -0,0 +1,412 @@
+"""
+This module contains set based implementations of the inventory operations, which the rewardify facade only offers for
+a single item at a time. Instead of one database round trip (and one commit) per item, these functions work with a
+constant number of queries within a single transaction, no matter how many items are affected.
+
+CHANGELOG
+
+Added 17.10.2026
+"""
+# standard library
+import re
+import datetime
+
+from typing import Dict, List, Tuple
+
+# third party
+import numpy as np
+
+from peewee import Select, fn, chunked
+
+from rewardify.env import EnvironmentConfig
+
+from rewardify.models import User, Pack, Reward, DATABASE_PROXY
+
+from rewardify.rarity import Rarity
+
+from rewardify.adapters import RewardParametersAdapter
+
+# local
+from rewardifycli import counters
+
+from rewardifycli.projections import RewardRecord
+
+# #########
+# CONSTANTS
+# #########
+
+# This is the amount of rows, which are inserted with a single insert statement. The number of variables per statement
+# is limited for sqlite, which is why all the rows can not simply be inserted at once.
+INSERT_BATCH_SIZE = 100
+
+
+# ############
+# PACK OPENING
+# ############
+
+
+def count_packs(username: str, pack_name: str) -> int:
+    """
+    Returns the integer amount of packs with the given name, which the given user owns.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param username:
+    :param pack_name:
+    :return:
+    """
+    # 17.10.2026
+    # The count is read from the inventory counters instead of counting all the packs
+    return counters.get_count(username, 'pack', pack_name)
+
+
+def open_packs(username: str, pack_name: str, count: int) -> List[RewardRecord]:
+    """
+    Opens the given amount of packs with the given name from the inventory of the given user and returns a list with
+    the records of all the rewards, which have been created by opening them.
+    The slot probabilities of all the packs are evaluated in a single vectorized pass, the resulting rewards are added
+    with batched insert statements and the packs are deleted with a single statement. All of this happens within one
+    transaction.
+    If the user does not own enough packs of that type, a LookupError is risen.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    Changed 17.10.2026
+    Returns the created rewards instead of the amount of opened packs, so that the caller does not have to query the
+    whole inventory to find out what the packs contained.
+
+    Changed 17.10.2026
+    Returns the compact reward records instead of the full parameter dicts of the rewards.
+
+    :raises: LookupError
+
+    :param username:
+    :param pack_name:
+    :param count:
+    :return:
+    """
+    if count <= 0:
+        return []
+
+    user = User.get(User.name == username)
+
+    with DATABASE_PROXY.atomic():
+        # These are the ids of the packs to be opened
+        selected_ids = select_ids(Pack, user, pack_name, count)
+
+        # Usually all the packs of the same name have the same slot probabilities, but a pack stores the probabilities,
+        # which were configured at the time it was bought. So we group the packs by their probabilities, which usually
+        # results in a single group.
+        slots = [getattr(Pack, 'slot{}'.format(index)) for index in Pack.SLOT_INDICES]
+        groups = Pack.select(*slots, fn.COUNT(Pack.id)).where(Pack.id.in_(selected_ids)).group_by(*slots).tuples()
+
+        rows = []
+        total = 0
+        for *probabilities, group_count in groups:
+            rows += sample_pack_rewards(user, probabilities, group_count)
+            total += group_count
+
+        if total < count:
+            raise LookupError(
+                'User {} does not posses {} packs by the name {}'.format(username, count, pack_name)
+            )
+
+        for batch in chunked(rows, INSERT_BATCH_SIZE):
+            Reward.insert_many(batch).execute()
+
+        Pack.delete().where(Pack.id.in_(selected_ids)).execute()
+
+    return [RewardRecord.from_row(row) for row in rows]
+
+
+def sample_pack_rewards(user: User, probabilities: List, count: int) -> List[Dict]:
+    """
+    Given the user, the list of the RarityProbability objects for the 5 slots of a pack and the amount of packs to be
+    opened, this method returns the list of the parameter dicts for all the rewards, which result from opening these
+    packs.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param user:
+    :param probabilities:
+    :param count:
+    :return:
+    """
+    # This is a matrix with one row for every slot and one column for every rarity. The rows are normalized, because
+    # the probabilities are stored with a limited precision and might not add up to exactly one.
+    probability_matrix = np.array([probability.list() for probability in probabilities], dtype=float)
+    probability_matrix /= probability_matrix.sum(axis=1, keepdims=True)
+    cumulative_matrix = np.cumsum(probability_matrix, axis=1)
+
+    # The rarity for every slot of every pack is chosen in one go: For a uniform random number, the index of the rarity
+    # is the amount of cumulative probabilities, which are smaller than the number
+    random = np.random.random_sample((count, len(probabilities), 1))
+    rarity_indices = (random >= cumulative_matrix[np.newaxis, :, :-1]).sum(axis=2).flatten()
+
+    reward_parameters_map = available_reward_parameters_by_rarity()
+    date_obtained = datetime.datetime.now()
+
+    rows = []
+    for rarity_index, rarity in enumerate(Rarity.RARITIES):
+        amount = int((rarity_indices == rarity_index).sum())
+        if amount == 0:
+            continue
+
+        # Within the rarity every reward has the same probability
+        rarity_parameters = reward_parameters_map[rarity]
+        if len(rarity_parameters) == 0:
+            raise ValueError('There are no rewards of the rarity "{}" to be put into a pack!'.format(rarity))
+
+        for reward_index in np.random.randint(0, len(rarity_parameters), size=amount):
+            rows.append({
+                **rarity_parameters[reward_index],
+                'user': user.id,
+                'date_obtained': date_obtained
+            })
+
+    return rows
+
+
+# ############
+# REWARD USAGE
+# ############
+
+
+def count_rewards(username: str, reward_name: str) -> int:
+    """
+    Returns the integer amount of rewards with the given name, which the given user owns.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param username:
+    :param reward_name:
+    :return:
+    """
+    # 17.10.2026
+    # The count is read from the inventory counters instead of counting all the rewards
+    return counters.get_count(username, 'reward', reward_name)
+
+
+def use_rewards(username: str, reward_name: str, count: int) -> int:
+    """
+    Uses the given amount of rewards with the given name from the inventory of the given user and returns the amount
+    of used rewards.
+    The effects of all the rewards are summed up by a single aggregate query and applied to the user with a single
+    update, the rewards are deleted with a single statement. All of this happens within one transaction.
+    If the user does not own enough rewards of that type, a LookupError is risen.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :raises: LookupError
+
+    :param username:
+    :param reward_name:
+    :param count:
+    :return:
+    """
+    if count <= 0:
+        return 0
+
+    user = User.get(User.name == username)
+
+    with DATABASE_PROXY.atomic():
+        selected_ids = select_ids(Reward, user, reward_name, count)
+
+        # Rewards of the same name usually have the same effect string, so grouping them by the effect string means
+        # that the effect only has to be evaluated once for all of them
+        groups = Reward.select(Reward.effect, fn.COUNT(Reward.id)).where(
+            Reward.id.in_(selected_ids)
+        ).group_by(Reward.effect).tuples()
+
+        gold = 0
+        dust = 0
+        total = 0
+        for effect, group_count in groups:
+            gold += evaluate_effect(Reward.GOLD_EFFECT_REGEX, effect) * group_count
+            dust += evaluate_effect(Reward.DUST_EFFECT_REGEX, effect) * group_count
+            total += group_count
+
+        if total < count:
+            raise LookupError(
+                'User {} does not posses {} rewards by the name {}'.format(username, count, reward_name)
+            )
+
+        # The currencies are modified directly within the database, so that no concurrent change to the balance of
+        # the user can be lost
+        if gold != 0 or dust != 0:
+            User.update(gold=User.gold + gold, dust=User.dust + dust).where(User.id == user.id).execute()
+
+        Reward.delete().where(Reward.id.in_(selected_ids)).execute()
+
+    return count
+
+
+def evaluate_effect(regex: str, effect: str) -> int:
+    """
+    Given the regex for one of the effect types of the Reward model (Reward.GOLD_EFFECT_REGEX or
+    Reward.DUST_EFFECT_REGEX) and the effect string of a reward, this method returns the integer amount granted by
+    that type of effect. If the effect string does not contain such an effect, 0 is returned.
+    If the argument of the effect is not an integer, a ValueError is risen.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :raises: ValueError
+
+    :param regex:
+    :param effect:
+    :return:
+    """
+    result = re.search(regex, str(effect))
+    if result is None:
+        return 0
+
+    substring = result.group(1)
+    try:
+        return int(substring)
+    except ValueError:
+        raise ValueError('The substring "{}" can not be the argument of an EFFECT!'.format(substring))
+
+
+# ###############
+# REWARD RECYCLING
+# ###############
+
+
+def recycle_rewards(username: str,
+                    keep: int = 0,
+                    name: str = None,
+                    rarity: str = None,
+                    dry_run: bool = False) -> Tuple[Dict[str, int], int]:
+    """
+    Recycles rewards from the inventory of the given user according to a policy: Of every reward type only the given
+    amount of "keep" copies (the oldest ones) is kept and all the other copies are recycled. The rewards in question
+    can be restricted to a single reward type by passing its "name" and/or to a single "rarity".
+    Returns a tuple, whose first element is a dict with the reward names as keys and the amount of recycled copies as
+    values and whose second element is the total amount of dust, which has been added to the user for recycling.
+    The recycled rewards are determined by a single aggregate query and deleted by a single statement within one
+    transaction. If "dry_run" is True, the database is not changed at all and the return value only describes what
+    would have happened.
+
+    EXAMPLE:
+    Recycling all the duplicates of the rewards:
+    >> recycle_rewards("Jonas", keep=1)
+    Recycling all the legendary rewards:
+    >> recycle_rewards("Jonas", rarity="legendary")
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param username:
+    :param keep:
+    :param name:
+    :param rarity:
+    :param dry_run:
+    :return:
+    """
+    config: EnvironmentConfig = EnvironmentConfig.instance()
+    user = User.get(User.name == username)
+
+    conditions = (Reward.user == user.id)
+    if name is not None:
+        conditions &= (Reward.name == name)
+    if rarity is not None:
+        conditions &= (Reward.rarity == Rarity(rarity))
+
+    # Within every reward type, the copies are numbered starting from the oldest one. Every copy with a number
+    # greater than "keep" is recycled.
+    position = fn.ROW_NUMBER().over(partition_by=[Reward.name], order_by=[Reward.id])
+    ranked = Reward.select(Reward.id, Reward.name, Reward.dust_recycle, position.alias('position')).where(
+        conditions
+    ).alias('ranked')
+    surplus_condition = (ranked.c.position > keep)
+
+    with DATABASE_PROXY.atomic():
+        aggregate = Select(
+            from_list=[ranked],
+            columns=[ranked.c.name, fn.COUNT(ranked.c.id), fn.SUM(ranked.c.dust_recycle)]
+        ).where(surplus_condition).group_by(ranked.c.name).bind(DATABASE_PROXY)
+
+        recycled = {}
+        dust = 0
+        for reward_name, count, stored_dust in aggregate.tuples():
+            recycled[reward_name] = count
+            # The dust is granted as it is currently configured. Only for reward types, which are not configured
+            # anymore, the value stored with the reward at the time it was obtained is used.
+            if reward_name in config.REWARDS:
+                dust += count * config.REWARDS[reward_name]['recycle']
+            else:
+                dust += stored_dust
+
+        if dry_run or len(recycled) == 0:
+            return recycled, dust
+
+        surplus_ids = Select(from_list=[ranked], columns=[ranked.c.id]).where(surplus_condition)
+        Reward.delete().where(Reward.id.in_(surplus_ids)).execute()
+        User.update(dust=User.dust + dust).where(User.id == user.id).execute()
+
+    return recycled, dust
+
+
+# ##############
+# HELPER METHODS
+# ##############
+
+
+def select_ids(model, user: User, name: str, count: int) -> Select:
+    """
+    Given a model class (Pack or Reward), a user, the name of the item type and an amount, this method returns a query
+    which selects the ids of that amount of items of that type from the inventory of the user. This query can be used
+    as the subquery for an IN clause.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param model:
+    :param user:
+    :param name:
+    :param count:
+    :return:
+    """
+    # The subquery is wrapped into a derived table, because some database engines (mysql) do not allow a LIMIT within
+    # an IN subquery and also do not allow a subquery on the same table for a DELETE.
+    selected = model.select(model.id).where(
+        (model.user == user.id) &
+        (model.name == name)
+    ).order_by(model.id).limit(count).alias('selected')
+    return Select(from_list=[selected], columns=[selected.c.id])
+
+
+def available_reward_parameters_by_rarity() -> Dict[str, List[Dict]]:
+    """
+    Returns a dict, whose keys are the rarity identifiers and the values are lists with the parameter dicts for the
+    Reward model of all the available rewards with that rarity.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :return:
+    """
+    config: EnvironmentConfig = EnvironmentConfig.instance()
+
+    parameters_map = {rarity: [] for rarity in Rarity.RARITIES}
+    for name, reward_config in config.REWARDS.items():
+        parameters_adapter = RewardParametersAdapter(name, reward_config)
+        parameters = parameters_adapter.parameters()
+        parameters_map[str(Rarity(parameters['rarity']))].append(parameters)
+
+    return parameters_map
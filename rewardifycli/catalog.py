@@ -0,0 +1,354 @@
+"""
+This module contains the indexed catalog of the rewards and packs, which are defined in the config.
+
+The catalog is built once for every version of the config (which means once per process for the normal commands and
+once per config reload for the daemon) and contains the indices for the lookup by name, the filtering by rarity and
+cost and the search by a part of the name. It is also used to suggest the correct name, if the name given by the user
+does not exist.
+
+CHANGELOG
+
+Added 17.10.2026
+"""
+# standard library
+import bisect
+import pickle
+import difflib
+
+from collections import defaultdict
+
+from typing import Dict, List, Set, Optional, Tuple
+
+# third party
+import click
+
+from rewardify.env import EnvironmentConfig
+
+from rewardify.rarity import Rarity
+
+# local
+from rewardifycli.util import Templater
+
+
+# The keys are the kinds of items in the catalog and the values are the names of the attributes of the environment
+# config, which contain the dicts defining the items of that kind
+KIND_ATTRIBUTES = {
+    'reward':   'REWARDS',
+    'pack':     'PACKS'
+}
+
+# The search terms are split into n-grams of this length for the search index
+NGRAM_LENGTH = 3
+
+
+class Catalog:
+    """
+    Instances of this class are the index over the items of one kind. The items are represented as dicts, which contain
+    the parameters from the config and the additional key "name".
+
+    The default order of the items is the one of the listings: The rewards are ordered by their rarity (legendary
+    first) and then by their cost in descending order. The packs are ordered by their cost in descending order as well.
+
+    CHANGELOG
+
+    Added 17.10.2026
+    """
+    def __init__(self, kind: str, items: Dict[str, Dict]):
+        """
+        The constructor.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param kind: Either "reward" or "pack"
+        :param items: The dict from the config, whose keys are the names and the values the parameters of the items
+        """
+        self.kind = kind
+
+        self.entries: List[Dict] = [{**parameters, 'name': name} for name, parameters in items.items()]
+        self.entries.sort(key=self.get_sort_key)
+
+        # The position of every item within the default order, so that the results of the filters can be sorted
+        # without comparing the items themselves again
+        self.positions: Dict[str, int] = {entry['name']: index for index, entry in enumerate(self.entries)}
+        self.by_name: Dict[str, Dict] = {entry['name']: entry for entry in self.entries}
+
+        self.by_rarity: Dict[str, List[str]] = defaultdict(list)
+        for entry in self.entries:
+            if 'rarity' in entry:
+                self.by_rarity[entry['rarity']].append(entry['name'])
+
+        # A list of tuples (cost, name) in ascending order, so that all the items up to a certain cost can be found by
+        # a binary search
+        self.costs: List[Tuple[int, str]] = sorted((entry['cost'], entry['name']) for entry in self.entries)
+
+        # The search indices are only built, when they are actually needed for the first time
+        self._prefixes: Optional[List[Tuple[str, str]]] = None
+        self._ngrams: Optional[Dict[str, Set[str]]] = None
+
+    def get(self, name: str) -> Optional[Dict]:
+        """
+        Returns the dict for the item with the given name or None, if there is no such item.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param name:
+        :return:
+        """
+        return self.by_name.get(name)
+
+    def filter(self, rarity: str = None, max_cost: int = None, search: str = None,
+               min_cost: int = None) -> List[Dict]:
+        """
+        Returns the list of all the items, which match all of the given filters, in the default order. The filters,
+        which are None are not applied.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        Changed 17.10.2026
+        Added the "min_cost" filter.
+
+        :param rarity: Only the items of this rarity
+        :param max_cost: Only the items with at most this cost
+        :param min_cost: Only the items with at least this cost
+        :param search: Only the items, whose name contains this string (case insensitive)
+        :return:
+        """
+        names: Optional[Set[str]] = None
+
+        def narrow(candidates: Set[str]):
+            return candidates if names is None else names & candidates
+
+        if rarity is not None:
+            names = narrow(set(self.by_rarity.get(rarity, [])))
+
+        if max_cost is not None:
+            index = bisect.bisect_right(self.costs, (max_cost, chr(0x10FFFF)))
+            names = narrow({name for _, name in self.costs[:index]})
+
+        if min_cost is not None:
+            index = bisect.bisect_left(self.costs, (min_cost, ''))
+            names = narrow({name for _, name in self.costs[index:]})
+
+        if search:
+            names = narrow(self.search(search))
+
+        if names is None:
+            return list(self.entries)
+
+        return [self.by_name[name] for name in sorted(names, key=self.positions.__getitem__)]
+
+    def search(self, term: str) -> Set[str]:
+        """
+        Returns the set of names of all the items, whose name contains the given term (case insensitive).
+        Terms shorter than the n-gram length are matched as the prefix of the name.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param term:
+        :return:
+        """
+        term = term.lower()
+
+        if len(term) < NGRAM_LENGTH:
+            # The prefixes are a sorted list of (lower name, name), so all the names with the given prefix are
+            # one continuous slice within the list
+            prefixes = self.get_prefixes()
+            start = bisect.bisect_left(prefixes, (term, ''))
+            names = set()
+            for lower_name, name in prefixes[start:]:
+                if not lower_name.startswith(term):
+                    break
+                names.add(name)
+            return names
+
+        # Every name containing the term also has to contain all the n-grams of the term. The intersection of the
+        # n-gram sets are the candidates, which then only have to be checked for the actual substring.
+        ngrams = self.get_ngrams()
+        candidates = None
+        for ngram in split_ngrams(term):
+            ngram_names = ngrams.get(ngram, set())
+            candidates = ngram_names if candidates is None else candidates & ngram_names
+            if not candidates:
+                return set()
+
+        return {name for name in candidates if term in name.lower()}
+
+    def suggest(self, name: str, count: int = 3) -> List[str]:
+        """
+        Returns a list with at most the given count of names of existing items, which are similar to the given name.
+        This is used for the "did you mean" suggestions.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param name:
+        :param count:
+        :return:
+        """
+        lower_name = name.lower()
+
+        # Only the items sharing at least one n-gram with the given name are compared, unless the name is too short
+        # to have any n-grams
+        ngrams = self.get_ngrams()
+        candidates = set()
+        for ngram in split_ngrams(lower_name):
+            candidates |= ngrams.get(ngram, set())
+        if not candidates:
+            candidates = set(self.by_name.keys())
+
+        lower_names = {candidate.lower(): candidate for candidate in candidates}
+        matches = difflib.get_close_matches(lower_name, lower_names.keys(), n=count, cutoff=0.5)
+        return [lower_names[match] for match in matches]
+
+    # HELPER METHODS
+    # --------------
+
+    def get_prefixes(self) -> List[Tuple[str, str]]:
+        if self._prefixes is None:
+            self._prefixes = sorted((name.lower(), name) for name in self.by_name.keys())
+        return self._prefixes
+
+    def get_ngrams(self) -> Dict[str, Set[str]]:
+        if self._ngrams is None:
+            self._ngrams = defaultdict(set)
+            for name in self.by_name.keys():
+                for ngram in split_ngrams(name.lower()):
+                    self._ngrams[ngram].add(name)
+        return self._ngrams
+
+    def get_sort_key(self, entry: Dict):
+        if 'rarity' in entry:
+            return -Rarity.RARITIES.index(entry['rarity']), -entry['cost'], entry['name']
+        return -entry['cost'], entry['name']
+
+
+def split_ngrams(term: str) -> Set[str]:
+    """
+    Returns the set of all the n-grams of the given string
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param term:
+    :return:
+    """
+    return {term[index:index + NGRAM_LENGTH] for index in range(len(term) - NGRAM_LENGTH + 1)}
+
+
+def paginate(entries: List, page: int, per_page: int) -> Tuple[List, int]:
+    """
+    Returns a tuple with the entries on the given page (starting at 1) and the total number of pages.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param entries:
+    :param page:
+    :param per_page:
+    :return:
+    """
+    page_count = max(1, (len(entries) + per_page - 1) // per_page)
+    start = (page - 1) * per_page
+    return entries[start:start + per_page], page_count
+
+
+# #####################
+# THE CATALOG INSTANCES
+# #####################
+
+# The keys are the kinds and the values are tuples of the dict from the config, from which the catalog was built, and
+# the catalog itself
+CATALOGS: Dict[str, Tuple[Dict, Catalog]] = {}
+
+# The catalogs, which have been loaded from the config cache (see "rewardifycli.config"). They are only unpickled, when
+# they are needed for the first time. The keys are the kinds and the values are tuples of the dict from the config, to
+# which the catalog belongs, and the pickled catalog.
+CACHED_CATALOGS: Dict[str, Tuple[Dict, bytes]] = {}
+
+
+def get_catalog(kind: str) -> Catalog:
+    """
+    Returns the catalog for the given kind ("reward" or "pack"). The catalog is only built again, when the config has
+    been loaded again since. If the config has been loaded from the config cache, the catalog is taken from there.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    Changed 17.10.2026
+    The catalogs of the config cache are used instead of building them again in every process.
+
+    :param kind:
+    :return:
+    """
+    environment_config: EnvironmentConfig = EnvironmentConfig.instance()
+    items = getattr(environment_config, KIND_ATTRIBUTES[kind])
+
+    # Loading the config creates new dict objects, so the identity of the dict tells if the catalog is still current
+    if kind not in CATALOGS or CATALOGS[kind][0] is not items:
+        cached_items, content = CACHED_CATALOGS.get(kind, (None, None))
+        if cached_items is items:
+            CATALOGS[kind] = (items, pickle.loads(content))
+        else:
+            CATALOGS[kind] = (items, Catalog(kind, items))
+
+    return CATALOGS[kind][1]
+
+
+def restore_catalogs(catalogs: Dict[str, bytes]):
+    """
+    Given the dict of the pickled catalogs from the config cache, whose keys are the kinds, this method makes them the
+    catalogs of the items, which are currently set within the environment config.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param catalogs:
+    :return:
+    """
+    environment_config: EnvironmentConfig = EnvironmentConfig.instance()
+    for kind, content in catalogs.items():
+        CACHED_CATALOGS[kind] = (getattr(environment_config, KIND_ATTRIBUTES[kind]), content)
+
+
+def require_item(kind: str, name: str) -> Dict:
+    """
+    Returns the dict for the item of the given kind with the given name. If there is no such item, the template for an
+    unknown item (including the suggestions for similar names) is echoed and the command is aborted.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :raises: click.Abort
+
+    :param kind:
+    :param name:
+    :return:
+    """
+    catalog = get_catalog(kind)
+    entry = catalog.get(name)
+
+    if entry is None:
+        templater: Templater = Templater.instance()
+        context = {
+            'kind':         kind,
+            'name':         name,
+            'suggestions':  catalog.suggest(name)
+        }
+        templater.echo_template('unknown_item.jinja2', context)
+        raise click.Abort()
+
+    return entry
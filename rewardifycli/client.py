@@ -0,0 +1,204 @@
+"""
+This module contains the thin client for the rewardify daemon (see "rewardifycli.daemon").
+The client forwards its command line arguments over a unix domain socket to the daemon, which executes the command in
+its already warm process and streams back the output and the exit code.
+
+NOTE: This module is supposed to start as fast as possible. This is why it only uses the standard library and should
+not import anything from rewardify, click or jinja!
+
+CHANGELOG
+
+Added 17.10.2026
+"""
+# standard library
+import os
+import sys
+import json
+import socket
+
+from typing import List, Dict, TextIO
+
+# #########
+# CONSTANTS
+# #########
+
+# The socket file is located inside the rewardify config folder. This is the same path as the one defined in the
+# EnvironmentConfig of rewardify, but it can not be imported from there without importing the database layer.
+DEFAULT_FOLDER_PATH = '/opt/.rewardify'
+SOCKET_FILE_NAME = 'rewardify.sock'
+
+# This environment variable can be used to point the client (and the daemon) to a different socket path
+SOCKET_ENVIRONMENT_VARIABLE = 'REWARDIFY_SOCKET'
+
+# This environment variable can contain a session token (see "login --print-token"), which is used instead of the
+# credentials of the logged in user
+SESSION_ENVIRONMENT_VARIABLE = 'REWARDIFY_SESSION'
+
+# This environment variable can set the output format of the commands ("text", "json" or "ndjson")
+FORMAT_ENVIRONMENT_VARIABLE = 'REWARDIFY_FORMAT'
+
+# This environment variable can set the max age of the last update in seconds, after which any command starts a new
+# update in the background
+MAX_AGE_ENVIRONMENT_VARIABLE = 'REWARDIFY_MAX_AGE'
+
+
+def get_socket_path() -> str:
+    """
+    Returns the path of the unix domain socket, the daemon is listening on. This is either the path given by the
+    environment variable REWARDIFY_SOCKET or the default socket file within the config folder.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :return:
+    """
+    default_path = os.path.join(DEFAULT_FOLDER_PATH, SOCKET_FILE_NAME)
+    return os.environ.get(SOCKET_ENVIRONMENT_VARIABLE, default_path)
+
+
+# ##########
+# THE CLIENT
+# ##########
+
+
+class Client:
+    """
+    Instances of this class connect to the daemon on the given socket path and send commands to it.
+
+    The protocol is based on JSON lines: The client sends one line containing the request dict with the keys "argv"
+    (the list of command line arguments), "cwd" (the current working directory of the client), "color" (whether the
+    output may contain ANSI colors), "session" (the session token from the environment of the client or None) and
+    "format" (the output format from the environment of the client or None). The daemon then sends any number of lines
+    with dicts containing the keys "stream" ("stdout" or "stderr") and "data" (the string output) and finally one line
+    with a dict containing the key "exit" with the integer exit code of the command.
+
+    CHANGELOG
+
+    Added 17.10.2026
+    """
+    def __init__(self, socket_path: str):
+        """
+        The constructor.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param socket_path:
+        """
+        self.socket_path = socket_path
+
+    def run(self, argv: List[str], stdout: TextIO, stderr: TextIO) -> int:
+        """
+        Sends the given list of command line arguments to the daemon and writes the output, which the daemon streams
+        back into the given stdout and stderr streams. Returns the integer exit code of the command.
+        Raises an OSError, if the daemon could not be reached. Once the connection is established, the command may
+        already be executing within the daemon, which is why any later error is only reported and not raised.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        Changed 17.10.2026
+        Only the failure to connect to the daemon raises an OSError. An error after the request was sent is written to
+        stderr and results in a non zero exit code, so that the caller does not execute the command a second time.
+
+        :raises: OSError
+
+        :param argv:
+        :param stdout:
+        :param stderr:
+        :return:
+        """
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            connection.connect(self.socket_path)
+        except OSError:
+            connection.close()
+            raise
+
+        try:
+            request = self.create_request(argv, stdout)
+            connection.sendall(json.dumps(request).encode('utf-8') + b'\n')
+
+            streams = {'stdout': stdout, 'stderr': stderr}
+            with connection.makefile(mode='r', encoding='utf-8') as file:
+                for line in file:
+                    frame = json.loads(line)
+                    if 'exit' in frame:
+                        return frame['exit']
+
+                    stream = streams[frame['stream']]
+                    stream.write(frame['data'])
+                    stream.flush()
+        except (OSError, ValueError) as error:
+            stderr.write('The connection to the rewardify daemon failed: {}\n'.format(error))
+            return 1
+        finally:
+            connection.close()
+
+        # If the connection was closed by the daemon without sending the exit code, something went terribly wrong
+        stderr.write('The rewardify daemon closed the connection unexpectedly\n')
+        return 1
+
+    def create_request(self, argv: List[str], stdout: TextIO) -> Dict:
+        """
+        Returns the request dict for the given list of command line arguments
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        Changed 17.10.2026
+        Added the session token and the output format from the environment.
+
+        :param argv:
+        :param stdout:
+        :return:
+        """
+        # The environment variables of the client are not visible to the daemon, which is why the session token,
+        # the output format and the max age have to be sent explicitly
+        return {
+            'argv':     argv,
+            'cwd':      os.getcwd(),
+            'color':    stdout.isatty(),
+            'session':  os.environ.get(SESSION_ENVIRONMENT_VARIABLE),
+            'format':   os.environ.get(FORMAT_ENVIRONMENT_VARIABLE),
+            'max_age':  os.environ.get(MAX_AGE_ENVIRONMENT_VARIABLE)
+        }
+
+
+def main(argv: List[str] = None):
+    """
+    This is the entry point for the "rewardify-client" command. It forwards the command line arguments to the daemon.
+    If no daemon is running, the command is executed within this process instead, just like the normal "rewardify"
+    command would do.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    Changed 17.10.2026
+    Only falling back to the local execution, if the daemon could not be reached at all.
+
+    :param argv:
+    :return:
+    """
+    argv = sys.argv[1:] if argv is None else argv
+
+    client = Client(get_socket_path())
+    try:
+        exit_code = client.run(argv, sys.stdout, sys.stderr)
+    except OSError:
+        # In case the daemon could not be reached, the command is simply being executed the normal way. The import is
+        # done here, because it is the slow part we are trying to avoid in the first place.
+        from rewardifycli.main import cli
+        cli.main(args=argv, prog_name='rewardify')
+        return
+
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
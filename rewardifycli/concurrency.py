@@ -0,0 +1,289 @@
+"""
+This module contains the tools, which make it safe to run many rewardify processes against the same database at the
+same time (for example a cron job running "update", while users are buying and opening packs).
+
+- The sqlite database is switched into the WAL journal mode, in which the readers never block the writer and the
+  writer never blocks the readers.
+- Waiting for a lock of the database is limited by the busy timeout. If the lock could still not be acquired, the
+  transaction is tried again after a random (jittered) delay, so that the waiting processes do not all retry at the
+  very same moment.
+- The write transactions acquire the write lock of the database right when they begin. This way a transaction never
+  fails halfway through, after it has already read the values it is going to change.
+- Every write operation for a user holds an advisory file lock for that user. Operations for the same user are
+  executed one after another, while operations for different users do not wait for each other's locks.
+- Files are written atomically, by writing a temporary file and moving it into place.
+
+CHANGELOG
+
+Added 17.10.2026
+"""
+# standard library
+import os
+import time
+import random
+import hashlib
+import secrets
+import contextlib
+
+from typing import Iterator, Optional, Union
+
+# The advisory file locks are only available on unix. On all other platforms the per user locks do nothing and the
+# database locks alone have to do the job.
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+# third party
+from peewee import SqliteDatabase, OperationalError
+
+from rewardify.env import EnvironmentConfig
+
+from rewardify.models import DATABASE_PROXY
+
+
+# The default values for the settings, which can be changed with the variables of the same name in the config file
+DATABASE_BUSY_TIMEOUT = 5000
+DATABASE_WRITE_RETRIES = 5
+
+# The delay before the first retry in seconds. The delay doubles with every further attempt.
+RETRY_BASE_DELAY = 0.05
+
+# The name of the folder within the config folder, which contains the lock files of the users
+LOCK_FOLDER_NAME = '.locks'
+
+
+def get_setting(name: str, default: int) -> int:
+    """
+    Returns the value of the setting with the given name from the config or the given default, if the config does not
+    define it.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param name:
+    :param default:
+    :return:
+    """
+    environment_config: EnvironmentConfig = EnvironmentConfig.instance()
+    return int(getattr(environment_config, name, default))
+
+
+# ############
+# THE DATABASE
+# ############
+
+
+def configure_database(database) -> bool:
+    """
+    Configures the given (already connected) database for the concurrent access by multiple processes. This only
+    applies to sqlite databases, which are saved in a file. Returns whether the database has been configured.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param database:
+    :return:
+    """
+    if not isinstance(database, SqliteDatabase) or database.database in ('', ':memory:'):
+        return False
+
+    busy_timeout = get_setting('DATABASE_BUSY_TIMEOUT', DATABASE_BUSY_TIMEOUT)
+    database.execute_sql('PRAGMA busy_timeout = {:d}'.format(busy_timeout))
+    # The journal mode is saved within the database file itself, so this is only an actual change for the very first
+    # process. It is still done every time, because it is cheap.
+    database.execute_sql('PRAGMA journal_mode = wal')
+
+    return True
+
+
+def is_locked_error(error: Exception) -> bool:
+    """
+    Returns whether the given exception was caused by the database being locked by another process.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param error:
+    :return:
+    """
+    message = str(error).lower()
+    return isinstance(error, OperationalError) and ('locked' in message or 'busy' in message)
+
+
+def retry_delays(retries: int, base_delay: float = RETRY_BASE_DELAY) -> Iterator[float]:
+    """
+    Returns an iterator over the delays in seconds before each of the given number of retries. The delays grow
+    exponentially and are randomized ("full jitter"), so that multiple waiting processes spread out.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param retries:
+    :param base_delay:
+    :return:
+    """
+    for attempt in range(retries):
+        yield random.uniform(0, base_delay * 2 ** attempt)
+
+
+@contextlib.contextmanager
+def write_transaction(username: Optional[str] = None):
+    """
+    This context manager executes its body within a database transaction, which holds the write lock of the database
+    from the very beginning. If the lock can not be acquired within the busy timeout, acquiring it is retried a few
+    times after a jittered delay. If a username is given, the advisory lock for that user is held for the whole
+    transaction as well.
+
+    When used within another transaction (as it happens within a batch), this is only a savepoint of the outer
+    transaction, which already holds the write lock.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :raises: peewee.OperationalError if the database stays locked
+
+    :param username: The name of the user, whose data is going to be changed. None if the changes are not limited to
+        a single user.
+    :return: The peewee transaction (or savepoint) object, which can be used to roll back
+    """
+    retries = get_setting('DATABASE_WRITE_RETRIES', DATABASE_WRITE_RETRIES)
+
+    # Only sqlite knows the lock type for the beginning of the transaction. "IMMEDIATE" acquires the write lock right
+    # away instead of with the first write.
+    kwargs = {'lock_type': 'IMMEDIATE'} if isinstance(DATABASE_PROXY.obj, SqliteDatabase) else {}
+
+    with contextlib.ExitStack() as stack:
+        # Within an outer transaction the write lock of the database is already held, which excludes all the other
+        # writers anyways. Acquiring the user lock only now (after the database lock) could even dead lock with a
+        # process, which holds the user lock and waits for the database lock.
+        if username is not None and DATABASE_PROXY.transaction_depth() == 0:
+            stack.enter_context(user_lock(username))
+
+        delays = retry_delays(retries)
+        while True:
+            try:
+                transaction = stack.enter_context(DATABASE_PROXY.atomic(**kwargs))
+                break
+            except OperationalError as e:
+                delay = next(delays, None)
+                if delay is None or not is_locked_error(e):
+                    raise
+                time.sleep(delay)
+
+        yield transaction
+
+
+# ##############
+# THE USER LOCKS
+# ##############
+
+
+def get_lock_path(username: str) -> str:
+    """
+    Returns the path of the lock file for the user with the given name. The name of the file is the hash of the
+    username, so that any username results in a valid file name.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param username:
+    :return:
+    """
+    environment_config: EnvironmentConfig = EnvironmentConfig.instance()
+    file_name = '{}.lock'.format(hashlib.sha1(username.encode('utf-8')).hexdigest())
+    return os.path.join(environment_config.folder_path, LOCK_FOLDER_NAME, file_name)
+
+
+@contextlib.contextmanager
+def user_lock(username: str):
+    """
+    This context manager holds the exclusive advisory lock for the user with the given name, while its body is being
+    executed. Other processes wanting the lock for the same user wait until it is released.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param username:
+    :return:
+    """
+    with file_lock(get_lock_path(username)):
+        yield
+
+
+@contextlib.contextmanager
+def file_lock(path: str, blocking: bool = True):
+    """
+    This context manager holds the exclusive advisory lock on the file with the given path (which is created, if it
+    does not exist), while its body is being executed. It yields whether the lock is actually held: If "blocking" is
+    False and another process holds the lock, the body is executed right away without the lock.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param path:
+    :param blocking:
+    :return:
+    """
+    if fcntl is None:
+        yield True
+        return
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, mode='a') as file:
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+
+        try:
+            yield True
+        finally:
+            fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+# ##############
+# ATOMIC WRITING
+# ##############
+
+
+def atomic_write(path: str, content: Union[str, bytes], mode: int = 0o600):
+    """
+    Writes the given string (or bytes) content into the file with the given path. The content is written into a
+    temporary file within the same folder first, which is then moved into place. This way other processes either see
+    the complete old or the complete new content, but never a half written file.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    Changed 17.10.2026
+    The content can also be bytes, which are written in binary mode.
+
+    :param path:
+    :param content:
+    :param mode: The permissions of the new file
+    :return:
+    """
+    temp_path = '{}.{}.{}.tmp'.format(path, os.getpid(), secrets.token_hex(4))
+    try:
+        descriptor = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, mode)
+        with os.fdopen(descriptor, mode='wb' if isinstance(content, bytes) else 'w') as file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
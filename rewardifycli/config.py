@@ -0,0 +1,361 @@
+"""
+This module contains the compiled cache of the rewardify config and the "config" command group.
+
+Loading the config means executing the "config.py" file of the user as a python module, which can take quite a while
+for big catalogs of rewards and packs. Since the config rarely changes, the loaded values are saved in a pickle file
+within the config folder, from which they can be loaded a lot faster the next time. The cache is keyed on the
+modification time, the size and the hash of the config file, so that any change to the config file is noticed.
+
+The cache file also contains the catalogs of the rewards and packs (see "rewardifycli.catalog"), which are built from
+the config values. This way the indices of the catalogs are not built again by every single command either.
+
+CHANGELOG
+
+Added 17.10.2026
+"""
+# standard library
+import os
+import ast
+import types
+import pickle
+import hashlib
+import importlib
+
+from typing import Dict, Optional, Tuple
+
+# third party
+import click
+
+from rewardify.env import EnvironmentConfig
+
+# local
+from rewardifycli import catalog
+from rewardifycli.util import Templater, requires
+from rewardifycli.concurrency import atomic_write
+
+
+class ConfigCache:
+    """
+    Instances of this class manage the cache file for the config within the given config folder.
+
+    Most of the config values are plain data (dicts, lists, strings, numbers), which are pickled directly. Modules,
+    classes and functions (like the backend class) are saved as their import path instead and imported again when the
+    cache is loaded. Classes and functions, which are defined within the config file itself, can not be imported from
+    anywhere, which is why configs containing those can not be cached at all.
+
+    CHANGELOG
+
+    Added 17.10.2026
+    """
+    FILE_NAME = '.config_cache.pickle'
+
+    # This version has to be increased, whenever the structure of the cache file changes
+    VERSION = 2
+
+    def __init__(self, folder_path: str):
+        """
+        The constructor.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param folder_path: The path of the rewardify config folder
+        """
+        environment_config: EnvironmentConfig = EnvironmentConfig.instance()
+
+        self.folder_path = folder_path
+        self.config_path = os.path.join(folder_path, environment_config.CONFIG_FILE_NAME)
+        self.path = os.path.join(folder_path, self.FILE_NAME)
+
+    def get_key(self) -> Dict:
+        """
+        Returns the dict, which identifies the current version of the config file. A cache is only valid for the very
+        same key.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :return:
+        """
+        stat = os.stat(self.config_path)
+        with open(self.config_path, mode='rb') as file:
+            digest = hashlib.sha256(file.read()).hexdigest()
+
+        return {
+            'version':  self.VERSION,
+            'mtime':    stat.st_mtime_ns,
+            'size':     stat.st_size,
+            'sha256':   digest
+        }
+
+    def load(self) -> Optional[Dict]:
+        """
+        Returns the dict with the config values from the cache file. If there is no cache file or the cache file does
+        not belong to the current config file, None is returned instead.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :return:
+        """
+        cache = self.read()
+        return None if cache is None else cache[0]
+
+    def read(self) -> Optional[Tuple[Dict, Dict[str, bytes]]]:
+        """
+        Returns a tuple with the dict of the config values and the dict of the pickled catalogs from the cache file.
+        The keys of the catalogs are their kinds. If there is no cache file or the cache file does not belong to the
+        current config file, None is returned instead.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :return:
+        """
+        try:
+            with open(self.path, mode='rb') as file:
+                cache = pickle.load(file)
+
+            if cache['key'] != self.get_key():
+                return None
+
+            values = {name: self.decode(value) for name, value in cache['values'].items()}
+            return values, cache['catalogs']
+        # A broken cache must never prevent the config from being loaded. It is simply ignored.
+        except Exception:
+            return None
+
+    def dump(self, values: Dict, catalogs: Dict[str, catalog.Catalog] = None) -> bool:
+        """
+        Saves the given dict of config values and the catalogs, which have been built from them, into the cache file.
+        Returns whether the values could be cached.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        Changed 17.10.2026
+        The file is written with the shared "atomic_write" of the concurrency module.
+
+        Changed 17.10.2026
+        Added the catalogs.
+
+        :param values:
+        :param catalogs: The dict, whose keys are the kinds and the values the catalogs of that kind
+        :return:
+        """
+        try:
+            cache = {
+                'key':      self.get_key(),
+                'values':   {name: self.encode(value) for name, value in values.items()},
+                # The catalogs are pickled on their own, so that they only have to be unpickled by the commands, which
+                # actually use them
+                'catalogs': {kind: pickle.dumps(catalog, protocol=pickle.HIGHEST_PROTOCOL)
+                             for kind, catalog in (catalogs or {}).items()}
+            }
+            content = pickle.dumps(cache, protocol=pickle.HIGHEST_PROTOCOL)
+        except (TypeError, ValueError, pickle.PicklingError, AttributeError):
+            return False
+
+        # The cache is written atomically, so that another process can never read a half written cache
+        try:
+            atomic_write(self.path, content)
+        # The user might not have the permission to write into the config folder, in which case the config is simply
+        # not cached
+        except OSError:
+            return False
+
+        return True
+
+    def delete(self):
+        """
+        Deletes the cache file, if it exists
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :return:
+        """
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    # HELPER METHODS
+    # --------------
+
+    @classmethod
+    def encode(cls, value):
+        """
+        Returns the tuple, which represents the given config value within the cache file. Raises a ValueError if the
+        value can not be cached.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :raises: ValueError
+
+        :param value:
+        :return:
+        """
+        if isinstance(value, types.ModuleType):
+            return 'module', value.__name__
+
+        if isinstance(value, (type, types.FunctionType)):
+            # The config file is executed as the module "config", which can not be imported again
+            if value.__module__ == 'config':
+                raise ValueError('"{}" is defined within the config file and can not be cached'.format(value))
+            return 'reference', value.__module__, value.__qualname__
+
+        # The pickling of the plain values is tested right away, so that the whole config fails to be cached and not
+        # only this one value
+        pickle.dumps(value)
+        return 'value', value
+
+    @classmethod
+    def decode(cls, encoded):
+        """
+        Returns the config value for the given tuple from the cache file
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param encoded:
+        :return:
+        """
+        kind = encoded[0]
+        if kind == 'module':
+            return importlib.import_module(encoded[1])
+
+        if kind == 'reference':
+            value = importlib.import_module(encoded[1])
+            for attribute in encoded[2].split('.'):
+                value = getattr(value, attribute)
+            return value
+
+        return encoded[1]
+
+
+# ##################
+# LOADING THE CONFIG
+# ##################
+
+
+def get_config_names(config_path: str):
+    """
+    Returns the sorted list of all the names used within the config file at the given path. These are the names, which
+    the EnvironmentConfig sets as its attributes, when loading the config file.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param config_path:
+    :return:
+    """
+    with open(config_path, mode='r') as file:
+        source = file.read()
+
+    root = ast.parse(source, filename=config_path)
+    return sorted({node.id for node in ast.walk(root) if isinstance(node, ast.Name)})
+
+
+def compile_config(environment_config: EnvironmentConfig) -> Dict:
+    """
+    Loads the config file the usual way (by executing it) and saves the resulting values into the cache. Returns the
+    dict of the config values.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    Changed 17.10.2026
+    The catalogs of the rewards and packs are saved into the cache as well.
+
+    :param environment_config:
+    :return:
+    """
+    environment_config.load_config()
+
+    cache = ConfigCache(environment_config.folder_path)
+    names = get_config_names(cache.config_path)
+    values = {name: getattr(environment_config, name) for name in names if hasattr(environment_config, name)}
+    catalogs = {kind: catalog.get_catalog(kind) for kind in catalog.KIND_ATTRIBUTES.keys()}
+
+    # If the new values could not be cached, an old cache file would still be invalid because of its key. But there is
+    # no reason to keep it around.
+    if not cache.dump(values, catalogs):
+        try:
+            cache.delete()
+        except OSError:
+            pass
+
+    return values
+
+
+def load_config(environment_config: EnvironmentConfig):
+    """
+    This is the replacement for "EnvironmentConfig.load". It loads the config values from the cache, if the cache is
+    valid for the current config file. Otherwise the config file is executed and the cache is rebuilt.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    Changed 17.10.2026
+    The catalogs are restored from the cache as well.
+
+    :param environment_config:
+    :return:
+    """
+    cache = ConfigCache(environment_config.folder_path)
+    cached = cache.read()
+
+    if cached is None:
+        compile_config(environment_config)
+    else:
+        values, catalogs = cached
+        for name, value in values.items():
+            setattr(environment_config, name, value)
+
+        # The catalogs from the cache belong to the config values, which have just been set
+        catalog.restore_catalogs(catalogs)
+
+    environment_config.load_database()
+
+
+# ###########
+# THE COMMAND
+# ###########
+
+
+@click.group(name='config')
+def config():
+    pass
+
+
+@config.command('compile')
+@requires()
+def compiling():
+    """
+    Loads the config file and saves it into the compiled config cache.
+    """
+    environment_config: EnvironmentConfig = EnvironmentConfig.instance()
+    templater: Templater = Templater.instance()
+
+    values = compile_config(environment_config)
+    cache = ConfigCache(environment_config.folder_path)
+
+    context = {
+        'path':         cache.path,
+        'cached':       os.path.exists(cache.path),
+        'count':        len(values),
+        'rewards':      len(environment_config.REWARDS),
+        'packs':        len(environment_config.PACKS)
+    }
+    templater.echo_template('config_compiled.jinja2', context)
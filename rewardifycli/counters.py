@@ -0,0 +1,210 @@
+"""
+This module maintains the materialized inventory counters (see "rewardifycli.models.InventoryCounter").
+
+Instead of loading every single reward and pack of a user only to count them, the amount of items per user, kind and
+name is saved in its own table. This table is kept in sync with the reward and pack tables by database triggers, which
+means that every write is covered, no matter if it is done by the rewardify facade or by the bulk operations of the
+cli. The triggers are only supported for sqlite databases. For all other databases the counts are computed with an
+aggregate query instead.
+
+CHANGELOG
+
+Added 17.10.2026
+"""
+# standard library
+from typing import Dict
+
+# third party
+from peewee import SqliteDatabase, Value, fn
+
+from rewardify.models import User, Pack, Reward, DATABASE_PROXY
+
+# local
+from rewardifycli.models import InventoryCounter
+from rewardifycli.concurrency import write_transaction
+
+
+# The keys are the item kinds, which are counted and the values the models of the corresponding tables
+KIND_MODELS = {
+    'reward':   Reward,
+    'pack':     Pack
+}
+
+# These are the templates for the sqlite triggers. They have to be formatted with the "kind" of the items, the "table"
+# name of the items and the "counter" table name.
+INCREMENT_SQL = (
+    'INSERT INTO "{counter}" ("user_id", "kind", "name", "count") '
+    'VALUES ({row}."user_id", \'{kind}\', {row}."name", 1) '
+    'ON CONFLICT ("user_id", "kind", "name") DO UPDATE SET "count" = "count" + 1;'
+)
+DECREMENT_SQL = (
+    'UPDATE "{counter}" SET "count" = "count" - 1 '
+    'WHERE "user_id" = {row}."user_id" AND "kind" = \'{kind}\' AND "name" = {row}."name"; '
+    'DELETE FROM "{counter}" '
+    'WHERE "user_id" = {row}."user_id" AND "kind" = \'{kind}\' AND "name" = {row}."name" AND "count" <= 0;'
+)
+TRIGGERS = {
+    'insert':   'AFTER INSERT ON "{table}" BEGIN ' + INCREMENT_SQL.replace('{row}', 'NEW') + ' END',
+    'delete':   'AFTER DELETE ON "{table}" BEGIN ' + DECREMENT_SQL.replace('{row}', 'OLD') + ' END',
+    'update':   'AFTER UPDATE OF "user_id", "name" ON "{table}" BEGIN ' +
+                DECREMENT_SQL.replace('{row}', 'OLD') + ' ' + INCREMENT_SQL.replace('{row}', 'NEW') + ' END'
+}
+
+
+def is_supported() -> bool:
+    """
+    Returns whether the counters can be maintained by triggers for the currently used database.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :return:
+    """
+    return isinstance(DATABASE_PROXY.obj, SqliteDatabase)
+
+
+def install() -> bool:
+    """
+    Creates the counter table and the triggers, which keep it in sync, if they do not exist already. If the table had
+    to be created, the counters are computed from the existing items right away. Returns whether the counters are
+    supported by the database.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :return:
+    """
+    if not is_supported():
+        return False
+
+    database = DATABASE_PROXY.obj
+    triggers = get_triggers()
+
+    # This is called by every single process, which uses the database. Usually everything already exists, in which
+    # case the write lock of the database is not acquired at all, so that the processes do not wait for each other.
+    existing = {row[0] for row in database.execute_sql(
+        'SELECT "name" FROM "sqlite_master" WHERE "type" = \'trigger\''
+    )}
+    if InventoryCounter.table_exists() and set(triggers.keys()) <= existing:
+        return True
+
+    with write_transaction():
+        created = not InventoryCounter.table_exists()
+        database.create_tables([InventoryCounter], safe=True)
+
+        for trigger_name, sql in triggers.items():
+            database.execute_sql('CREATE TRIGGER IF NOT EXISTS "{}" {}'.format(trigger_name, sql))
+
+        # Installing the counters on an existing database, which already contains items
+        if created:
+            rebuild()
+
+    return True
+
+
+def get_triggers() -> Dict[str, str]:
+    """
+    Returns a dict, whose keys are the names of the triggers, which maintain the counters, and the values the sql
+    definitions of these triggers.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :return:
+    """
+    triggers = {}
+    for kind, model in KIND_MODELS.items():
+        for event, template in TRIGGERS.items():
+            trigger_name = '{}_{}_counter'.format(model._meta.table_name, event)
+            triggers[trigger_name] = template.format(
+                table=model._meta.table_name,
+                counter=InventoryCounter._meta.table_name,
+                kind=kind
+            )
+
+    return triggers
+
+
+def rebuild() -> int:
+    """
+    Deletes all the counters and computes them again from the reward and pack tables. This can be used to repair the
+    counters, if they should have drifted from the actual items for any reason. Returns the number of counters.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :return:
+    """
+    with DATABASE_PROXY.atomic():
+        InventoryCounter.delete().execute()
+
+        for kind, model in KIND_MODELS.items():
+            # The kind is the same for all the counters of one table, which is why it is selected as a constant value
+            query = (model
+                     .select(model.user, Value(kind), model.name, fn.COUNT(model.id))
+                     .group_by(model.user, model.name))
+            fields = [InventoryCounter.user, InventoryCounter.kind, InventoryCounter.name, InventoryCounter.count]
+            InventoryCounter.insert_from(query, fields).execute()
+
+    return InventoryCounter.select().count()
+
+
+def get_counts(username: str, kind: str) -> Dict[str, int]:
+    """
+    Returns a dict, whose keys are the names of the items of the given kind ("reward" or "pack") and the values the
+    amount of these items, which the given user owns. Only items with a count of at least one are contained.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param username:
+    :param kind:
+    :return:
+    """
+    if is_supported():
+        query = (InventoryCounter
+                 .select(InventoryCounter.name, InventoryCounter.count)
+                 .join(User)
+                 .where((User.name == username) & (InventoryCounter.kind == kind) & (InventoryCounter.count > 0))
+                 .order_by(InventoryCounter.name))
+        return {name: count for name, count in query.tuples()}
+
+    # Without the triggers, the counts have to be computed from the items themselves. This at least only transfers one
+    # row per distinct item name and not all the items.
+    model = KIND_MODELS[kind]
+    query = (model
+             .select(model.name, fn.COUNT(model.id))
+             .join(User)
+             .where(User.name == username)
+             .group_by(model.name)
+             .order_by(model.name))
+    return {name: count for name, count in query.tuples()}
+
+
+def get_count(username: str, kind: str, name: str) -> int:
+    """
+    Returns the amount of items of the given kind with the given name, which the given user owns.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param username:
+    :param kind:
+    :param name:
+    :return:
+    """
+    if is_supported():
+        query = (InventoryCounter
+                 .select(InventoryCounter.count)
+                 .join(User)
+                 .where((User.name == username) & (InventoryCounter.kind == kind) & (InventoryCounter.name == name)))
+        return query.scalar() or 0
+
+    model = KIND_MODELS[kind]
+    return model.select().join(User).where((User.name == username) & (model.name == name)).count()
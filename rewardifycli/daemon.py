@@ -0,0 +1,231 @@
+"""
+This module contains the "serve" command, which starts a long running daemon process. The daemon loads the config,
+connects to the database and prepares the templates only once and then executes the commands, which are sent to it by
+the thin client (see "rewardifycli.client") over a unix domain socket.
+
+CHANGELOG
+
+Added 17.10.2026
+"""
+# standard library
+import io
+import os
+import json
+import traceback
+import contextlib
+import socketserver
+
+from typing import Dict
+
+# third party
+import click
+
+from rewardify.env import EnvironmentConfig
+
+# local
+from rewardifycli.util import Templater, UserCredentials, requires
+from rewardifycli.client import SOCKET_FILE_NAME, SOCKET_ENVIRONMENT_VARIABLE
+
+# The keys of the request dict, which are passed on to the command as global options of the main group
+GLOBAL_OPTIONS = {
+    'session':      '--session',
+    'format':       '--format',
+    'max_age':      '--max-age'
+}
+
+
+# ######################
+# STREAMING THE RESPONSE
+# ######################
+
+
+class FrameWriter(io.TextIOBase):
+    """
+    This is a text stream, which sends everything that is written to it as a JSON line frame to the client. Instances
+    of this class replace stdout and stderr, while the daemon executes a command, so that all the output of the command
+    is directly streamed to the client.
+
+    CHANGELOG
+
+    Added 17.10.2026
+    """
+    encoding = 'utf-8'
+
+    def __init__(self, file, stream: str):
+        """
+        The constructor.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param file: The binary write file of the client connection
+        :param stream: Either "stdout" or "stderr"
+        """
+        super(FrameWriter, self).__init__()
+        self.file = file
+        self.stream = stream
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: str) -> int:
+        # Click checks if a stream is a text stream by attempting to write bytes to it, which has to fail for a
+        # text stream
+        if not isinstance(data, str):
+            raise TypeError('FrameWriter only accepts strings!')
+
+        if data:
+            frame = {'stream': self.stream, 'data': data}
+            self.file.write(json.dumps(frame).encode('utf-8') + b'\n')
+            self.file.flush()
+        return len(data)
+
+
+# ##########
+# THE SERVER
+# ##########
+
+
+class CommandHandler(socketserver.StreamRequestHandler):
+    """
+    This handler is created for every connection of a client. It reads the request, executes the command within the
+    daemon process and streams the output back to the client.
+
+    CHANGELOG
+
+    Added 17.10.2026
+    """
+    def handle(self):
+        """
+        Handles a single client request.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :return:
+        """
+        line = self.rfile.readline()
+        if not line:
+            return
+
+        request = json.loads(line.decode('utf-8'))
+        exit_code = self.execute(request)
+        self.wfile.write(json.dumps({'exit': exit_code}).encode('utf-8') + b'\n')
+        self.wfile.flush()
+
+    def execute(self, request: Dict) -> int:
+        """
+        Executes the command described by the given request dict and returns the exit code.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param request:
+        :return:
+        """
+        # The import is done here, because the main module is the one importing this module in the first place
+        from rewardifycli.main import invoke
+
+        stdout = FrameWriter(self.wfile, 'stdout')
+        stderr = FrameWriter(self.wfile, 'stderr')
+
+        # Another process might have logged in a different user since the last command, which is why the credentials
+        # have to be loaded from the file again for every single command
+        credentials: UserCredentials = UserCredentials.instance()
+        credentials.load()
+
+        # The daemon process does not share the environment of the client, so the values from the environment of the
+        # client are passed on as the corresponding global options
+        argv = request['argv']
+        for key, option in GLOBAL_OPTIONS.items():
+            if request.get(key):
+                argv = [option, request[key]] + argv
+
+        previous_cwd = os.getcwd()
+        try:
+            os.chdir(request.get('cwd', previous_cwd))
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                try:
+                    return invoke(argv, color=request.get('color', False))
+                # An error within a single command must never take down the whole daemon
+                except Exception:
+                    stderr.write(traceback.format_exc())
+                    return 1
+        finally:
+            os.chdir(previous_cwd)
+
+
+class CommandServer(socketserver.UnixStreamServer):
+    """
+    The unix domain socket server of the daemon.
+
+    NOTE: This server handles the requests one after another on purpose. The rewardify facade and the other singletons
+    are not thread safe and the database would serialize the write operations anyways.
+
+    CHANGELOG
+
+    Added 17.10.2026
+    """
+    def __init__(self, socket_path: str):
+        """
+        The constructor.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param socket_path:
+        """
+        # A socket file, which is left over from a previous daemon, which was not shut down properly, would prevent
+        # the binding of the new socket
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+        # The daemon executes the commands with the permissions of its own user, so nobody else should be able to
+        # connect to it. The umask makes sure, that the socket file is created with these permissions right away,
+        # instead of changing them after the binding, when someone else could already have connected.
+        umask = os.umask(0o177)
+        try:
+            super(CommandServer, self).__init__(socket_path, CommandHandler)
+        finally:
+            os.umask(umask)
+        self.socket_path = socket_path
+
+    def server_close(self):
+        super(CommandServer, self).server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+# ###########
+# THE COMMAND
+# ###########
+
+
+@click.command('serve')
+@click.option('-s', '--socket', 'socket_path', envvar=SOCKET_ENVIRONMENT_VARIABLE, default=None)
+@requires('config', 'database', 'backend')
+def serve(socket_path):
+    """
+    Starts a daemon, which keeps the config, the database connection and the templates loaded and executes the
+    commands sent to it by the "rewardify-client" command.
+    """
+    environment_config: EnvironmentConfig = EnvironmentConfig.instance()
+    if socket_path is None:
+        socket_path = os.path.join(environment_config.folder_path, SOCKET_FILE_NAME)
+
+    # Creating the jinja environment of the templater here already (it is created lazily otherwise), so that the
+    # first command does not have to pay for importing jinja and setting up the environment
+    Templater.instance().environment
+
+    server = CommandServer(socket_path)
+    click.echo('Rewardify daemon listening on "{}"'.format(socket_path))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,42 @@
+"""
+This module contains the "db" command group, which contains the maintenance commands for the database.
+
+CHANGELOG
+
+Added 17.10.2026
+"""
+# third party
+import click
+
+# local
+from rewardifycli import counters
+
+from rewardifycli.concurrency import write_transaction
+
+from rewardifycli.util import Templater, requires
+
+
+@click.group(name='db')
+def db():
+    pass
+
+
+@db.command('rebuild-counters')
+@requires('config', 'database')
+def rebuild_counters():
+    """
+    Computes the inventory counters of all users again from the actual rewards and packs.
+    """
+    templater: Templater = Templater.instance()
+
+    # Without the support for the triggers, there are no counters, which could be rebuilt
+    counter_count = 0
+    if counters.install():
+        with write_transaction():
+            counter_count = counters.rebuild()
+
+    context = {
+        'count':        counter_count,
+        'triggers':     counters.is_supported()
+    }
+    templater.echo_template('counters_rebuilt.jinja2', context)
@@ -0,0 +1,385 @@
+"""
+This module contains the exact calculation of the pack economics behind the "packs stats" command.
+
+Unlike the Monte Carlo simulation (see "rewardifycli.simulation"), the statistics in here are derived analytically from
+the slot probabilities of a pack and the rewards of the config, so that they are exact even for very rare drops:
+
+- The distribution of the number of rewards of every rarity within a pack is the convolution of the distributions of
+  the single slots.
+- The expected recycle dust of a pack is the sum of the expectations of the slots, which results in the expected ratio
+  between the gold spent on the pack and the dust, which it is worth.
+- The expected number of packs to obtain one specific reward follows from the probability, that a pack contains it.
+- The expected number of packs to complete the set is computed with a memoized dynamic program over the number of
+  obtained rewards of every rarity.
+
+Since the set completion can take a while for big catalogs, the results are cached within the config folder. The cache
+is keyed on the hash of the part of the config, which the statistics depend on.
+
+CHANGELOG
+
+Added 17.10.2026
+"""
+# standard library
+import os
+import json
+import pickle
+import hashlib
+import itertools
+
+from typing import Dict, List, Optional, Tuple
+
+# third party
+import numpy as np
+
+from rewardify.env import EnvironmentConfig
+
+from rewardify.rarity import Rarity
+
+# local
+from rewardifycli.simulation import PackModel
+from rewardifycli.concurrency import atomic_write
+
+
+# The set completion is only computed, if the dynamic program has at most this many states. The number of states is
+# the product of the number of rewards of every rarity (plus one).
+MAX_SET_STATES = 10 ** 5
+
+
+# ##############
+# THE STATISTICS
+# ##############
+
+
+def get_count_distributions(probability_matrix: np.ndarray) -> np.ndarray:
+    """
+    Given the matrix of the slot probabilities (one row for every slot and one column for every rarity), this method
+    returns the matrix with one row for every rarity, which contains the probabilities, that a pack contains exactly
+    0, 1, ... (up to the number of slots) rewards of that rarity.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param probability_matrix:
+    :return:
+    """
+    slots, rarities = probability_matrix.shape
+    distributions = np.zeros((rarities, slots + 1))
+    for rarity in range(rarities):
+        # Every slot either contains a reward of the rarity or it does not, so the number of rewards is the sum of
+        # these independent events and its distribution the convolution of their distributions
+        distribution = np.array([1.0])
+        for probability in probability_matrix[:, rarity]:
+            distribution = np.convolve(distribution, [1 - probability, probability])
+        distributions[rarity] = distribution
+
+    return distributions
+
+
+def get_expected_set_packs(probability_matrix: np.ndarray, counts: np.ndarray) -> Optional[float]:
+    """
+    Given the matrix of the slot probabilities and the number of rewards of every rarity, this method returns the
+    expected number of packs, which have to be opened to obtain every reward at least once. Only the rarities, which can
+    be contained in the pack, are part of the set. If the set is too big for the exact calculation, None is returned.
+
+    All the rewards of a rarity have the same probability, so the state of a collector is fully described by the number
+    of rewards of every rarity, which the collector already owns. The slots of a pack are opened one after the other,
+    so that the state only changes by a single reward at a time. For every state, the expected number of further packs
+    is computed from the states with one more reward, which is why the states are processed in reverse order and
+    memoized. The packs, which only contain duplicates, lead back into the same state, which is accounted for by
+    solving the linear equation of the state with itself.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param probability_matrix:
+    :param counts:
+    :return:
+    """
+    rarities = [index for index in range(len(counts)) if probability_matrix[:, index].max() > 0]
+    sizes = tuple(int(counts[index]) for index in rarities)
+    matrix = probability_matrix[:, rarities]
+    slots = len(matrix)
+
+    if int(np.prod([size + 1 for size in sizes])) > MAX_SET_STATES:
+        return None
+
+    # The keys are the states and the values the lists with the expected number of further packs for every slot
+    # position within the current pack. The packs, which are already opened, are not counted.
+    memo: Dict[Tuple[int, ...], List[float]] = {}
+
+    def get_further_packs(state: Tuple[int, ...], slot: int) -> float:
+        if state == sizes:
+            return 0.0
+        # After the last slot, the next pack has to be opened
+        if slot == slots:
+            return 1.0 + memo[state][0]
+        return memo[state][slot]
+
+    for state in reversed(list(itertools.product(*(range(size + 1) for size in sizes)))):
+        if state == sizes:
+            memo[state] = [0.0] * slots
+            continue
+
+        # The expectation at every slot position is expressed as "constant + factor * expectation at the first slot"
+        constants = [0.0] * (slots + 1)
+        factors = [0.0] * (slots + 1)
+        constants[slots], factors[slots] = 1.0, 1.0
+        for slot in reversed(range(slots)):
+            constant, duplicate = 0.0, 0.0
+            for index, size in enumerate(sizes):
+                probability = matrix[slot, index]
+                if probability == 0:
+                    continue
+
+                owned = state[index] / size
+                duplicate += probability * owned
+                if state[index] < size:
+                    next_state = state[:index] + (state[index] + 1,) + state[index + 1:]
+                    constant += probability * (1 - owned) * get_further_packs(next_state, slot + 1)
+
+            constants[slot] = constant + duplicate * constants[slot + 1]
+            factors[slot] = duplicate * factors[slot + 1]
+
+        first = constants[0] / (1 - factors[0])
+        memo[state] = [constants[slot] + factors[slot] * first for slot in range(slots)]
+
+    # The first pack has to be opened in any case
+    return float(1.0 + memo[tuple(0 for _ in sizes)][0])
+
+
+def calculate_pack_stats(model: PackModel, cost: int) -> Dict:
+    """
+    Returns the dict with the exact statistics of the given pack model with the given cost in gold: The "rarities" list
+    contains a dict for every rarity with the number of "rewards" of that rarity, the "distribution" of the number of
+    these rewards within a pack, the expected number "per_pack", the probability of a pack to contain "at_least_one" of
+    them and the expected number of packs to obtain one specific reward of that rarity ("packs_per_reward"). The
+    "dust" dict contains the "mean" and the standard deviation ("std") of the recycle dust per pack and the dust
+    "per_gold". The "set" dict contains the "size" of the set and the expected number of "packs" and "gold" to complete
+    it.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param model:
+    :param cost:
+    :return:
+    """
+    matrix = model.probability_matrix
+    distributions = get_count_distributions(matrix)
+
+    rarities = []
+    for index, rarity in enumerate(Rarity.RARITIES):
+        count = int(model.counts[index])
+        # The probability of a pack to contain one specific reward of the rarity
+        probability = 1 - np.prod(1 - matrix[:, index] / count) if count > 0 else 0.0
+        rarities.append({
+            'rarity':               rarity,
+            'rewards':              count,
+            'distribution':         [float(value) for value in distributions[index]],
+            'per_pack':             float(matrix[:, index].sum()),
+            'at_least_one':         float(1 - distributions[index][0]),
+            'reward_per_pack':      float(probability),
+            'packs_per_reward':     float(1 / probability) if probability > 0 else None
+        })
+
+    # The mean and the second moment of the recycle dust of a single reward of every rarity
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = np.bincount(model.rarity_indices, weights=model.recycle, minlength=len(Rarity.RARITIES)) / model.counts
+        squares = np.bincount(model.rarity_indices, weights=model.recycle ** 2, minlength=len(Rarity.RARITIES))
+        squares /= model.counts
+    means, squares = np.nan_to_num(means), np.nan_to_num(squares)
+
+    # The slots are independent, so the means and the variances of the slots add up
+    slot_means = matrix @ means
+    mean = float(slot_means.sum())
+    variance = float((matrix @ squares - slot_means ** 2).sum())
+
+    set_packs = get_expected_set_packs(matrix, model.counts)
+
+    return {
+        'rarities':     rarities,
+        'dust': {
+            'mean':         mean,
+            'std':          max(variance, 0.0) ** 0.5,
+            'per_gold':     mean / cost if cost > 0 else None
+        },
+        'set': {
+            'size':         int(model.counts[model.possible].sum()),
+            'packs':        set_packs,
+            'gold':         set_packs * cost if set_packs is not None else None
+        }
+    }
+
+
+def get_pack_stats(name: str, use_cache: bool = True) -> Tuple[Dict, bool]:
+    """
+    Returns a tuple, whose first element is the dict with the exact statistics of the pack with the given name (see
+    "calculate_pack_stats") and whose second element is whether they have been loaded from the cache.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param name:
+    :param use_cache: Whether the cache is used. If False, the statistics are calculated and cached anew.
+    :return:
+    """
+    config: EnvironmentConfig = EnvironmentConfig.instance()
+    cache = StatsCache(config.folder_path)
+    digest = get_config_digest(name)
+
+    if use_cache:
+        stats = cache.load(digest)
+        if stats is not None:
+            return stats, True
+
+    stats = calculate_pack_stats(PackModel.from_config(name), config.PACKS[name]['cost'])
+    cache.dump(digest, stats)
+
+    return stats, False
+
+
+def get_reward_stats(name: str, stats: Dict) -> Dict:
+    """
+    Given the name of a reward and the statistics of a pack, this method returns the dict with the statistics of
+    obtaining this reward from the pack: The "name" and the "rarity" of the reward, the probability of a pack to
+    contain it ("per_pack") and the expected number of "packs" to obtain it.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param name:
+    :param stats:
+    :return:
+    """
+    config: EnvironmentConfig = EnvironmentConfig.instance()
+    rarity = str(Rarity(config.REWARDS[name]['rarity']))
+    rarity_stats = next(item for item in stats['rarities'] if item['rarity'] == rarity)
+
+    return {
+        'name':         name,
+        'rarity':       rarity,
+        'per_pack':     rarity_stats['reward_per_pack'],
+        'packs':        rarity_stats['packs_per_reward']
+    }
+
+
+# #########
+# THE CACHE
+# #########
+
+
+def get_config_digest(name: str) -> str:
+    """
+    Returns the hash of the part of the config, on which the statistics of the pack with the given name depend: The
+    config of the pack itself and the rarity and the recycle dust of all the rewards. Changes to any other part of the
+    config (like the descriptions or the costs of the rewards) do not change the hash.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param name:
+    :return:
+    """
+    config: EnvironmentConfig = EnvironmentConfig.instance()
+    relevant = {
+        'version':  StatsCache.VERSION,
+        'pack':     config.PACKS[name],
+        'rewards':  [(reward_name, str(reward_config['rarity']), reward_config['recycle'])
+                     for reward_name, reward_config in config.REWARDS.items()]
+    }
+    content = json.dumps(relevant, sort_keys=True, default=str)
+
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class StatsCache:
+    """
+    Instances of this class manage the cache file for the pack statistics within the given config folder. The cache
+    contains the statistics for the most recently calculated config hashes.
+
+    CHANGELOG
+
+    Added 17.10.2026
+    """
+    FILE_NAME = '.pack_stats_cache.pickle'
+
+    # This version has to be increased, whenever the structure of the statistics changes
+    VERSION = 1
+
+    # The number of statistics, which are kept within the cache. The oldest ones are dropped first.
+    MAX_ENTRIES = 100
+
+    def __init__(self, folder_path: str):
+        """
+        The constructor.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param folder_path: The path of the rewardify config folder
+        """
+        self.folder_path = folder_path
+        self.path = os.path.join(folder_path, self.FILE_NAME)
+
+    def load(self, digest: str) -> Optional[Dict]:
+        """
+        Returns the cached statistics for the given config hash or None, if there are none.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param digest:
+        :return:
+        """
+        return self.read().get(digest)
+
+    def dump(self, digest: str, stats: Dict) -> bool:
+        """
+        Saves the given statistics for the given config hash into the cache file. Returns whether they could be cached.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        Changed 17.10.2026
+        The file is written with the shared "atomic_write" of the concurrency module.
+
+        :param digest:
+        :param stats:
+        :return:
+        """
+        entries = self.read()
+        entries.pop(digest, None)
+        entries[digest] = stats
+        for old_digest in list(entries.keys())[:-self.MAX_ENTRIES]:
+            del entries[old_digest]
+
+        content = pickle.dumps(entries, protocol=pickle.HIGHEST_PROTOCOL)
+
+        # Just like the config cache, the file is written atomically
+        try:
+            atomic_write(self.path, content)
+        except OSError:
+            return False
+
+        return True
+
+    # HELPER METHODS
+    # --------------
+
+    def read(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, mode='rb') as file:
+                entries = pickle.load(file)
+            return entries if isinstance(entries, dict) else {}
+        # A broken cache is simply ignored and calculated again
+        except Exception:
+            return {}
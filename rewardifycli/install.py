@@ -5,7 +5,7 @@ import click
 from rewardify.env import EnvironmentInstaller
 
 # local
-from rewardifycli.util import Templater
+from rewardifycli.util import Templater, requires
 
 
 @click.group(name='install')
@@ -15,11 +15,16 @@ def install():
 
 @install.command('run')
 @click.option('-p', '--path', 'path')
+@requires()
 def run(path):
     templater: Templater = Templater.instance()
 
     installer = EnvironmentInstaller(path)
     installer.install()
 
-    templater.echo_template('install.jinja2', {'path': path})
+    # 17.10.2026
+    # Now that the config folder exists, all the templates can be compiled into the bytecode cache within it
+    template_count = templater.compile(installer.get_config_folder_path())
+
+    templater.echo_template('install.jinja2', {'path': path, 'template_count': template_count})
 
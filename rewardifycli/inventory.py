@@ -6,25 +6,54 @@ import click
 
 from rewardify.main import Rewardify
 
+from rewardify.models import User
+
 # local
-from rewardifycli.util import login_required
+from rewardifycli import counters
+from rewardifycli import projections
+
+from rewardifycli.util import login_required, requires
 from rewardifycli.util import Templater, UserCredentials
 
 
 @click.command('inventory')
+@click.option('-i', '--items', 'items', is_flag=True,
+              help='List every single reward of the inventory instead of the amounts')
+@requires('config', 'database')
 @login_required
-def inventory():
+def inventory(items):
     credentials: UserCredentials = UserCredentials.instance()
     facade: Rewardify = Rewardify.instance()
     templater: Templater = Templater.instance()
     username = credentials['username']
 
+    # 17.10.2026
+    # The single rewards are streamed from the database right into the output, so that even a huge inventory is never
+    # loaded into memory all at once
+    if items:
+        templater.stream_template('inventory_items.jinja2', {'name': username}, projections.iter_rewards(username))
+        return
+
+    # 17.10.2026
+    # The inventory only displays the amount of every item, which is why the counts are taken directly from the
+    # inventory counters, instead of loading every single reward and pack of the user.
+    gold, dust = User.select(User.gold, User.dust).where(User.name == username).tuples().get()
+    reward_counts = counters.get_counts(username, 'reward')
+
+    # The rarity of the rewards is needed for the coloring. It is taken from the config. Rewards, which are no longer
+    # part of the config, are displayed as common.
+    reward_rarities = {}
+    for name in reward_counts.keys():
+        reward_parameters = facade.CONFIG.REWARDS.get(name, {})
+        reward_rarities[name] = reward_parameters.get('rarity', 'common')
+
     context = {
         'name':         username,
-        'dust':         facade.user_get_dust(username),
-        'gold':         facade.user_get_gold(username),
-        'rewards':      facade.user_get_rewards_by_name(username),
-        'packs':        facade.user_get_packs_by_name(username)
+        'dust':         dust,
+        'gold':         gold,
+        'rewards':      reward_counts,
+        'rarities':     reward_rarities,
+        'packs':        counters.get_counts(username, 'pack')
     }
 
     templater.echo_template('inventory.jinja2', context)
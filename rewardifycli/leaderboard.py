@@ -0,0 +1,245 @@
+"""
+This module contains the listing and the rankings of the users, which are used by the "users list" and "users top"
+commands.
+
+Both are computed by the database itself with a single (aggregate) query per page, instead of asking the facade for
+the values of every single user. The pages are selected with keyset pagination: Instead of an offset, which makes the
+database compute and skip all the rows of the previous pages, every page continues after the sort key of the last row
+of the previous page. This key is handed out as an opaque cursor string. The rows are streamed from the database
+cursor, so that a page is never in memory all at once.
+
+CHANGELOG
+
+Added 17.10.2026
+"""
+# standard library
+import json
+import base64
+
+from typing import Dict, Iterable, Iterator, Optional
+
+# third party
+from peewee import JOIN, fn
+
+from rewardify.models import User, Reward
+
+from rewardify.rarity import Rarity
+
+# local
+from rewardifycli import counters
+from rewardifycli.models import InventoryCounter
+from rewardifycli.projections import Record
+
+
+DEFAULT_PER_PAGE = 50
+
+# The metrics, by which the users can be ranked
+METRICS = ['gold', 'dust', 'rewards', 'legendary']
+
+
+# #################
+# THE CURSOR TOKENS
+# #################
+
+
+def encode_cursor(values: Dict) -> str:
+    """
+    Returns the cursor string, which encodes the given dict of values.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param values:
+    :return:
+    """
+    content = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(content).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, keys: Iterable[str] = ()) -> Dict:
+    """
+    Returns the dict of values, which is encoded in the given cursor string. The dict has to contain all the given
+    keys, which the cursors of the listing in question always contain.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    Changed 17.10.2026
+    Added the required keys, so that a cursor of a different listing results in a ValueError instead of a KeyError.
+
+    :raises: ValueError if the cursor is not valid
+
+    :param cursor:
+    :param keys:
+    :return:
+    """
+    try:
+        content = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(content.decode('utf-8'))
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError('The cursor "{}" is not valid'.format(cursor))
+
+    if not isinstance(values, dict) or not all(key in values for key in keys):
+        raise ValueError('The cursor "{}" is not valid'.format(cursor))
+    return values
+
+
+# ###########
+# THE RECORDS
+# ###########
+
+
+class UserRecord(Record):
+    """
+    The projection of a user for the listing. The cursor continues the listing after this user.
+
+    CHANGELOG
+
+    Added 17.10.2026
+    """
+    __slots__ = ('name', 'gold', 'dust', 'cursor')
+
+
+class RankRecord(Record):
+    """
+    The projection of a user for a ranking. Users with the same score share the same rank. The cursor continues the
+    ranking after this user.
+
+    CHANGELOG
+
+    Added 17.10.2026
+    """
+    __slots__ = ('rank', 'name', 'score', 'cursor')
+
+
+# ###########################
+# THE LISTING AND THE RANKING
+# ###########################
+
+
+def iter_users(after: Optional[str] = None, per_page: int = DEFAULT_PER_PAGE) -> Iterator[UserRecord]:
+    """
+    Returns an iterator over the records of the users on the page after the given cursor (None for the first page),
+    in the alphabetical order of the usernames.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :raises: ValueError if the cursor is not valid
+
+    :param after: The cursor of the last user of the previous page
+    :param per_page:
+    :return:
+    """
+    query = User.select(User.name, User.gold, User.dust)
+    if after is not None:
+        query = query.where(User.name > decode_cursor(after, ['name'])['name'])
+    query = query.order_by(User.name).limit(per_page)
+
+    # The cursor is decoded right away and not only, when the iteration starts, so that an invalid cursor is reported
+    # before anything has been echoed
+    rows = query.tuples().iterator()
+    return (UserRecord(name, gold, dust, encode_cursor({'name': name})) for name, gold, dust in rows)
+
+
+def iter_ranking(metric: str, after: Optional[str] = None, per_page: int = DEFAULT_PER_PAGE) -> Iterator[RankRecord]:
+    """
+    Returns an iterator over the records of the users on the page after the given cursor (None for the first page) of
+    the ranking by the given metric. The users are ordered by their score, the highest first, and users with the same
+    score by their names.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :raises: ValueError if the cursor is not valid
+
+    :param metric: One of the METRICS
+    :param after: The cursor of the last user of the previous page
+    :param per_page:
+    :return:
+    """
+    query, score = get_ranking_query(metric)
+
+    # The cursor does not only contain the sort key of the last user, but also its position and rank within the
+    # ranking. This way the ranks of the following users are known without counting all the users before them.
+    position, rank, previous_score = 0, 0, None
+    if after is not None:
+        values = decode_cursor(after, ['metric', 'position', 'rank', 'score', 'name'])
+        if values.get('metric') != metric:
+            raise ValueError('The cursor does not belong to the ranking by {}'.format(metric))
+
+        position, rank, previous_score = values['position'], values['rank'], values['score']
+        condition = (score < previous_score) | ((score == previous_score) & (User.name > values['name']))
+        query = query.having(condition) if is_aggregate(metric) else query.where(condition)
+
+    query = query.order_by(score.desc(), User.name).limit(per_page)
+
+    def generate(position: int, rank: int, previous_score) -> Iterator[RankRecord]:
+        for name, value in query.tuples().iterator():
+            position += 1
+            if value != previous_score:
+                rank = position
+            previous_score = value
+
+            cursor = encode_cursor({'metric': metric, 'name': name, 'score': value, 'position': position, 'rank': rank})
+            yield RankRecord(rank, name, value, cursor)
+
+    # Like for the listing, the generator is only created after the cursor has been decoded
+    return generate(position, rank, previous_score)
+
+
+def get_ranking_query(metric: str):
+    """
+    Returns a tuple of the query, which selects the name and the score of all the users for the given metric, and the
+    expression of the score.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param metric:
+    :return:
+    """
+    if metric == 'gold':
+        return User.select(User.name, User.gold), User.gold
+
+    if metric == 'dust':
+        return User.select(User.name, User.dust), User.dust
+
+    # The rewards are already counted by the inventory counters (as long as the database supports them), which are a
+    # lot less rows than the rewards themselves
+    if metric == 'rewards' and counters.is_supported():
+        score = fn.COALESCE(fn.SUM(InventoryCounter.count), 0)
+        join_condition = (InventoryCounter.user == User.id) & (InventoryCounter.kind == 'reward')
+        query = User.select(User.name, score).join(InventoryCounter, JOIN.LEFT_OUTER, on=join_condition)
+        return query.group_by(User.id), score
+
+    if metric == 'rewards':
+        join_condition = (Reward.user == User.id)
+    elif metric == 'legendary':
+        join_condition = (Reward.user == User.id) & (Reward.rarity == Rarity('legendary'))
+    else:
+        raise ValueError('There is no metric "{}"'.format(metric))
+
+    # The users without any rewards are part of the ranking as well, which is why it is a left join
+    score = fn.COUNT(Reward.id)
+    query = User.select(User.name, score).join(Reward, JOIN.LEFT_OUTER, on=join_condition)
+    return query.group_by(User.id), score
+
+
+def is_aggregate(metric: str) -> bool:
+    """
+    Returns whether the score of the given metric is an aggregate over multiple rows.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param metric:
+    :return:
+    """
+    return metric not in ['gold', 'dust']
@@ -10,13 +10,21 @@ import click
 from rewardify.main import Rewardify
 
 # local
-from rewardifycli.util import Templater, UserCredentials
+from rewardifycli.util import Templater, UserCredentials, SessionToken, requires
 
 
 @click.command('login')
 @click.argument('username')
 @click.argument('password')
-def login(password, username):
+@click.option('-l', '--lifetime', 'lifetime', type=click.IntRange(min=1), default=168,
+              help='The number of hours, after which the session expires')
+@click.option('-p', '--print-token', 'print_token', is_flag=True,
+              help='Only print the session token instead of saving it in the credentials file')
+@requires('config', 'database')
+def login(password, username, lifetime, print_token):
+    """
+    Logs in the user with the given USERNAME and PASSWORD by issuing a new session token for it.
+    """
     facade: Rewardify = Rewardify.instance()
     templater: Templater = Templater.instance()
 
@@ -31,10 +39,21 @@ def login(password, username):
         templater.echo_template('wrong_password.jinja2', context)
         raise click.Abort()
 
+    # 17.10.2026
+    # The password is only checked this one time. After that, the user is authenticated by the signed session token,
+    # which can be validated without the database.
+    token = SessionToken.issue(username, lifetime * 60 * 60)
+
+    # With this flag, the token is only printed, so that it can be passed to the other commands with the "--session"
+    # option (or the REWARDIFY_SESSION environment variable), without logging out the user of the credentials file.
+    if print_token:
+        click.echo(token)
+        return
+
     # The UserCredentials singleton provides easy access to the credentials saved in the temp file. After the username
-    # and password have been checked the new credentials can be saved persistently, so that every command after this
+    # and password have been checked the new session can be saved persistently, so that every command after this
     # one has access to them
     credentials: UserCredentials = UserCredentials.instance()
-    credentials.save(username, password)
+    credentials.save(username, token)
 
     templater.echo_template('login_success.jinja2', context)
@@ -1,32 +1,257 @@
+# standard library
+import importlib
+
+from typing import Dict, Tuple, List
+
 # third party
 import click
 
-from rewardify.env import EnvironmentConfig
-
 # local
-from rewardifycli.install import install
-from rewardifycli.packs import packs
-from rewardifycli.rewards import rewards
-from rewardifycli.inventory import inventory
-from rewardifycli.users import users
-from rewardifycli.login import login
-from rewardifycli.update import update
-
-
-@click.group(name='rewardify')
-def cli():
-    environment_config: EnvironmentConfig = EnvironmentConfig.instance()
-    environment_config.load()
-    environment_config.init()
-
-
-cli.add_command(install)
-cli.add_command(packs)
-cli.add_command(rewards)
-cli.add_command(inventory)
-cli.add_command(users)
-cli.add_command(login)
-cli.add_command(update)
+from rewardifycli.client import SESSION_ENVIRONMENT_VARIABLE, FORMAT_ENVIRONMENT_VARIABLE, MAX_AGE_ENVIRONMENT_VARIABLE
+from rewardifycli.profiling import Timings, phase, start_reports
+
+# ####################
+# LAZY COMMAND LOADING
+# ####################
+
+
+class LazyGroup(click.Group):
+    """
+    This is a click group, which does not need the sub commands to be imported at the time the group is being created.
+    Instead the sub commands are registered by the import path of the module, which contains them and the name of the
+    command object within that module. The module will only be imported, once the command is actually requested by the
+    command line parsing.
+
+    This matters, because the command modules all import the rewardify facade, the environment config and jinja (through
+    "rewardifycli.util") and importing all of them every time would make even a "rewardify --help" really slow.
+
+    CHANGELOG
+
+    Added 17.10.2026
+    """
+    def __init__(self, *args, lazy_commands: Dict[str, Tuple[str, str, str]] = None, **kwargs):
+        """
+        The constructor.
+
+        The "lazy_commands" dict maps the command name to a tuple of three strings: The import path of the module, the
+        name of the command object within that module and a short help text, which is used for the listing of the
+        commands in the help text of the group (so that the help text does not need the import either).
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param args:
+        :param lazy_commands:
+        :param kwargs:
+        """
+        super(LazyGroup, self).__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        """
+        Returns a sorted list with the names of all the commands of this group, the lazy ones and the ones, that have
+        been added directly.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param ctx:
+        :return:
+        """
+        commands = super(LazyGroup, self).list_commands(ctx)
+        return sorted(set(commands) | set(self.lazy_commands.keys()))
+
+    def get_command(self, ctx: click.Context, cmd_name: str):
+        """
+        Returns the command object for the given command name. If the command is one of the lazy commands, the module
+        containing it is being imported now. The loaded command is then added to the group as a normal command, so that
+        the import is only done once.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param ctx:
+        :param cmd_name:
+        :return:
+        """
+        if cmd_name not in self.commands and cmd_name in self.lazy_commands:
+            self.add_command(self.load_command(cmd_name), cmd_name)
+
+        return super(LazyGroup, self).get_command(ctx, cmd_name)
+
+    def load_command(self, cmd_name: str) -> click.Command:
+        """
+        Imports the module for the lazy command with the given name and returns the command object
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param cmd_name:
+        :return:
+        """
+        module_name, attribute_name, _ = self.lazy_commands[cmd_name]
+        # 17.10.2026
+        # The import of the command module is usually the slowest part of the start up, so it is its own phase
+        with phase('import'):
+            module = importlib.import_module(module_name)
+        return getattr(module, attribute_name)
+
+    def main(self, *args, **kwargs):
+        """
+        Runs the group as the main command. The timings of the phases are measured for every single invocation on its
+        own, even if it is nested within another command (like within a batch).
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        timings: Timings = Timings.instance()
+        with timings.isolated():
+            return super(LazyGroup, self).main(*args, **kwargs)
+
+    def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter):
+        """
+        Writes the listing of all the sub commands into the help text of the group.
+        This overwrites the default behaviour, because the default would load every single command to get the help
+        text from it. For the lazy commands, which have not been loaded yet, the static help text is used instead.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param ctx:
+        :param formatter:
+        :return:
+        """
+        rows = []
+        for cmd_name in self.list_commands(ctx):
+            if cmd_name in self.commands:
+                command = self.commands[cmd_name]
+                if command.hidden:
+                    continue
+                help_text = command.get_short_help_str(limit=formatter.width)
+            else:
+                help_text = self.lazy_commands[cmd_name][2]
+            rows.append((cmd_name, help_text))
+
+        if rows:
+            with formatter.section('Commands'):
+                formatter.write_dl(rows)
+
+
+# ##################
+# THE MAIN CLI GROUP
+# ##################
+
+# The keys are the names of the sub commands of the main "rewardify" group and the values are tuples of the module path,
+# the name of the command object in that module and the short help text for the help listing.
+# NOTE: When adding a new command to the cli, it has to be registered here.
+COMMANDS = {
+    'install':      ('rewardifycli.install', 'install', 'Install the rewardify environment'),
+    'packs':        ('rewardifycli.packs', 'packs', 'Buy, list and open packs'),
+    'rewards':      ('rewardifycli.rewards', 'rewards', 'Buy, list, use and recycle rewards'),
+    'inventory':    ('rewardifycli.inventory', 'inventory', 'Show the inventory of the logged in user'),
+    'users':        ('rewardifycli.users', 'users', 'Manage the users'),
+    'login':        ('rewardifycli.login', 'login', 'Log in a user'),
+    'update':       ('rewardifycli.update', 'update', 'Perform a backend update to grant gold'),
+    'serve':        ('rewardifycli.daemon', 'serve', 'Run a warm daemon, which executes the commands of the client'),
+    'batch':        ('rewardifycli.batch', 'batch', 'Execute many commands from a file in a single transaction'),
+    'db':           ('rewardifycli.db', 'db', 'Maintain the database'),
+    'config':       ('rewardifycli.config', 'config', 'Manage the compiled config cache'),
+}
+
+
+@click.group(name='rewardify', cls=LazyGroup, lazy_commands=COMMANDS)
+@click.option('--session', 'session', envvar=SESSION_ENVIRONMENT_VARIABLE, default=None,
+              help='A session token issued by "login --print-token" to use instead of the logged in user')
+@click.option('--format', 'output_format', type=click.Choice(['text', 'json', 'ndjson']), default='text',
+              envvar=FORMAT_ENVIRONMENT_VARIABLE,
+              help='The format of the output. "json" and "ndjson" are machine readable and skip the templates')
+@click.option('--max-age', 'max_age', type=click.FloatRange(min=0), default=None, envvar=MAX_AGE_ENVIRONMENT_VARIABLE,
+              help='Start a backend update in the background, if the last one is older than this number of seconds')
+@click.option('--timings', 'timings', is_flag=True,
+              help='Print the time spent in every phase of the command (import, config, database, auth, ...)')
+@click.option('--profile', 'profile_path', type=click.Path(dir_okay=False, writable=True), default=None,
+              help='Profile the command with cProfile and write the stats into the given file')
+@click.option('--profile-memory', 'profile_memory', is_flag=True,
+              help='Additionally trace the biggest memory allocations for the "--profile"')
+@click.pass_context
+def cli(ctx: click.Context, session, output_format, max_age, timings, profile_path, profile_memory):
+    # 17.10.2026
+    # The reports are echoed to stderr once the command has finished. The profile starts as early as possible, so
+    # that it covers everything from here on.
+    if timings or profile_path is not None:
+        start_reports(ctx, timings, profile_path, memory=profile_memory)
+
+    # 17.10.2026
+    # The config and the database are no longer initialized here for every command. Instead every command declares
+    # the resources it actually needs with the "requires" decorator and only those are initialized right before the
+    # command is executed (see "rewardifycli.util.Resources"). This way the listings never open the database and a
+    # process, which has already initialized everything (like the daemon), does not do it again.
+
+    # 17.10.2026
+    # The output format is always set, because a warm process (like the daemon) might still have the format of the
+    # previous command
+    from rewardifycli.util import Templater
+
+    templater: Templater = Templater.instance()
+    templater.output_format = output_format
+
+    # 17.10.2026
+    # A session token given for this invocation overrides the credentials of the credentials file. This way multiple
+    # users can work on the same machine at the same time.
+    if session:
+        from rewardifycli.util import UserCredentials
+
+        credentials: UserCredentials = UserCredentials.instance()
+        credentials.use_session(session)
+
+    # 17.10.2026
+    # The command itself never waits for the background update, it works with the data as it is right now. The update
+    # command itself does not need this, because it does the update anyways.
+    if max_age is not None and ctx.invoked_subcommand not in ('update', 'serve', 'install'):
+        from rewardifycli.singleflight import refresh_in_background
+
+        refresh_in_background(max_age, session)
+
+
+def invoke(args: List[str], **extra) -> int:
+    """
+    Runs the cli with the given list of command line arguments within the current process and returns the integer exit
+    code of the command instead of exiting the process. All the output is written to the current stdout/stderr.
+    All additional keyword arguments are passed on to the creation of the click context (for example "color").
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    Changed 17.10.2026
+    Removed the "warm" flag. The resources, which have already been initialized by the calling process, are skipped
+    automatically now.
+
+    :param args:
+    :param extra:
+    :return:
+    """
+    try:
+        # With "standalone_mode" disabled, click does not exit the process, but returns the exit code for "Exit"
+        # exceptions (which are used for "--help" for example) and raises all the others.
+        result = cli.main(args=args, prog_name='rewardify', standalone_mode=False, **extra)
+        return result if isinstance(result, int) else 0
+    except click.ClickException as e:
+        e.show()
+        return e.exit_code
+    except click.Abort:
+        click.echo('Aborted!', err=True)
+        return 1
 
 
 if __name__ == '__main__':
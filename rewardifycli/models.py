@@ -0,0 +1,129 @@
+"""
+This module contains the additional database models of the cli, which extend the models of the rewardify package.
+
+CHANGELOG
+
+Added 17.10.2026
+"""
+# standard library
+import datetime
+
+from typing import List
+
+# third party
+from peewee import CharField, IntegerField, TextField, DateTimeField, ForeignKeyField
+
+from rewardify.models import BaseModel, User, DATABASE_PROXY
+
+
+class InventoryCounter(BaseModel):
+    """
+    This model contains the amount of items of a kind ("reward" or "pack") with a certain name, which a user owns.
+    The rows of this table are a materialized version of "SELECT COUNT(*) ... GROUP BY user, name", which is kept in
+    sync with the reward and pack tables by database triggers (see "rewardifycli.counters").
+
+    CHANGELOG
+
+    Added 17.10.2026
+    """
+    user = ForeignKeyField(User, backref='counters', on_delete='CASCADE')
+    kind = CharField()
+    name = CharField()
+    count = IntegerField(default=0)
+
+    class Meta:
+        indexes = (
+            (('user', 'kind', 'name'), True),
+        )
+
+
+class UpdateCheckpoint(BaseModel):
+    """
+    This model contains the position (the "cursor"), up to which the activities of a user have already been processed
+    by the backend update, separately for every backend ("source"). The next incremental update only asks the backend
+    for the activities after this position (see "rewardifycli.updater").
+
+    The cursor is an arbitrary JSON value, which is chosen by the backend.
+
+    CHANGELOG
+
+    Added 17.10.2026
+    """
+    user = ForeignKeyField(User, backref='checkpoints', on_delete='CASCADE')
+    source = CharField()
+    cursor = TextField(null=True)
+    updated = DateTimeField(default=datetime.datetime.now)
+
+    class Meta:
+        indexes = (
+            (('user', 'source'), True),
+        )
+
+
+# These are the models, whose tables are created by "install". The table of the inventory counters is created by
+# "rewardifycli.counters.install" together with its triggers.
+MODELS = [
+    UpdateCheckpoint
+]
+
+# These are additional indexes on the tables of the rewardify package. The keys are the names of the indexes and the
+# values tuples of the model and the sql of the indexed columns. The leaderboard pages through the users in the order
+# of these columns, which the database can then read straight from the index (see "rewardifycli.leaderboard").
+INDEXES = {
+    'user_gold_name':   (User, '"gold" DESC, "name"'),
+    'user_dust_name':   (User, '"dust" DESC, "name"')
+}
+
+
+def install():
+    """
+    Creates the tables of the additional models of the cli and the additional indexes, if they do not exist already.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    Changed 17.10.2026
+    Also creates the additional indexes on the tables of the rewardify package.
+
+    :return:
+    """
+    # The import is done here, because the concurrency module is not needed for the models themselves
+    from rewardifycli.concurrency import write_transaction
+
+    # Checking for the tables only reads the database, so the write lock is only acquired, if a table is missing
+    missing = [model for model in MODELS if not model.table_exists()]
+    missing_indexes = get_missing_indexes()
+    if missing or missing_indexes:
+        with write_transaction():
+            DATABASE_PROXY.create_tables(missing, safe=True)
+
+            for index_name in missing_indexes:
+                model, columns = INDEXES[index_name]
+                DATABASE_PROXY.execute_sql('CREATE INDEX IF NOT EXISTS "{}" ON "{}" ({})'.format(
+                    index_name,
+                    model._meta.table_name,
+                    columns
+                ))
+
+
+def get_missing_indexes() -> List[str]:
+    """
+    Returns the list of the names of the additional indexes, which do not exist yet. Indexes on tables, which do not
+    exist, are not contained.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :return:
+    """
+    missing = []
+    for model in {model for model, _ in INDEXES.values()}:
+        if not model.table_exists():
+            continue
+
+        existing = {index.name for index in DATABASE_PROXY.get_indexes(model._meta.table_name)}
+        missing += [name for name, (index_model, _) in INDEXES.items() if index_model is model and name not in existing]
+
+    return sorted(missing)
@@ -1,13 +1,16 @@
-# standard library
-from collections import defaultdict
-
 # third party
 import click
 
 from rewardify.main import Rewardify
 
 # local
-from rewardifycli.util import login_required
+from rewardifycli import bulk
+from rewardifycli import projections
+from rewardifycli import catalog
+from rewardifycli import simulation
+from rewardifycli import economics
+
+from rewardifycli.util import login_required, requires, write_locked
 from rewardifycli.util import Templater, UserCredentials
 
 
@@ -18,16 +21,22 @@ def packs():
 
 @packs.command('buy')
 @click.argument('name')
+@requires('config', 'database')
 @login_required
+@write_locked
 def buy(name):
     credentials: UserCredentials = UserCredentials.instance()
     facade: Rewardify = Rewardify.instance()
     templater: Templater = Templater.instance()
     username = credentials['username']
 
+    # 17.10.2026
+    # A name, which does not exist, results in an error message with suggestions for the correct name
+    pack = catalog.require_item('pack', name)
+
     context = {
         'name':     username,
-        'cost':     '{} gold'.format(facade.CONFIG.PACKS[name]['cost']),
+        'cost':     '{} gold'.format(pack['cost']),
         'balance':  '{} gold'.format(facade.user_get_gold(username))
     }
 
@@ -40,57 +49,122 @@ def buy(name):
 
 
 @packs.command('list')
-def listing():
-    facade: Rewardify = Rewardify.instance()
+@click.option('--min-cost', 'min_cost', type=click.IntRange(min=0), default=None,
+              help='Only list the packs, which cost at least the given amount of gold')
+@click.option('--max-cost', 'max_cost', type=click.IntRange(min=0), default=None,
+              help='Only list the packs, which cost at most the given amount of gold')
+@click.option('-s', '--search', 'search', default=None,
+              help='Only list the packs, whose name contains the given string')
+@click.option('-p', '--page', 'page', type=click.IntRange(min=1), default=1)
+@click.option('--per-page', 'per_page', type=click.IntRange(min=1), default=50)
+@requires('config')
+def listing(min_cost, max_cost, search, page, per_page):
     templater: Templater = Templater.instance()
 
-    available_packs = facade.available_packs()
-    context = {'packs': available_packs}
+    # 17.10.2026
+    # The packs are taken from the catalog index and only the packs of the requested page are rendered
+    pack_catalog = catalog.get_catalog('pack')
+    entries = pack_catalog.filter(min_cost=min_cost, max_cost=max_cost, search=search)
+    page_entries, page_count = catalog.paginate(entries, page, per_page)
+
+    context = {
+        'packs':        page_entries,
+        'page':         page,
+        'page_count':   page_count,
+        'total':        len(entries)
+    }
 
     templater.echo_template('pack_list.jinja2', context)
 
 
 @packs.command('open')
 @click.option('-a', '--all', 'all', is_flag=True)
+@click.option('-c', '--count', 'count', type=click.IntRange(min=1), default=None)
 @click.argument('name')
+@requires('config', 'database')
 @login_required
-def opening(all, name):
+@write_locked
+def opening(all, count, name):
     credentials: UserCredentials = UserCredentials.instance()
-    facade: Rewardify = Rewardify.instance()
     templater: Templater = Templater.instance()
 
     username = credentials['username']
+
     context = {
         'name':         username,
+        'pack':         name,
         'count':        1,
     }
-    name_rewards_map_before = defaultdict(list)
-    name_rewards_map_before.update(facade.user_get_rewards_by_name(username))
 
     try:
+        # 17.10.2026
+        # All pack openings are done with the set based bulk operation, which opens all of them within a single
+        # transaction instead of opening them one by one through the facade. It also directly returns the rewards,
+        # which have been created, so that the inventory of the user does not have to be compared before and after.
+        pack_count = 1
         if all:
-            name_pack_map = facade.user_get_packs_by_name(username)
-            pack_count = len(name_pack_map[name])
-            for i in range(pack_count):
-                facade.user_open_pack(username, name)
-            context.update({'count': pack_count})
-        else:
-            facade.user_open_pack(username, name)
-
-        name_rewards_map_after = facade.user_get_rewards_by_name(username)
-
-        rarity_rewards_map = defaultdict(list)
-        for name, rewards in name_rewards_map_after.items():
-            rewards_before = name_rewards_map_before[name]
-            new_reward_count = len(rewards) - len(rewards_before)
-            rarity = str(rewards[0].rarity)
-            for i in range(new_reward_count):
-                rarity_rewards_map[rarity].append(rewards[0])
-
-        context.update(rarity_rewards_map)
+            pack_count = bulk.count_packs(username, name)
+            # Opening all of the packs, when there are none, is an error just like opening a single missing one
+            if pack_count == 0:
+                raise LookupError('The user "{}" does not own any pack "{}"'.format(username, name))
+        elif count is not None:
+            pack_count = count
+        new_rewards = bulk.open_packs(username, name, pack_count)
+        context.update({'count': pack_count})
+        context.update(projections.group_by_rarity(new_rewards))
 
         templater.echo_template('pack_opened.jinja2', context)
     except LookupError:
         templater.echo_template('permission_use_error.jinja2', context)
     except Exception as e:
         click.echo(e)
+
+
+@packs.command('simulate')
+@click.option('-n', '--n', 'count', type=click.IntRange(min=1), default=1000000,
+              help='The number of packs to be simulated')
+@click.option('--seed', 'seed', type=click.IntRange(min=0), default=None,
+              help='The seed of the random numbers, with which a simulation can be repeated exactly')
+@click.option('--sets', 'collectors', type=click.IntRange(min=0), default=1000,
+              help='The number of collectors, for which the packs needed to complete the set are simulated')
+@click.argument('name')
+@requires('config')
+def simulate(count, seed, collectors, name):
+    templater: Templater = Templater.instance()
+
+    catalog.require_item('pack', name)
+    try:
+        context = simulation.simulate(name, count, collectors, seed=seed)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    templater.echo_template('pack_simulated.jinja2', context)
+
+
+@packs.command('stats')
+@click.option('-r', '--reward', 'reward', default=None,
+              help='Also show the expected number of packs to obtain the reward with the given name')
+@click.option('--no-cache', 'no_cache', is_flag=True,
+              help='Calculate the statistics anew, even if they are cached for the current config')
+@click.argument('name')
+@requires('config')
+def stats(reward, no_cache, name):
+    templater: Templater = Templater.instance()
+
+    pack = catalog.require_item('pack', name)
+    if reward is not None:
+        catalog.require_item('reward', reward)
+
+    try:
+        pack_stats, cached = economics.get_pack_stats(name, use_cache=not no_cache)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    context = {
+        'pack':     name,
+        'cost':     pack['cost'],
+        'cached':   cached,
+        'reward':   economics.get_reward_stats(reward, pack_stats) if reward is not None else None,
+        **pack_stats
+    }
+    templater.echo_template('pack_stats.jinja2', context)
@@ -0,0 +1,279 @@
+"""
+This module contains the instrumentation behind the global "--timings" and "--profile" options.
+
+- Timings: The wall clock time of a command is split into phases ("import", "config", "database", "backend", "auth",
+  "command" and "render"). The phases are measured by the places, which already exist for every command anyways: The
+  lazy loading of the command module, the "requires" and "login_required" decorators and the rendering of the
+  templates. Phases can be nested, in which case the time of the inner phase is not counted for the outer one, so that
+  the phases always add up to the measured total. Measuring the phases only costs a few calls of the performance
+  counter, which is why it is always done and only the report depends on the option.
+- Profile: The command is executed by cProfile and the stats are dumped into a file, which can be inspected with the
+  "pstats" module (or any other tool, which reads these stats). Optionally the biggest memory allocations are traced
+  with tracemalloc for the same run. The profile starts with the main cli group, which is after the module of the
+  command has been imported. The imports are covered by the "import" phase of the timings and "python -X importtime".
+
+The reports are echoed to stderr, so that they do not mix with the (possibly machine readable) output of the command.
+
+CHANGELOG
+
+Added 17.10.2026
+"""
+# standard library
+import io
+import time
+import contextlib
+
+from typing import Dict, List, Optional
+
+# third party
+import click
+
+# local
+from rewardifycli.__internal.util import Singleton
+
+
+# The phases in the order, in which they usually happen. This is the order of the timings report.
+PHASES = ['import', 'config', 'database', 'backend', 'auth', 'command', 'render']
+
+# The number of functions and allocations listed in the profile report
+PROFILE_REPORT_LIMIT = 15
+
+
+# ###########
+# THE TIMINGS
+# ###########
+
+
+@Singleton
+class Timings:
+    """
+    This singleton measures the time spent in the phases of the current command. A phase is measured by executing it
+    within the "phase" context manager. The time of nested phases is only counted for the innermost phase.
+
+    CHANGELOG
+
+    Added 17.10.2026
+    """
+    def __init__(self):
+        """
+        The constructor.
+
+        CHANGELOG
+
+        Added 17.10.2026
+        """
+        # The keys are the names of the phases and the values the total number of seconds spent in them
+        self.totals: Dict[str, float] = {}
+        # The stack of the currently running phases. Every item is a list of the name of the phase and the time, at
+        # which it was entered or at which the last nested phase was left.
+        self.stack: List[list] = []
+        self.started = time.perf_counter()
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """
+        This context manager adds the time spent in its body to the phase with the given name.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param name:
+        :return:
+        """
+        now = time.perf_counter()
+        # The time of the outer phase is paused, while the nested phase is running
+        if self.stack:
+            self.add(self.stack[-1][0], now - self.stack[-1][1])
+        self.stack.append([name, now])
+
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            _, start = self.stack.pop()
+            self.add(name, now - start)
+            if self.stack:
+                self.stack[-1][1] = now
+
+    @contextlib.contextmanager
+    def isolated(self):
+        """
+        This context manager measures the phases of its body on their own: At the beginning, all the measured times
+        are put aside and the measurement of the total time starts anew. At the end, the previous measurement is
+        continued. This is used for every single command, so that a process, which executes many commands (like the
+        daemon or a batch), reports every one of them on its own. For the outer command, the time of the inner command
+        simply counts for the phase, in which it was executed.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :return:
+        """
+        previous = (self.totals, self.stack, self.started)
+        self.totals, self.stack, self.started = {}, [], time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.totals, self.stack, self.started = previous
+
+    def report(self) -> str:
+        """
+        Returns the string report with the time of every phase, the time, which was not part of any phase, and the
+        total time since the start of the measurement.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :return:
+        """
+        total = time.perf_counter() - self.started
+        names = [name for name in PHASES if name in self.totals]
+        names += sorted(name for name in self.totals.keys() if name not in PHASES)
+
+        rows = [(name, self.totals[name]) for name in names]
+        rows.append(('other', max(0.0, total - sum(self.totals.values()))))
+
+        lines = ['', 'TIMINGS', '=======']
+        for name, seconds in rows:
+            share = 100 * seconds / total if total > 0 else 0.0
+            lines.append('{:<10} {:>10.2f} ms {:>6.1f} %'.format(name, 1000 * seconds, share))
+        lines.append('{:<10} {:>10.2f} ms'.format('total', 1000 * total))
+
+        return '\n'.join(lines)
+
+    # HELPER METHODS
+    # --------------
+
+    def add(self, name: str, seconds: float):
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+
+
+def phase(name: str):
+    """
+    Returns the context manager, which adds the time spent in its body to the phase with the given name.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param name:
+    :return:
+    """
+    timings: Timings = Timings.instance()
+    return timings.phase(name)
+
+
+# ###########
+# THE PROFILE
+# ###########
+
+
+class Profile:
+    """
+    Instances of this class profile the execution of a command with cProfile and optionally trace the memory
+    allocations with tracemalloc.
+
+    CHANGELOG
+
+    Added 17.10.2026
+    """
+    def __init__(self, path: str, memory: bool = False):
+        """
+        The constructor.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param path: The path of the file, into which the stats are dumped
+        :param memory: Whether the memory allocations are traced as well
+        """
+        self.path = path
+        self.memory = memory
+        self.profiler = None
+
+    def start(self):
+        """
+        Starts the profiling.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :return:
+        """
+        # These modules are only needed, if a profile is actually requested
+        import cProfile
+        import tracemalloc
+
+        if self.memory:
+            tracemalloc.start()
+
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+
+    def stop(self) -> str:
+        """
+        Stops the profiling, dumps the stats into the file and returns the string report with the functions, which
+        took the most time, and the biggest memory allocations.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :return:
+        """
+        import tracemalloc
+
+        self.profiler.disable()
+
+        # The snapshot is taken before anything is done for the report itself
+        snapshot = None
+        if self.memory:
+            snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+            tracemalloc.stop()
+
+        import pstats
+
+        self.profiler.dump_stats(self.path)
+
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profiler, stream=stream)
+        stats.sort_stats('cumulative').print_stats(PROFILE_REPORT_LIMIT)
+
+        lines = ['', 'PROFILE', '=======', 'The stats have been written to "{}"'.format(self.path), stream.getvalue()]
+        if snapshot is not None:
+            lines += ['MEMORY', '======']
+            for statistic in snapshot.statistics('lineno')[:PROFILE_REPORT_LIMIT]:
+                lines.append(str(statistic))
+
+        return '\n'.join(lines)
+
+
+def start_reports(ctx: click.Context, timings: bool, profile_path: Optional[str] = None, memory: bool = False):
+    """
+    Starts the profile (if a path is given) and makes sure, that the requested reports are echoed to stderr, once the
+    given context of the command is closed, which happens after the command has finished (even if it failed).
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param ctx: The context of the main cli group
+    :param timings: Whether the timings should be reported
+    :param profile_path: The path of the file for the profile stats or None for no profile
+    :param memory: Whether the memory allocations are traced for the profile
+    :return:
+    """
+    if profile_path is not None:
+        profile = Profile(profile_path, memory=memory)
+        profile.start()
+        ctx.call_on_close(lambda: click.echo(profile.stop(), err=True))
+
+    if timings:
+        timings_instance: Timings = Timings.instance()
+        ctx.call_on_close(lambda: click.echo(timings_instance.report(), err=True))
@@ -0,0 +1,147 @@
+"""
+This module contains the read only projections of the rewards.
+
+The listings of the cli only ever need a few columns of the items (mostly the name and the rarity). Loading full peewee
+model instances for them is wasteful: Each instance carries a dict with all the columns and a lot of additional
+bookkeeping. The records in here only contain the columns, which are actually needed, and use "__slots__", so that
+they do not even have an instance dict. The "iter_" functions stream the records from a database cursor, so that not
+even the list of all the records has to be in memory at once.
+
+CHANGELOG
+
+Added 17.10.2026
+"""
+# standard library
+from collections import defaultdict
+
+from typing import Dict, List, Iterable, Iterator
+
+# third party
+from rewardify.models import User, Reward
+
+from rewardify.rarity import Rarity
+
+
+class Record:
+    """
+    This is the base class for the read only projections. Subclasses only have to define the names of their columns
+    as the "__slots__".
+
+    CHANGELOG
+
+    Added 17.10.2026
+    """
+    __slots__ = ()
+
+    def __init__(self, *values):
+        """
+        The constructor. The values have to be given in the same order as the slots.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param values:
+        """
+        for slot, value in zip(self.__slots__, values):
+            object.__setattr__(self, slot, value)
+
+    def to_dict(self) -> Dict:
+        """
+        Returns a dict, whose keys are the column names and the values the values of this record
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :return:
+        """
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    # MAGIC METHODS
+    # -------------
+
+    def __setattr__(self, key, value):
+        raise AttributeError('The records are read only!')
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, ', '.join(repr(v) for v in self.to_dict().values()))
+
+
+class RewardRecord(Record):
+    """
+    The projection of a reward. The rarity is the string name of the rarity.
+
+    CHANGELOG
+
+    Added 17.10.2026
+    """
+    __slots__ = ('name', 'rarity', 'date_obtained')
+
+    # These are the columns of the reward table, which are selected for the records, in the order of the slots
+    COLUMNS = (Reward.name, Reward.rarity, Reward.date_obtained)
+
+    @classmethod
+    def from_row(cls, row: Dict) -> 'RewardRecord':
+        """
+        Creates a new record from a dict, which contains (at least) the same keys as the fields of the Reward model
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param row:
+        :return:
+        """
+        return cls(row['name'], str(Rarity(row['rarity'])), row['date_obtained'])
+
+
+# #####################
+# STREAMING THE RECORDS
+# #####################
+
+
+def iter_rewards(username: str, name: str = None) -> Iterator[RewardRecord]:
+    """
+    Returns an iterator over the records of all the rewards of the given user, optionally only those with the given
+    name. The rewards are streamed from the database cursor and never all loaded at once.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param username:
+    :param name:
+    :return:
+    """
+    query = Reward.select(*RewardRecord.COLUMNS).join(User).where(User.name == username)
+    if name is not None:
+        query = query.where(Reward.name == name)
+    query = query.order_by(Reward.name, Reward.id)
+
+    # The iterator of the query does not cache the rows, which would otherwise still materialize all of them. The
+    # rarity column is converted into a Rarity object by the field, which is turned into its string name.
+    for reward_name, rarity, date_obtained in query.tuples().iterator():
+        yield RewardRecord(reward_name, str(rarity), date_obtained)
+
+
+def group_by_rarity(records: Iterable[RewardRecord]) -> Dict[str, List[RewardRecord]]:
+    """
+    Given the reward records, returns a dict, whose keys are the rarity names and the values the lists of records with
+    that rarity.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param records:
+    :return:
+    """
+    rarity_records_map = defaultdict(list)
+    for record in records:
+        rarity_records_map[record.rarity].append(record)
+
+    return rarity_records_map
@@ -0,0 +1,374 @@
+"""
+This module contains the bulk creation and deletion of users, which is used by the "users import" and "users delete"
+commands.
+
+Creating the users one by one through the facade means one commit per user and, even worse, hashing one password
+after another. Hashing a password with argon2 is slow on purpose, so it is by far the most expensive part. The import
+streams the rows from a CSV or NDJSON file, hashes the passwords of a whole batch in a process pool and inserts the
+batch with a single statement within one transaction. Rows, which can not be imported (for example because the user
+already exists), are reported as failures without affecting the other rows.
+
+CHANGELOG
+
+Added 17.10.2026
+"""
+# standard library
+import csv
+import json
+import itertools
+
+from concurrent.futures import ProcessPoolExecutor
+
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, TextIO
+
+# third party
+from peewee import IntegrityError, chunked
+
+from rewardify.models import User, Pack, Reward
+
+from rewardify.password import PasswordHash
+
+# local
+from rewardifycli.models import InventoryCounter, UpdateCheckpoint
+from rewardifycli.concurrency import write_transaction
+
+
+# The number of rows, which are hashed and inserted together within one transaction
+DEFAULT_BATCH_SIZE = 500
+
+# The number of rows per insert statement. The number of variables per statement is limited for sqlite.
+INSERT_CHUNK_SIZE = 100
+
+INPUT_FORMATS = ['auto', 'csv', 'ndjson']
+
+
+# ################
+# READING THE ROWS
+# ################
+
+
+def detect_format(lines: Iterator[str]) -> Tuple[str, Iterator[str]]:
+    """
+    Given an iterator over the lines of a file, this function looks at the first line, which is not empty, to decide
+    whether it is a NDJSON file (starting with "{") or a CSV file. Returns the tuple of the format and an iterator,
+    which still yields all of the lines (the file might not be seekable, like stdin).
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param lines:
+    :return:
+    """
+    head = []
+    for line in lines:
+        head.append(line)
+        if line.strip():
+            break
+
+    file_format = 'ndjson' if head and head[-1].lstrip().startswith('{') else 'csv'
+    return file_format, itertools.chain(head, lines)
+
+
+def read_rows(file: TextIO, file_format: str = 'auto') -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """
+    Returns an iterator over the rows of the given CSV or NDJSON file. Every item is a tuple of the line number, the
+    dict of the row and an error message. If the row could not be parsed, the dict is None and the error message
+    describes the problem. Otherwise the error message is None.
+
+    The CSV file has to start with a header line. The rows are read one after another and never all at once.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param file:
+    :param file_format: "csv", "ndjson" or "auto" to detect the format
+    :return:
+    """
+    lines = iter(file)
+    if file_format == 'auto':
+        file_format, lines = detect_format(lines)
+
+    if file_format == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            # The line number of the reader is the one of the last line of the row
+            yield reader.line_num, {key.strip(): value for key, value in row.items() if key is not None}, None
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, 'Invalid JSON: {}'.format(e)
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, 'The line is not a JSON object'
+            continue
+        yield line_number, row, None
+
+
+def parse_user(row: Dict) -> Dict:
+    """
+    Given the dict of a row, returns the dict with the values of the new user: "name", "password", "gold" and "dust".
+    The username can either be given as "username" or as "name". Gold and dust are optional.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :raises: ValueError if the row does not describe a valid user
+
+    :param row:
+    :return:
+    """
+    name = str(row.get('username') or row.get('name') or '').strip()
+    password = row.get('password')
+    if not name:
+        raise ValueError('The username is missing')
+    if not password:
+        raise ValueError('The password is missing')
+
+    try:
+        gold = int(row.get('gold') or 0)
+        dust = int(row.get('dust') or 0)
+    except (TypeError, ValueError):
+        raise ValueError('Gold and dust have to be integers')
+
+    return {'name': name, 'password': str(password), 'gold': gold, 'dust': dust}
+
+
+def hash_password(password: str) -> str:
+    """
+    Returns the hash of the given password, exactly as the password field of the user model would save it. This is a
+    module level function, so that it can be executed by the worker processes.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param password:
+    :return:
+    """
+    return str(PasswordHash(password))
+
+
+# ######################
+# IMPORTING AND DELETING
+# ######################
+
+
+class UserImport:
+    """
+    Instances of this class import the users from the rows of a file. After "run", the attribute "created" contains
+    the number of created users and "failures" the list of dicts with the "line", the "username" and the "error" of
+    every row, which could not be imported.
+
+    CHANGELOG
+
+    Added 17.10.2026
+    """
+    def __init__(self, workers: int = None, batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        The constructor.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param workers: The number of processes hashing the passwords. None to use one per cpu and 1 to hash within
+            the current process.
+        :param batch_size: The number of rows, which are imported within a single transaction
+        """
+        self.workers = workers
+        self.batch_size = batch_size
+
+        self.created = 0
+        self.failures: List[Dict] = []
+
+    def run(self, rows: Iterable[Tuple[int, Optional[Dict], Optional[str]]]):
+        """
+        Imports the users from the given rows (as returned by "read_rows").
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param rows:
+        :return:
+        """
+        executor = None if self.workers == 1 else ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            for batch in chunked(self.iter_users(rows), self.batch_size):
+                # The passwords are only hashed for the users, which do not exist already, because the hashing is the
+                # expensive part
+                batch = self.filter_existing(batch)
+                passwords = [user['password'] for _, user in batch]
+                if executor is None:
+                    hashes = list(map(hash_password, passwords))
+                else:
+                    hashes = list(executor.map(hash_password, passwords, chunksize=16))
+
+                for (_, user), password_hash in zip(batch, hashes):
+                    user['password'] = password_hash
+                self.insert(batch)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def iter_users(self, rows: Iterable[Tuple[int, Optional[Dict], Optional[str]]]) -> Iterator[Tuple[int, Dict]]:
+        """
+        Returns an iterator over the tuples of the line number and the user dict for all the valid rows. The invalid
+        rows and the duplicate usernames within the file are added to the failures.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param rows:
+        :return:
+        """
+        seen = set()
+        for line, row, error in rows:
+            if error is None:
+                try:
+                    user = parse_user(row)
+                except ValueError as e:
+                    error = str(e)
+
+            if error is not None:
+                self.add_failure(line, (row or {}).get('username') or (row or {}).get('name'), error)
+                continue
+
+            if user['name'] in seen:
+                self.add_failure(line, user['name'], 'The username appears more than once within the file')
+                continue
+            seen.add(user['name'])
+
+            yield line, user
+
+    def filter_existing(self, batch: List[Tuple[int, Dict]]) -> List[Tuple[int, Dict]]:
+        """
+        Returns the list of the tuples of line number and user dict from the given batch, whose users do not exist
+        yet. The existing users are added to the failures.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param batch:
+        :return:
+        """
+        names = [user['name'] for _, user in batch]
+        existing = {name for (name, ) in User.select(User.name).where(User.name.in_(names)).tuples()}
+
+        new = []
+        for line, user in batch:
+            if user['name'] in existing:
+                self.add_failure(line, user['name'], 'The user already exists')
+            else:
+                new.append((line, user))
+
+        return new
+
+    def insert(self, batch: List[Tuple[int, Dict]]):
+        """
+        Inserts the given batch of tuples of line number and user dict (with the hashed password) into the database.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param batch:
+        :return:
+        """
+        if not batch:
+            return
+
+        with write_transaction():
+            try:
+                with write_transaction():
+                    for chunk in chunked([user for _, user in batch], INSERT_CHUNK_SIZE):
+                        User.insert_many(chunk).execute()
+                self.created += len(batch)
+            except IntegrityError:
+                # Another process has created one of the users in the meantime. Only now the rows are inserted one
+                # by one to find out which one.
+                for line, user in batch:
+                    try:
+                        with write_transaction():
+                            User.insert(user).execute()
+                        self.created += 1
+                    except IntegrityError:
+                        self.add_failure(line, user['name'], 'The user already exists')
+
+    # HELPER METHODS
+    # --------------
+
+    def add_failure(self, line: int, username: Optional[str], error: str):
+        self.failures.append({'line': line, 'username': username, 'error': error})
+
+
+def delete_users(usernames: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE, dry_run: bool = False) -> Dict:
+    """
+    Deletes the users with the given names together with all their rewards, packs, counters and checkpoints. The users
+    are deleted in batches, each batch within a single transaction and with one delete statement per table.
+
+    Returns a dict with the list of the "deleted" usernames, the list of the usernames, which do not exist
+    ("unknown"), and the number of deleted "rewards" and "packs".
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    Changed 17.10.2026
+    The dry run counts the rows with select queries instead of deleting them within a transaction, which is rolled
+    back.
+
+    :param usernames:
+    :param batch_size: The number of users deleted within a single transaction
+    :param dry_run: If True, nothing is actually deleted
+    :return:
+    """
+    result = {'deleted': [], 'unknown': [], 'rewards': 0, 'packs': 0}
+
+    def select_users(batch: List[str]) -> List[int]:
+        users = dict(User.select(User.name, User.id).where(User.name.in_(batch)).tuples())
+        result['unknown'] += [name for name in batch if name not in users]
+        result['deleted'] += [name for name in batch if name in users]
+        return list(users.values())
+
+    seen = set()
+    for chunk in chunked(usernames, batch_size):
+        batch = []
+        for name in chunk:
+            if name not in seen:
+                seen.add(name)
+                batch.append(name)
+
+        # A dry run only counts the rows, which would be deleted. Deleting them and rolling back would take the write
+        # lock of the database and the counter triggers would still write to the WAL.
+        if dry_run:
+            ids = select_users(batch)
+            if ids:
+                result['rewards'] += Reward.select().where(Reward.user.in_(ids)).count()
+                result['packs'] += Pack.select().where(Pack.user.in_(ids)).count()
+            continue
+
+        with write_transaction():
+            ids = select_users(batch)
+            if not ids:
+                continue
+
+            result['rewards'] += Reward.delete().where(Reward.user.in_(ids)).execute()
+            result['packs'] += Pack.delete().where(Pack.user.in_(ids)).execute()
+            # The foreign keys are not enforced by sqlite by default, so the rows of the additional tables of the
+            # cli have to be deleted explicitly
+            InventoryCounter.delete().where(InventoryCounter.user.in_(ids)).execute()
+            UpdateCheckpoint.delete().where(UpdateCheckpoint.user.in_(ids)).execute()
+            User.delete().where(User.id.in_(ids)).execute()
+
+    return result
@@ -6,8 +6,13 @@ import click
 
 from rewardify.main import Rewardify
 
+from rewardify.rarity import Rarity
+
 # local
-from rewardifycli.util import login_required
+from rewardifycli import bulk
+from rewardifycli import catalog
+
+from rewardifycli.util import login_required, requires, write_locked
 from rewardifycli.util import Templater, UserCredentials
 
 
@@ -18,16 +23,22 @@ def rewards():
 
 @rewards.command('buy')
 @click.argument('name')
+@requires('config', 'database')
 @login_required
+@write_locked
 def buying(name):
     credentials: UserCredentials = UserCredentials.instance()
     facade: Rewardify = Rewardify.instance()
     templater: Templater = Templater.instance()
     username = credentials['username']
 
+    # 17.10.2026
+    # A name, which does not exist, results in an error message with suggestions for the correct name
+    reward = catalog.require_item('reward', name)
+
     context = {
         'name':         username,
-        'cost':         '{} dust'.format(facade.CONFIG.REWARDS[name]['cost']),
+        'cost':         '{} dust'.format(reward['cost']),
         'balance':      '{} dust'.format(facade.user_get_dust(username))
     }
 
@@ -42,28 +53,37 @@ def buying(name):
 @rewards.command('use')
 @click.argument('name')
 @click.option('-a', '--all', 'all', is_flag=True)
+@click.option('-c', '--count', 'count', type=click.IntRange(min=1), default=None)
+@requires('config', 'database')
 @login_required
-def using(name, all):
+@write_locked
+def using(name, all, count):
     credentials: UserCredentials = UserCredentials.instance()
-    facade: Rewardify = Rewardify.instance()
     templater: Templater = Templater.instance()
 
     username = credentials['username']
+    reward = catalog.require_item('reward', name)
+
     context = {
         'name':             name,
         'count':            1,
-        'description':      facade.CONFIG.REWARDS[name]['description'],
+        'description':      reward['description'],
     }
 
     try:
+        # 17.10.2026
+        # Using the rewards is done with the set based bulk operation, which applies the effects and deletes all the
+        # rewards with a constant number of queries in a single transaction
+        reward_count = 1
         if all:
-            name_rewards_map = facade.user_get_rewards_by_name(username)
-            reward_count = len(name_rewards_map[name])
-            for i in range(reward_count):
-                facade.user_use_reward(username, name)
-            context.update({'count': reward_count})
-        else:
-            facade.user_use_reward(username, name)
+            reward_count = bulk.count_rewards(username, name)
+            # Using all of the rewards, when there are none, is an error just like using a single missing one
+            if reward_count == 0:
+                raise LookupError('The user "{}" does not own any reward "{}"'.format(username, name))
+        elif count is not None:
+            reward_count = count
+        bulk.use_rewards(username, name, reward_count)
+        context.update({'count': reward_count})
 
         templater.echo_template('reward_used.jinja2', context)
     except LookupError:
@@ -73,17 +93,41 @@ def using(name, all):
 
 
 @rewards.command('recycle')
-@click.argument('name')
+@click.argument('name', required=False)
+@click.option('-k', '--keep', 'keep', type=click.IntRange(min=0), default=None,
+              help='Recycle all but the given amount of copies of every reward')
+@click.option('-d', '--duplicates', 'duplicates', is_flag=True,
+              help='Recycle all duplicates, keeping one copy of every reward')
+@click.option('-r', '--rarity', 'rarity', type=click.Choice(Rarity.RARITIES), default=None,
+              help='Only recycle rewards of the given rarity (all of them, unless combined with --keep)')
+@click.option('--dry-run', 'dry_run', is_flag=True,
+              help='Only report the dust, that would be gained, without recycling anything')
+@requires('config', 'database')
 @login_required
-def recycling(name):
+@write_locked
+def recycling(name, keep, duplicates, rarity, dry_run):
     credentials: UserCredentials = UserCredentials.instance()
     facade: Rewardify = Rewardify.instance()
     templater: Templater = Templater.instance()
     username = credentials['username']
 
+    # 17.10.2026
+    # If any of the policy options is given, the rewards are recycled in bulk according to this policy. Otherwise
+    # one copy of the reward with the given name is recycled, just like before
+    if keep is not None or duplicates or rarity is not None:
+        recycle_policy(username, name, keep, duplicates, rarity, dry_run)
+        return
+
+    if name is None:
+        raise click.UsageError('Either the NAME of a reward or one of the recycle policies has to be given')
+    if dry_run:
+        raise click.UsageError('The --dry-run option can only be used with --keep, --duplicates or --rarity')
+
+    reward = catalog.require_item('reward', name)
+
     context = {
         'name':         username,
-        'recycle':      '{} dust'.format(facade.CONFIG.REWARDS[name]['recycle']),
+        'recycle':      '{} dust'.format(reward['recycle']),
     }
 
     try:
@@ -94,13 +138,68 @@ def recycling(name):
         raise click.Abort()
 
 
+def recycle_policy(username: str, name: str, keep: int, duplicates: bool, rarity: str, dry_run: bool):
+    """
+    Recycles the rewards of the given user according to the policy given by the options of the "recycle" command and
+    echos the report of the recycled rewards
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param username:
+    :param name:
+    :param keep:
+    :param duplicates:
+    :param rarity:
+    :param dry_run:
+    :return:
+    """
+    templater: Templater = Templater.instance()
+
+    if duplicates and keep is not None and keep != 1:
+        raise click.UsageError('The options --duplicates and --keep contradict each other')
+    keep = 1 if duplicates else (keep or 0)
+
+    recycled, dust = bulk.recycle_rewards(username, keep=keep, name=name, rarity=rarity, dry_run=dry_run)
+
+    context = {
+        'name':         username,
+        'recycled':     recycled,
+        'count':        sum(recycled.values()),
+        'dust':         '{} dust'.format(dust),
+        'dry_run':      dry_run
+    }
+    templater.echo_template('rewards_recycled.jinja2', context)
+
+
 @rewards.command('list')
-def listing():
-    facade: Rewardify = Rewardify.instance()
+@click.option('-r', '--rarity', 'rarity', type=click.Choice(Rarity.RARITIES), default=None,
+              help='Only list the rewards of the given rarity')
+@click.option('--max-cost', 'max_cost', type=click.IntRange(min=0), default=None,
+              help='Only list the rewards, which cost at most the given amount of dust')
+@click.option('-s', '--search', 'search', default=None,
+              help='Only list the rewards, whose name contains the given string')
+@click.option('-p', '--page', 'page', type=click.IntRange(min=1), default=1)
+@click.option('--per-page', 'per_page', type=click.IntRange(min=1), default=50)
+@requires('config')
+def listing(rarity, max_cost, search, page, per_page):
     templater: Templater = Templater.instance()
 
-    rarity_rewards_map = facade.available_rewards_by_rarity()
+    # 17.10.2026
+    # The rewards are taken from the catalog index, which only has to look at the matching rewards and only the
+    # rewards of the requested page are rendered
+    reward_catalog = catalog.get_catalog('reward')
+    entries = reward_catalog.filter(rarity=rarity, max_cost=max_cost, search=search)
+    page_entries, page_count = catalog.paginate(entries, page, per_page)
+
     context = defaultdict(list)
-    context.update(rarity_rewards_map)
+    for entry in page_entries:
+        context[entry['rarity']].append(entry)
+    context.update({
+        'page':         page,
+        'page_count':   page_count,
+        'total':        len(entries)
+    })
 
     templater.echo_template('reward_list.jinja2', context)
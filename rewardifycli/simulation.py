@@ -0,0 +1,371 @@
+"""
+This module contains the Monte Carlo simulation of the pack openings behind the "packs simulate" command.
+
+The simulation only uses the slot probabilities of a pack and the rewards from the config and never touches the
+database. The packs are sampled in batches: For every batch, the rarities of all the slots and the rewards within these
+rarities are drawn with a few vectorized numpy operations. Only aggregates are kept between the batches (the counts per
+rarity and a histogram of the recycle dust per pack), so that the memory stays constant, no matter how many packs are
+simulated.
+
+The number of packs, which are needed to complete the set (all the rewards, which can be contained in the pack), is
+simulated separately for a number of collectors, who open packs until they own every reward of the set at least once.
+
+CHANGELOG
+
+Added 17.10.2026
+"""
+# standard library
+from typing import Dict, List, Optional, Tuple
+
+# third party
+import numpy as np
+
+from rewardify.env import EnvironmentConfig
+
+from rewardify.models import Pack
+
+from rewardify.rarity import Rarity
+
+
+# The number of packs, which are sampled at once. Larger batches are faster, but need more memory.
+SIMULATION_BATCH_SIZE = 2 ** 20
+
+# The percentiles, which are reported for the distributions
+PERCENTILES = [1, 5, 25, 50, 75, 95, 99]
+
+# A collector stops opening packs after this many packs, even if the set is not complete yet
+MAX_SET_PACKS = 10 ** 6
+
+
+class PackModel:
+    """
+    Instances of this class contain everything needed to sample the contents of one type of pack: The matrix of the
+    slot probabilities (one row for every slot and one column for every rarity) and the pool of rewards for every
+    rarity. Just like the actual pack opening, every reward has the same probability within its rarity.
+
+    The rewards are identified by their index within the "names" list, which is ordered by the rarity.
+
+    CHANGELOG
+
+    Added 17.10.2026
+    """
+    def __init__(self, slot_probabilities: List[List[float]], rewards: Dict[str, Dict]):
+        """
+        The constructor.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :raises: ValueError
+
+        :param slot_probabilities: The list with the list of the rarity probabilities for every slot
+        :param rewards: The dict with the reward names as the keys and their config dicts as the values
+        """
+        # The rows are normalized, because the probabilities in the config do not necessarily add up to exactly one
+        self.probability_matrix = np.array(slot_probabilities, dtype=float)
+        self.probability_matrix /= self.probability_matrix.sum(axis=1, keepdims=True)
+        self.cumulative_matrix = np.cumsum(self.probability_matrix, axis=1)
+
+        names_map = {rarity: [] for rarity in Rarity.RARITIES}
+        for name, reward_config in rewards.items():
+            names_map[str(Rarity(reward_config['rarity']))].append(name)
+
+        self.names = [name for rarity in Rarity.RARITIES for name in names_map[rarity]]
+        self.recycle = np.array([rewards[name]['recycle'] for name in self.names], dtype=np.int64)
+        self.counts = np.array([len(names_map[rarity]) for rarity in Rarity.RARITIES], dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(self.counts)[:-1]]).astype(np.int64)
+        self.rarity_indices = np.repeat(np.arange(len(Rarity.RARITIES), dtype=np.int8), self.counts)
+
+        # The rarities, which can actually be contained in the pack
+        self.possible = self.probability_matrix.max(axis=0) > 0
+        for rarity, possible, count in zip(Rarity.RARITIES, self.possible, self.counts):
+            if possible and count == 0:
+                raise ValueError('There are no rewards of the rarity "{}" to be put into a pack!'.format(rarity))
+
+        # A uniform random number, which falls into the interval of a rarity, is scaled linearly onto the indices of
+        # the rewards of that rarity: index = number * scale + shift. This way, the same random number determines
+        # both the rarity and the reward within the rarity.
+        lower_matrix = self.cumulative_matrix - self.probability_matrix
+        positive = self.probability_matrix > 0
+        self.scale_matrix = np.where(positive, self.counts / np.where(positive, self.probability_matrix, 1), 0.0)
+        self.shift_matrix = self.offsets - lower_matrix * self.scale_matrix
+        self.last_indices = self.offsets + np.maximum(self.counts - 1, 0)
+
+    @classmethod
+    def from_config(cls, name: str) -> 'PackModel':
+        """
+        Returns the model for the pack with the given name from the current config.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param name:
+        :return:
+        """
+        config: EnvironmentConfig = EnvironmentConfig.instance()
+        pack_config = config.PACKS[name]
+        slot_probabilities = [pack_config[str(index)] for index in Pack.SLOT_INDICES]
+
+        return cls(slot_probabilities, config.REWARDS)
+
+    @property
+    def slots(self) -> int:
+        return len(self.probability_matrix)
+
+    def sample_slot(self, generator: np.random.Generator, slot: int, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Samples the given slot of the given amount of packs and returns a tuple of two arrays: The indices of the
+        rarities and the indices of the rewards.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param generator:
+        :param slot:
+        :param count:
+        :return:
+        """
+        numbers = generator.random(count)
+
+        # The index of the rarity is the amount of cumulative probabilities, which are smaller than the number. Adding
+        # up the comparisons is a lot faster than a search for such short arrays.
+        rarity_indices = np.zeros(count, dtype=np.int8)
+        for cumulative in self.cumulative_matrix[slot, :-1]:
+            rarity_indices += numbers >= cumulative
+
+        reward_indices = numbers * np.take(self.scale_matrix[slot], rarity_indices)
+        reward_indices += np.take(self.shift_matrix[slot], rarity_indices)
+        # Rounding errors must not leave the range of the rarity
+        reward_indices = np.minimum(reward_indices.astype(np.int64), np.take(self.last_indices, rarity_indices))
+
+        return rarity_indices, reward_indices
+
+    def sample(self, generator: np.random.Generator, count: int) -> np.ndarray:
+        """
+        Samples the contents of the given amount of packs and returns the matrix of the reward indices with one row for
+        every pack and one column for every slot.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param generator:
+        :param count:
+        :return:
+        """
+        reward_matrix = np.empty((count, self.slots), dtype=np.int64)
+        for slot in range(self.slots):
+            _, reward_matrix[:, slot] = self.sample_slot(generator, slot, count)
+
+        return reward_matrix
+
+
+# ##############
+# THE SIMULATION
+# ##############
+
+
+def simulate_packs(model: PackModel, count: int, generator: np.random.Generator) -> Dict:
+    """
+    Simulates the opening of the given amount of packs and returns a dict with the statistics: The "rarities" list
+    contains a dict for every rarity with the expected amount of rewards of that rarity "per_pack", their "share" of
+    all the rewards and the probability of a pack to contain "at_least_one" of them. The "dust" dict contains the
+    "mean", the standard deviation ("std") and the "percentiles" of the recycle dust per pack.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param model:
+    :param count:
+    :param generator:
+    :return:
+    """
+    rarity_totals = np.zeros(len(Rarity.RARITIES), dtype=np.int64)
+    # The index of this histogram is the bit mask of the rarities, which are contained in a pack
+    mask_histogram = np.zeros(2 ** len(Rarity.RARITIES), dtype=np.int64)
+    dust_histogram = np.zeros(model.slots * int(model.recycle.max(initial=0)) + 1, dtype=np.int64)
+
+    for start in range(0, count, SIMULATION_BATCH_SIZE):
+        batch_size = min(SIMULATION_BATCH_SIZE, count - start)
+        masks = np.zeros(batch_size, dtype=np.int8)
+        dust = np.zeros(batch_size, dtype=np.int64)
+
+        # The slots are sampled one after the other, so that all the arrays stay one dimensional and contiguous
+        for slot in range(model.slots):
+            rarity_indices, reward_indices = model.sample_slot(generator, slot, batch_size)
+            rarity_totals += np.bincount(rarity_indices, minlength=len(Rarity.RARITIES))
+            masks |= np.left_shift(np.int8(1), rarity_indices)
+            dust += np.take(model.recycle, reward_indices)
+
+        mask_histogram += np.bincount(masks, minlength=len(mask_histogram))
+        dust_histogram += np.bincount(dust, minlength=len(dust_histogram))
+
+    masks = np.arange(len(mask_histogram))
+    rarity_packs = [mask_histogram[(masks & (1 << index)) > 0].sum() for index in range(len(Rarity.RARITIES))]
+
+    rarities = []
+    for index, rarity in enumerate(Rarity.RARITIES):
+        rarities.append({
+            'rarity':       rarity,
+            'per_pack':     float(rarity_totals[index] / count),
+            'share':        float(rarity_totals[index] / (count * model.slots)),
+            'at_least_one': float(rarity_packs[index] / count)
+        })
+
+    values = np.arange(len(dust_histogram))
+    mean = float((dust_histogram * values).sum() / count)
+    variance = float((dust_histogram * (values - mean) ** 2).sum() / count)
+
+    return {
+        'rarities':     rarities,
+        'dust': {
+            'mean':         mean,
+            'std':          variance ** 0.5,
+            'percentiles':  get_histogram_percentiles(dust_histogram, PERCENTILES)
+        }
+    }
+
+
+def simulate_set_completion(model: PackModel,
+                            collectors: int,
+                            generator: np.random.Generator,
+                            max_packs: int = MAX_SET_PACKS) -> Dict:
+    """
+    Simulates the given amount of collectors, who open packs until they own every reward of the set at least once, and
+    returns a dict with the "size" of the set, the amount of "collectors", how many of them have "completed" the set
+    within the maximum amount of packs and the "mean" and the "percentiles" of the packs they needed. The mean and the
+    percentiles are None, if not all the collectors have completed the set.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param model:
+    :param collectors:
+    :param generator:
+    :param max_packs:
+    :return:
+    """
+    in_set = model.possible[model.rarity_indices]
+    size = int(np.count_nonzero(in_set))
+
+    # The number of the pack, with which the collector has obtained the reward for the first time. Rewards, which have
+    # not been obtained yet, have a number larger than any actual pack.
+    first_packs = np.full((collectors, len(model.names)), max_packs + 1, dtype=np.int64)
+    completions = np.zeros(collectors, dtype=np.int64)
+
+    opened = 0
+    while opened < max_packs:
+        active = np.flatnonzero(completions == 0)
+        if len(active) == 0:
+            break
+
+        # All the collectors, who are still missing rewards, open the next block of packs at once
+        block = max(1, min(SIMULATION_BATCH_SIZE // len(active), max_packs - opened))
+        reward_indices = model.sample(generator, len(active) * block).reshape(len(active), block * model.slots)
+        pack_numbers = np.repeat(np.arange(opened + 1, opened + block + 1), model.slots)
+
+        np.minimum.at(
+            first_packs,
+            (np.repeat(active, block * model.slots), reward_indices.ravel()),
+            np.tile(pack_numbers, len(active))
+        )
+
+        # The set is complete with the pack, which contained the last missing reward
+        last_packs = first_packs[active][:, in_set].max(axis=1)
+        completed = last_packs <= opened + block
+        completions[active[completed]] = last_packs[completed]
+        opened += block
+
+    completed = int(np.count_nonzero(completions))
+    result = {
+        'size':         size,
+        'collectors':   collectors,
+        'completed':    completed,
+        'max_packs':    max_packs,
+        'mean':         None,
+        'percentiles':  None
+    }
+    if collectors > 0 and completed == collectors:
+        result.update({
+            'mean':         float(completions.mean()),
+            'percentiles':  get_histogram_percentiles(np.bincount(completions), PERCENTILES)
+        })
+
+    return result
+
+
+def simulate(name: str, count: int, collectors: int, seed: Optional[int] = None) -> Dict:
+    """
+    Simulates the given amount of openings of the pack with the given name and the set completion for the given amount
+    of collectors. Returns the dict with the statistics of both simulations (see "simulate_packs" and
+    "simulate_set_completion") and the "seed", with which the simulation can be repeated exactly.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param name:
+    :param count:
+    :param collectors:
+    :param seed: The seed of the random number generator. If it is None, a random seed is chosen.
+    :return:
+    """
+    config: EnvironmentConfig = EnvironmentConfig.instance()
+    cost = config.PACKS[name]['cost']
+    model = PackModel.from_config(name)
+
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy)
+    generator = np.random.default_rng(seed)
+
+    statistics = simulate_packs(model, count, generator)
+    statistics['dust']['per_gold'] = statistics['dust']['mean'] / cost if cost > 0 else None
+
+    completion = simulate_set_completion(model, collectors, generator)
+    completion['gold'] = completion['mean'] * cost if completion['mean'] is not None else None
+
+    return {
+        'pack':     name,
+        'count':    count,
+        'cost':     cost,
+        'seed':     seed,
+        'set':      completion,
+        **statistics
+    }
+
+
+# ##############
+# HELPER METHODS
+# ##############
+
+
+def get_histogram_percentiles(histogram: np.ndarray, percentiles: List[int]) -> List[Dict]:
+    """
+    Given the histogram of a distribution of non negative integers (the count of every value at its index) and the list
+    of percentiles, this method returns a list with a dict for every percentile, which contains the "percentile" and
+    its "value". The value is the smallest value, for which at least that percentage of all the values is smaller or
+    equal (the nearest rank method).
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param histogram:
+    :param percentiles:
+    :return:
+    """
+    cumulative = np.cumsum(histogram)
+    total = cumulative[-1]
+
+    return [
+        {
+            'percentile':   percentile,
+            'value':        int(np.searchsorted(cumulative, max(1, np.ceil(percentile / 100 * total)), side='left'))
+        }
+        for percentile in percentiles
+    ]
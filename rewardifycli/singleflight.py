@@ -0,0 +1,175 @@
+"""
+This module makes sure, that only one backend update is running at a time and that the updates are not done more
+often than needed.
+
+- Single flight: The update holds an exclusive lock file within the config folder. An update, which is started while
+  another one is running, waits for the running one to finish and then simply reports its results instead of
+  querying the backend all over again.
+- Stale while revalidate: The time and the results of the last successful update are saved in a stamp file. With the
+  global "--max-age" option, any command checks the age of the last update and, if it is too old, starts an update in
+  a detached background process. The command itself never waits for this update and works with the current data.
+
+CHANGELOG
+
+Added 17.10.2026
+"""
+# standard library
+import os
+import sys
+import json
+import time
+import subprocess
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+# third party
+from rewardify.env import EnvironmentConfig
+
+# local
+from rewardifycli.client import SESSION_ENVIRONMENT_VARIABLE
+from rewardifycli.concurrency import file_lock, atomic_write
+
+
+# The names of the files within the config folder
+LOCK_FILE_NAME = '.update.lock'
+STAMP_FILE_NAME = '.update.stamp'
+
+
+def get_path(file_name: str) -> str:
+    """
+    Returns the path of the file with the given name within the config folder.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param file_name:
+    :return:
+    """
+    environment_config: EnvironmentConfig = EnvironmentConfig.instance()
+    return os.path.join(environment_config.folder_path, file_name)
+
+
+def load_stamp() -> Optional[Dict]:
+    """
+    Returns the dict from the stamp file, which contains the time ("finished") and the "results" of the last
+    successful update. Returns None if there has not been any update yet.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :return:
+    """
+    try:
+        with open(get_path(STAMP_FILE_NAME), mode='r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def get_age() -> Optional[float]:
+    """
+    Returns the number of seconds since the last successful update finished or None if there has not been any update
+    yet.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :return:
+    """
+    stamp = load_stamp()
+    if stamp is None:
+        return None
+
+    return max(0.0, time.time() - stamp['finished'])
+
+
+def single_flight(run: Callable[[], List[Dict]], max_age: float = None) -> Tuple[List[Dict], bool]:
+    """
+    Executes the given update function, unless another process has finished an update since this function has been
+    called (because this process had to wait for it) or the last update is younger than the given max age in seconds.
+    In these cases the results of that last update are returned instead.
+
+    Returns a tuple of the list of result dicts and whether the update has actually been executed by this call.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param run: The function performing the update. It has to return the list of result dicts.
+    :param max_age:
+    :return:
+    """
+    requested = time.time()
+
+    with file_lock(get_path(LOCK_FILE_NAME)):
+        stamp = load_stamp()
+        if stamp is not None:
+            finished = stamp['finished']
+            if finished >= requested or (max_age is not None and requested - finished < max_age):
+                return stamp['results'], False
+
+        results = run()
+
+        # The stamp is only written for a successful update. If the update raised an error, the next one will not
+        # think, that the data is still fresh.
+        stamp = {
+            'finished':     time.time(),
+            'results':      results
+        }
+        atomic_write(get_path(STAMP_FILE_NAME), json.dumps(stamp))
+
+    return results, True
+
+
+def refresh_in_background(max_age: float, session: Optional[str] = None) -> bool:
+    """
+    Starts an update within a detached background process, if the last update is older than the given max age in
+    seconds and no update is running at the moment. Returns whether the background update has been started. This
+    function never waits for the update itself.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    Changed 17.10.2026
+    The session token is passed to the update through the environment instead of the command line arguments, because
+    the arguments of a process can be read by every other user of the machine.
+
+    :param max_age:
+    :param session: The session token to run the update with or None for the credentials of the logged in user
+    :return:
+    """
+    age = get_age()
+    if age is not None and age < max_age:
+        return False
+
+    # If the lock is held at the moment, an update is already running, which will refresh the data anyways
+    with file_lock(get_path(LOCK_FILE_NAME), blocking=False) as acquired:
+        if not acquired:
+            return False
+
+    # The update itself also gets the max age, so that multiple commands starting a background update at the same
+    # time only result in a single update
+    command = [sys.executable, '-m', 'rewardifycli.main', 'update', '--max-age', str(max_age)]
+
+    # The token of a session given by the environment of the current process is replaced as well, so that the update
+    # always runs with the same credentials as the command, which started it
+    environment = dict(os.environ)
+    environment.pop(SESSION_ENVIRONMENT_VARIABLE, None)
+    if session:
+        environment[SESSION_ENVIRONMENT_VARIABLE] = session
+
+    subprocess.Popen(
+        command,
+        env=environment,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        close_fds=True
+    )
+
+    return True
@@ -0,0 +1,115 @@
+"""
+This module contains the parts of the templating, which directly depend on jinja. It is only imported by the
+"Templater" (see "rewardifycli.util"), once a template actually has to be rendered, so that commands with a
+machine readable output format do not have to set up the jinja environment and its bytecode cache.
+
+NOTE: This does not keep jinja itself from being imported. "rewardify.env", which every command imports, already
+creates a jinja environment of its own at import time.
+
+CHANGELOG
+
+Added 17.10.2026
+"""
+# standard library
+import os
+import shutil
+
+# third party
+from jinja2 import FileSystemLoader, Environment, FileSystemBytecodeCache
+from jinja2.bccache import Bucket
+
+from rewardify.env import EnvironmentConfig
+
+
+class TemplateBytecodeCache(FileSystemBytecodeCache):
+    """
+    This is a jinja bytecode cache, which saves the compiled templates into the folder ".template_cache" within the
+    rewardify config folder. This way the templates only have to be parsed and compiled once and not by every single
+    command process.
+
+    The entries of the cache are invalidated by jinja itself: Each entry contains the checksum of the template source
+    it was compiled from and is simply compiled again, if the source of the template has changed since.
+
+    Unless a config folder path is given explicitly, the path of the cache folder is not fixed at the time of creation,
+    but always derived from the current folder path of the environment config. Since the cache is only an
+    optimization, it also must never make a command fail: If the config folder does not exist (yet) or the cache file
+    can not be written, the template is simply not cached.
+
+    CHANGELOG
+
+    Added 17.10.2026
+    """
+    FOLDER_NAME = '.template_cache'
+
+    def __init__(self, folder_path: str = None):
+        """
+        The constructor.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param folder_path: The path of the config folder to put the cache into. Defaults to the current folder path of
+            the environment config.
+        """
+        self.config: EnvironmentConfig = EnvironmentConfig.instance()
+        self.folder_path = folder_path
+        super(TemplateBytecodeCache, self).__init__(directory=self.get_path())
+
+    def get_folder_path(self) -> str:
+        """
+        Returns the path of the config folder, which contains the cache folder
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :return:
+        """
+        return self.config.folder_path if self.folder_path is None else self.folder_path
+
+    def get_path(self) -> str:
+        """
+        Returns the path of the folder, which contains the cached bytecode
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :return:
+        """
+        return os.path.join(self.get_folder_path(), self.FOLDER_NAME)
+
+    def dump_bytecode(self, bucket: Bucket):
+        # Without an installed rewardify environment, there is nowhere to put the cache
+        if not os.path.exists(self.get_folder_path()):
+            return
+
+        try:
+            os.makedirs(self.get_path(), exist_ok=True)
+            super(TemplateBytecodeCache, self).dump_bytecode(bucket)
+        except OSError:
+            pass
+
+    def clear(self):
+        if os.path.exists(self.get_path()):
+            shutil.rmtree(self.get_path())
+
+    def _get_cache_filename(self, bucket: Bucket) -> str:
+        return os.path.join(self.get_path(), self.pattern % bucket.key)
+
+
+def create_environment(folder_path: str) -> Environment:
+    """
+    Returns a new jinja environment, which loads the templates from the given folder path and caches their bytecode
+    within the rewardify config folder.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param folder_path:
+    :return:
+    """
+    loader = FileSystemLoader(searchpath=folder_path)
+    return Environment(loader=loader, bytecode_cache=TemplateBytecodeCache())
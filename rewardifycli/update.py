@@ -7,19 +7,47 @@ import click
 from rewardify.main import Rewardify
 
 # local
-from rewardifycli.util import login_required
+from rewardifycli import updater
+from rewardifycli import singleflight
+
+from rewardifycli.util import login_required, requires
 from rewardifycli.util import Templater, UserCredentials
 
 
 @click.command('update')
+@click.option('-w', '--workers', 'workers', type=click.IntRange(min=1), default=updater.DEFAULT_WORKERS,
+              help='The max number of backend queries, which are executed at the same time')
+@click.option('-t', '--timeout', 'timeout', type=click.FloatRange(min=0, min_open=True),
+              default=updater.DEFAULT_TIMEOUT,
+              help='The max number of seconds the backend query for a single user may take (only for incremental '
+                   'backends)')
+@click.option('--max-age', 'max_age', type=click.FloatRange(min=0), default=None,
+              help='Skip the update, if the last update has finished less than the given number of seconds ago')
+@requires('config', 'database', 'backend')
 @login_required
-def update():
+def update(workers, timeout, max_age):
     credentials: UserCredentials = UserCredentials.instance()
     facade: Rewardify = Rewardify.instance()
     templater: Templater = Templater.instance()
 
+    # 17.10.2026
+    # Instead of "facade.backend_update", the update is done by the updater, which queries the users in parallel,
+    # only processes the new actions since the checkpoint of every user (if the backend supports that) and grants the
+    # gold with increment queries, so that concurrent commands can not overwrite the new balances.
+    backend = facade.CONFIG.BACKEND()
+    backend_updater = updater.Updater(backend, workers=workers, timeout=timeout)
+
+    # 17.10.2026
+    # Only one update is running at a time. An update started while another one is running waits for it and reports
+    # its results instead of querying the backend again.
+    results, performed = singleflight.single_flight(backend_updater.run, max_age=max_age)
+
     context = {
-        'backend':      facade.CONFIG.BACKEND
+        'backend':      facade.CONFIG.BACKEND,
+        'incremental':  updater.is_incremental(backend),
+        'performed':    performed,
+        'age':          singleflight.get_age(),
+        'results':      results,
+        'summary':      updater.summarize(results)
     }
-    facade.backend_update()
     templater.echo_template('updated.jinja2', context)
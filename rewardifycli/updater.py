@@ -0,0 +1,341 @@
+"""
+This module contains the incremental backend update, which is used by the "update" command.
+
+The "get_update" method of the rewardify backends returns the new activities of all the users at once, which means
+that a single slow query blocks the whole update. Backends can additionally implement the incremental interface:
+
+    get_user_update(username: str, cursor, timeout: float) -> Tuple[List[Dict], cursor]
+
+Given a user and the cursor, which the backend has returned for that user the last time (None for the very first
+update), this method returns the list of the new action dicts of that user and the new cursor. The cursor can be any
+JSON value and is saved as the checkpoint of the user within the database (see "rewardifycli.models.UpdateCheckpoint").
+The queries for the single users are executed in parallel by a bounded number of worker threads and every query has
+its own timeout. A query, which has timed out, is abandoned and does not keep the command from returning.
+
+The gold (and optionally the dust) of the actions is granted with a single increment query per user, within the same
+transaction, which also saves the new checkpoint. This way the actions of a run are either granted and checkpointed
+together or not at all.
+
+Backends, which only implement "get_update", are still supported. They are queried as a whole and keep track of the
+processed actions on their own, as before. This query has no timeout: The backend marks the actions as processed, when
+it returns them, so a result, which is given up on, would be lost for good.
+
+CHANGELOG
+
+Added 17.10.2026
+"""
+# standard library
+import json
+import time
+import queue
+import datetime
+import threading
+
+from typing import Dict, List, Optional
+
+# third party
+from rewardify.backends import AbstractBackend
+
+from rewardify.models import User
+
+# local
+from rewardifycli.models import UpdateCheckpoint
+from rewardifycli.concurrency import write_transaction
+
+
+# The default number of backend queries, which are executed at the same time
+DEFAULT_WORKERS = 8
+
+# The default time in seconds, after which the query for a single user is given up
+DEFAULT_TIMEOUT = 30.0
+
+# The interval in seconds, in which the running queries are checked for their timeout
+POLL_INTERVAL = 0.1
+
+
+def is_incremental(backend: AbstractBackend) -> bool:
+    """
+    Returns whether the given backend implements the incremental per user interface "get_user_update".
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param backend:
+    :return:
+    """
+    return callable(getattr(backend, 'get_user_update', None))
+
+
+def get_source(backend: AbstractBackend) -> str:
+    """
+    Returns the string, which identifies the given backend as the source of the checkpoints.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param backend:
+    :return:
+    """
+    backend_class = type(backend)
+    return '{}.{}'.format(backend_class.__module__, backend_class.__qualname__)
+
+
+class Updater:
+    """
+    Instances of this class perform a single backend update for all the users and collect a result dict for every
+    user with the following keys:
+    - username: The name of the user
+    - status: "updated", "unchanged", "timeout", "error" or "unknown" (the backend returned a user, which does not
+      exist)
+    - actions: The number of new actions
+    - gold: The gold granted for the new actions
+    - dust: The dust granted for the new actions
+    - error: The error message, if the status is "error" or "timeout"
+
+    CHANGELOG
+
+    Added 17.10.2026
+    """
+    def __init__(self, backend: AbstractBackend, workers: int = DEFAULT_WORKERS, timeout: float = DEFAULT_TIMEOUT):
+        """
+        The constructor.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param backend: The backend instance to query for the new actions
+        :param workers: The max number of queries to the backend, which are executed at the same time
+        :param timeout: The max time in seconds the query for a single user of an incremental backend may take
+        """
+        self.backend = backend
+        self.workers = workers
+        self.timeout = timeout
+        self.source = get_source(backend)
+
+        # The keys are the usernames and the values the ids of all the users
+        self.user_ids: Dict[str, int] = {}
+        self.results: List[Dict] = []
+
+    def run(self) -> List[Dict]:
+        """
+        Performs the update for all the users and returns the list of result dicts, sorted by the usernames.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :return:
+        """
+        self.user_ids = {name: user_id for user_id, name in User.select(User.id, User.name).tuples()}
+        self.results = []
+
+        if is_incremental(self.backend):
+            self.run_incremental()
+        else:
+            self.run_complete()
+
+        self.results.sort(key=lambda result: result['username'])
+        return self.results
+
+    def run_incremental(self):
+        """
+        Queries the backend for the new actions of every single user, starting at the checkpoint of that user, and
+        grants the actions as soon as the query of a user has finished.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        Changed 17.10.2026
+        The queries are executed by daemon threads instead of a ThreadPoolExecutor, so that a query, which has timed
+        out, no longer makes the process wait for it at its exit.
+
+        :return:
+        """
+        cursors = self.load_cursors()
+
+        # The worker threads save the time, at which they actually started the query for a user. The timeout starts
+        # then and not when the query is submitted, because there may not be a free worker for a long time.
+        started: Dict[str, float] = {}
+
+        jobs: queue.Queue = queue.Queue()
+        for username in self.user_ids.keys():
+            jobs.put(username)
+
+        # The workers put a tuple (username, actions, cursor, error) for every finished query into this queue
+        outcomes: queue.Queue = queue.Queue()
+        abandoned = threading.Event()
+
+        def work():
+            while not abandoned.is_set():
+                try:
+                    username = jobs.get_nowait()
+                except queue.Empty:
+                    return
+
+                started[username] = time.monotonic()
+                try:
+                    actions, cursor = self.backend.get_user_update(username, cursors.get(username), self.timeout)
+                    outcomes.put((username, actions, cursor, None))
+                except Exception as e:
+                    outcomes.put((username, [], None, e))
+
+        # A query can not be interrupted from the outside. The workers are daemon threads, so that a query, which has
+        # timed out, can simply be abandoned: The threads of a ThreadPoolExecutor would be joined at the exit of the
+        # interpreter, which would make the command wait for the slowest query after all.
+        def start_worker():
+            threading.Thread(target=work, name='rewardify-update', daemon=True).start()
+
+        for _ in range(min(self.workers, len(self.user_ids))):
+            start_worker()
+
+        remaining = set(self.user_ids.keys())
+        try:
+            while remaining:
+                # The database is only ever written from this thread, the worker threads only query the backend
+                try:
+                    username, actions, cursor, error = outcomes.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    pass
+                else:
+                    # The result of a query, which has already timed out, is ignored
+                    if username in remaining:
+                        remaining.discard(username)
+                        if error is not None:
+                            self.add_error(username, 'error', '{}: {}'.format(error.__class__.__name__, error))
+                        else:
+                            self.grant(username, actions, cursor, cursors.get(username))
+
+                now = time.monotonic()
+                for username in list(remaining):
+                    if username in started and now - started[username] > self.timeout:
+                        remaining.discard(username)
+                        self.add_error(username, 'timeout', 'No response after {} seconds'.format(self.timeout))
+                        # The worker of the abandoned query is replaced, so that the queries, which are still
+                        # waiting, do not run out of workers
+                        if not jobs.empty():
+                            start_worker()
+        finally:
+            # The workers do not start any more queries, once the update is over
+            abandoned.set()
+
+    def run_complete(self):
+        """
+        Queries the backend for the new actions of all the users at once using "get_update" and grants them.
+        There is no timeout for this query, because the backend already considers the actions as processed, once it
+        returns them. Giving up on the result would mean, that the gold of these actions is never granted.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :return:
+        """
+        user_actions = self.backend.get_update()
+
+        for username in self.user_ids.keys():
+            self.grant(username, user_actions.get(username, []))
+
+        for username in sorted(set(user_actions.keys()) - set(self.user_ids.keys())):
+            self.add_error(username, 'unknown', 'The user does not exist')
+
+    def grant(self, username: str, actions: List[Dict], cursor=None, previous_cursor=None):
+        """
+        Grants the gold and dust of the given actions to the given user and saves the new cursor as the checkpoint of
+        the user, if it has changed. Adds the result for the user.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param username:
+        :param actions: The list of the new action dicts of the user
+        :param cursor: The new cursor for the user
+        :param previous_cursor: The cursor, from which the actions have been queried
+        :return:
+        """
+        gold = sum(int(action.get('gold', 0)) for action in actions)
+        dust = sum(int(action.get('dust', 0)) for action in actions)
+        encoded_cursor = None if cursor is None else json.dumps(cursor)
+
+        with write_transaction(username):
+            # The amounts are added by the database itself, so that a command of the user, which runs at the same
+            # time, can not be overwritten with an old balance
+            if gold or dust:
+                User.update(gold=User.gold + gold, dust=User.dust + dust).where(User.name == username).execute()
+
+            if cursor is not None and cursor != previous_cursor:
+                (UpdateCheckpoint
+                 .insert(user=self.user_ids[username], source=self.source, cursor=encoded_cursor,
+                         updated=datetime.datetime.now())
+                 .on_conflict(conflict_target=[UpdateCheckpoint.user, UpdateCheckpoint.source],
+                              update={UpdateCheckpoint.cursor: encoded_cursor,
+                                      UpdateCheckpoint.updated: datetime.datetime.now()})
+                 .execute())
+
+        self.results.append({
+            'username':     username,
+            'status':       'updated' if actions else 'unchanged',
+            'actions':      len(actions),
+            'gold':         gold,
+            'dust':         dust,
+            'error':        None
+        })
+
+    # HELPER METHODS
+    # --------------
+
+    def load_cursors(self) -> Dict[str, Optional[object]]:
+        """
+        Returns a dict, whose keys are the usernames and the values the cursors of their checkpoints for the backend
+        of this updater. Users without a checkpoint are not contained.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :return:
+        """
+        query = (UpdateCheckpoint
+                 .select(User.name, UpdateCheckpoint.cursor)
+                 .join(User)
+                 .where(UpdateCheckpoint.source == self.source))
+        return {name: json.loads(cursor) for name, cursor in query.tuples() if cursor is not None}
+
+    def add_error(self, username: str, status: str, error: str):
+        self.results.append({
+            'username':     username,
+            'status':       status,
+            'actions':      0,
+            'gold':         0,
+            'dust':         0,
+            'error':        error
+        })
+
+
+def summarize(results: List[Dict]) -> Dict:
+    """
+    Returns a dict with the totals over the given list of result dicts: The number of "users", the number of users per
+    "status", the total number of "actions" and the total "gold" and "dust" granted.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param results:
+    :return:
+    """
+    statuses = {}
+    for result in results:
+        statuses[result['status']] = statuses.get(result['status'], 0) + 1
+
+    return {
+        'users':        len(results),
+        'statuses':     statuses,
+        'actions':      sum(result['actions'] for result in results),
+        'gold':         sum(result['gold'] for result in results),
+        'dust':         sum(result['dust'] for result in results)
+    }
@@ -7,8 +7,12 @@ import click
 from rewardify.main import Rewardify
 
 # local
-from rewardifycli.util import login_required
+from rewardifycli import provisioning
+from rewardifycli import leaderboard
+
+from rewardifycli.util import login_required, requires
 from rewardifycli.util import Templater, UserCredentials
+from rewardifycli.concurrency import write_transaction
 
 
 @click.group(name='users')
@@ -19,6 +23,7 @@ def users():
 @users.command('create')
 @click.argument('username')
 @click.argument('password')
+@requires('config', 'database')
 def create(username, password):
     credentials: UserCredentials = UserCredentials.instance()
     facade: Rewardify = Rewardify.instance()
@@ -29,8 +34,123 @@ def create(username, password):
     }
 
     try:
-        facade.create_user(username, password)
+        # 17.10.2026
+        # Another process might create a user with the same name at the same time
+        with write_transaction(username):
+            facade.create_user(username, password)
         templater.echo_template('user_created.jinja2', context)
     except Exception as e:
         click.echo(e)
         raise click.Abort()
+
+
+@users.command('import')
+@click.argument('file', type=click.File('r'), default='-')
+@click.option('--input-format', 'input_format', type=click.Choice(provisioning.INPUT_FORMATS), default='auto',
+              help='The format of the file. The rows need a "username" and a "password" and may contain "gold" and '
+                   '"dust". "auto" detects NDJSON by a leading "{", everything else is read as CSV with a header')
+@click.option('-w', '--workers', 'workers', type=click.IntRange(min=1), default=None,
+              help='The number of processes hashing the passwords. By default one per cpu')
+@click.option('--batch-size', 'batch_size', type=click.IntRange(min=1), default=provisioning.DEFAULT_BATCH_SIZE,
+              help='The number of users, which are created within a single transaction')
+@requires('config', 'database')
+def import_users(file, input_format, workers, batch_size):
+    templater: Templater = Templater.instance()
+
+    user_import = provisioning.UserImport(workers=workers, batch_size=batch_size)
+    user_import.run(provisioning.read_rows(file, input_format))
+
+    context = {
+        'created':      user_import.created,
+        'failures':     user_import.failures,
+        'total':        user_import.created + len(user_import.failures)
+    }
+    templater.echo_template('users_imported.jinja2', context)
+
+
+@users.command('delete')
+@click.argument('usernames', nargs=-1)
+@click.option('-f', '--file', 'file', type=click.File('r'), default=None,
+              help='A CSV or NDJSON file with the "username" of the users to delete. Use "-" to read from stdin')
+@click.option('--input-format', 'input_format', type=click.Choice(provisioning.INPUT_FORMATS), default='auto',
+              help='The format of the file')
+@click.option('--batch-size', 'batch_size', type=click.IntRange(min=1), default=provisioning.DEFAULT_BATCH_SIZE,
+              help='The number of users, which are deleted within a single transaction')
+@click.option('--dry-run', 'dry_run', is_flag=True,
+              help='Only report, which users would be deleted')
+@click.option('-y', '--yes', 'yes', is_flag=True,
+              help='Delete the users without asking for confirmation')
+@requires('config', 'database')
+def delete(usernames, file, input_format, batch_size, dry_run, yes):
+    templater: Templater = Templater.instance()
+
+    if not usernames and file is None:
+        raise click.UsageError('Either give the usernames or a file with the usernames')
+
+    # The deletion can not be undone, so it has to be confirmed. If the usernames are read from stdin, there is nobody
+    # to answer the prompt, which is why "--yes" is required in that case.
+    if not dry_run and not yes:
+        if file is not None and file.name == '<stdin>':
+            raise click.UsageError('Confirm the deletion of the users from stdin with "--yes"')
+        click.confirm('Do you really want to delete the users with all their packs and rewards?', abort=True)
+
+    def iter_usernames():
+        yield from usernames
+        if file is not None:
+            for line, row, error in provisioning.read_rows(file, input_format):
+                name = None if row is None else (row.get('username') or row.get('name'))
+                if name:
+                    yield str(name).strip()
+                else:
+                    click.echo('Skipping line {}: {}'.format(line, error or 'The username is missing'), err=True)
+
+    result = provisioning.delete_users(iter_usernames(), batch_size=batch_size, dry_run=dry_run)
+
+    context = {
+        'dry_run':      dry_run,
+        **result
+    }
+    templater.echo_template('users_deleted.jinja2', context)
+
+
+@users.command('list')
+@click.option('--after', 'after', default=None,
+              help='The cursor printed at the end of the previous page to continue the listing after it')
+@click.option('--per-page', 'per_page', type=click.IntRange(min=1), default=leaderboard.DEFAULT_PER_PAGE)
+@requires('config', 'database')
+def listing(after, per_page):
+    templater: Templater = Templater.instance()
+
+    try:
+        records = leaderboard.iter_users(after=after, per_page=per_page)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--after')
+
+    context = {
+        'per_page':     per_page,
+        'command':      'rewardify users list'
+    }
+    templater.stream_template('users_list.jinja2', context, records)
+
+
+@users.command('top')
+@click.option('-b', '--by', 'metric', type=click.Choice(leaderboard.METRICS), default='gold',
+              help='The value, by which the users are ranked. "rewards" and "legendary" count the rewards')
+@click.option('--after', 'after', default=None,
+              help='The cursor printed at the end of the previous page to continue the ranking after it')
+@click.option('--per-page', 'per_page', type=click.IntRange(min=1), default=leaderboard.DEFAULT_PER_PAGE)
+@requires('config', 'database')
+def top(metric, after, per_page):
+    templater: Templater = Templater.instance()
+
+    try:
+        records = leaderboard.iter_ranking(metric, after=after, per_page=per_page)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--after')
+
+    context = {
+        'metric':       metric,
+        'per_page':     per_page,
+        'command':      'rewardify users top --by {}'.format(metric)
+    }
+    templater.stream_template('users_top.jinja2', context, records)
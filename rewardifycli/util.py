@@ -1,20 +1,26 @@
 # standard library
 import os
+import json
+import time
+import hmac
 import shutil
+import base64
+import hashlib
+import secrets
+import binascii
+import datetime
 
-from typing import Dict
+from typing import Dict, Iterable
 
 # third party
 import click
 
-from jinja2 import FileSystemLoader, Environment
-
 from rewardify.env import EnvironmentConfig
 
-from rewardify.main import Rewardify
-
 # local
 from rewardifycli.__internal.util import Singleton
+from rewardifycli.concurrency import atomic_write, write_transaction
+from rewardifycli.profiling import phase
 
 # ######################
 # PROJECT WIDE CONSTANTS
@@ -33,10 +39,28 @@ class Templater:
     This singleton wraps the templating functionality for the project. The "use_template" method returns the string
     result after using the given context on the template with the given name.
 
+    The output format can be changed from the default "text" to "json" or "ndjson". In these modes the templates are
+    not rendered at all and the context dicts are echoed as JSON objects instead (with the additional key "event",
+    which is the name of the template without the file extension). "json" echoes indented objects and "ndjson" echoes
+    every object in a single line.
+
     CHANGELOG
 
     Added 14.06.2019
+
+    Changed 17.10.2026
+    The jinja environment now uses a bytecode cache within the config folder, so that the templates do not have to be
+    compiled again by every process. The "compile" method fills this cache for all the templates at once.
+
+    Changed 17.10.2026
+    Added the machine readable output formats. The jinja environment is only created, when a template actually has to
+    be rendered, so that the other formats do not have to set it up.
     """
+    OUTPUT_FORMATS = ['text', 'json', 'ndjson']
+
+    # These fields of the database models will never be part of the JSON output
+    SECRET_FIELDS = ['password']
+
     def __init__(self):
         """
         The constructor.
@@ -44,10 +68,61 @@ class Templater:
         CHANGELOG
 
         Added 14.06.2019
+
+        Changed 17.10.2026
+        The environment is created lazily.
         """
         self.folder_path = os.path.join(PATH, 'templates')
-        self.loader = FileSystemLoader(searchpath=self.folder_path)
-        self.environment = Environment(loader=self.loader)
+        self.output_format = 'text'
+        self._environment = None
+
+    @property
+    def environment(self):
+        """
+        Returns the jinja environment, which loads the templates. It is created with the first access.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :return:
+        """
+        if self._environment is None:
+            # Setting up the loader and the bytecode cache is only needed for the text output, which is why the
+            # templating module is only imported here
+            from rewardifycli.templating import create_environment
+            self._environment = create_environment(self.folder_path)
+
+        return self._environment
+
+    def compile(self, folder_path: str = None) -> int:
+        """
+        Compiles all the templates of the templates folder into the bytecode cache, so that not even the first command
+        using a template has to compile it. Returns the number of templates.
+        Optionally the path of the config folder can be given, into which the cache should be written. By default this
+        is the folder path of the environment config.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param folder_path:
+        :return:
+        """
+        from rewardifycli.templating import TemplateBytecodeCache
+
+        environment = self.environment
+        if folder_path is not None:
+            environment = self.environment.overlay(bytecode_cache=TemplateBytecodeCache(folder_path))
+
+        names = environment.list_templates(extensions=['jinja2'])
+        for name in names:
+            # Loading the template directly through the loader bypasses the in memory cache of the environment, which
+            # would otherwise prevent the templates, which have already been used by this process, from being written
+            # into the bytecode cache
+            environment.loader.load(environment, name)
+
+        return len(names)
 
     def use_template(self, name: str, context: Dict) ->str:
         """
@@ -66,6 +141,25 @@ class Templater:
         content = template.render(**context)
         return content
 
+    def use_json(self, name: str, context: Dict) -> str:
+        """
+        Given the name of the template and the context dict, this method returns the JSON string of the context
+        according to the current output format.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param name:
+        :param context:
+        :return:
+        """
+        data = {'event': os.path.splitext(name)[0]}
+        data.update(context)
+
+        indent = 2 if self.output_format == 'json' else None
+        return json.dumps(data, indent=indent, default=self.serialize)
+
     def echo_template(self, name: str, context: Dict):
         """
         Given the name of a template in the templates folder and the context dict, this method will echo the result of
@@ -75,12 +169,100 @@ class Templater:
 
         Added 15.06.2019
 
+        Changed 17.10.2026
+        For the machine readable output formats, the context is echoed as JSON instead.
+
+        Changed 17.10.2026
+        The rendering is measured as the "render" phase of the timings.
+
         :param name:
         :param context:
         :return:
         """
-        content = self.use_template(name, context)
-        click.echo(content)
+        # 17.10.2026
+        # The rendering (and echoing) is measured as its own phase for the "--timings" option
+        with phase('render'):
+            if self.output_format == 'text':
+                content = self.use_template(name, context)
+            else:
+                content = self.use_json(name, context)
+            click.echo(content)
+
+    def stream_template(self, name: str, context: Dict, items: Iterable):
+        """
+        Given the name of a template, the context dict and an iterable of items, this method echoes the result of the
+        template rendering piece by piece, while the template iterates over the items (which are available as "items"
+        within the template). This way the items never have to be in memory all at once.
+        For the machine readable output formats, every single item is echoed as its own JSON object, which contains
+        the item as "item" in addition to the context. For "json" these objects are wrapped into an array, so that the
+        whole output is a single valid JSON document.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        Changed 17.10.2026
+        The objects of the "json" format are wrapped into an array instead of being echoed one after another.
+
+        :param name:
+        :param context:
+        :param items:
+        :return:
+        """
+        # The items are usually streamed from the database while rendering, so this phase includes fetching them
+        with phase('render'):
+            if self.output_format == 'text':
+                template = self.environment.get_template(name)
+                for chunk in template.generate(items=items, **context):
+                    click.echo(chunk, nl=False)
+                click.echo()
+            elif self.output_format == 'json':
+                # The array is still echoed piece by piece, the separators are simply put in front of the objects
+                click.echo('[', nl=False)
+                for index, item in enumerate(items):
+                    separator = ',\n' if index else '\n'
+                    click.echo(separator + self.use_json(name, {**context, 'item': item}), nl=False)
+                click.echo('\n]')
+            else:
+                for item in items:
+                    click.echo(self.use_json(name, {**context, 'item': item}))
+
+    # HELPER METHODS
+    # --------------
+
+    @classmethod
+    def serialize(cls, obj):
+        """
+        This is the "default" function for the JSON encoding of the contexts. It converts the objects, which can
+        appear within the contexts, but which the json module can not handle by itself.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param obj:
+        :return:
+        """
+        # The read only records (see "rewardifycli.projections")
+        if hasattr(obj, 'to_dict'):
+            return obj.to_dict()
+
+        # The database models (peewee) save the raw values of their fields in the "__data__" dict
+        if hasattr(obj, '__data__'):
+            return {key: value for key, value in obj.__data__.items() if key not in cls.SECRET_FIELDS}
+
+        if isinstance(obj, (datetime.date, datetime.datetime)):
+            return obj.isoformat()
+
+        if isinstance(obj, (set, tuple)):
+            return list(obj)
+
+        # The backend in the context of the "update" command is a class
+        if isinstance(obj, type):
+            return obj.__name__
+
+        # This includes the Rarity objects, whose string representation is the rarity name
+        return str(obj)
 
 
 # #################
@@ -90,10 +272,9 @@ class Templater:
 def login_required(func):
     """
     This is a decorator for the cli commands. It makes sure, that a valid user to perform the commands on is currently
-    logged in. It does so by checking the credentials from the temp file with the facade object for the three cases:
+    logged in. It does so by checking the credentials from the temp file for the two cases:
     1) Is any user specified in the credentials file?
-    2) Does a user with the given username even exist?
-    3) Is the correct password for the user given
+    2) Is the session token of the credentials valid (correct signature, not expired and for the given user)?
 
     !NOTE: It is important, that this is the first decorator applied to the function, which means, that it has to be
     closest to the function name, otherwise it will not work.
@@ -107,36 +288,59 @@ def login_required(func):
     for the command) a click.Abort() exception will be risen, which will actually cause the exit code 1 and a
     termination of the command.
 
+    Changed 17.10.2026
+    The credentials no longer contain the password, but a signed session token, which has been issued by the login
+    command. Validating this token does not need the database at all, which is why the checks for the existence of the
+    user and the password have been removed.
+
+    Changed 17.10.2026
+    The checks are measured as the "auth" phase of the timings.
+
+    Changed 17.10.2026
+    A valid token of a user, which has been deleted since the login, would make the commands crash. So if the command
+    requires the database anyways, the existence of the user is checked again with a single cheap query.
+
     :param func:
     :param args:
     :param kwargs:
     :return:
     """
     def wrapper(*args, **kwargs):
-        # UserCredentials is a singleton, that provides access to the credentials of the currently logged in user,
-        # which are being saved in a temporary file
-        credentials: UserCredentials = UserCredentials.instance()
-
-        # The Rewardify object is the main facade to the rewardify system. It provides the methods for checking user
-        # existence and the password.
-        facade: Rewardify = Rewardify.instance()
-
-        templater: Templater = Templater.instance()
-
-        # Some of the templates user the username to display the error
-        context = {'username': credentials['username']}
-
-        if credentials.is_default():
-            templater.echo_template('no_user.jinja2', context)
-            raise click.Abort()
-
-        if not facade.exists_user(credentials['username']):
-            templater.echo_template('user_not_exists.jinja2', context)
-            raise click.Abort()
-
-        if not facade.user_check_password(credentials['username'], credentials['password']):
-            templater.echo_template('wrong_password.jinja2', context)
-            raise click.Abort()
+        # 17.10.2026
+        # The checks are measured as the "auth" phase of the timings. The command itself is not part of it.
+        with phase('auth'):
+            # UserCredentials is a singleton, that provides access to the credentials of the currently logged in
+            # user, which are being saved in a temporary file
+            credentials: UserCredentials = UserCredentials.instance()
+
+            templater: Templater = Templater.instance()
+
+            # Some of the templates user the username to display the error
+            context = {'username': credentials['username']}
+
+            if credentials.is_default():
+                templater.echo_template('no_user.jinja2', context)
+                raise click.Abort()
+
+            # 17.10.2026
+            # The session token is validated locally by checking its signature and its expiration date. It also has
+            # to belong to the user, which is claimed to be logged in.
+            try:
+                username = SessionToken.validate(credentials['token'])
+            except ValueError:
+                username = None
+
+            if username != credentials['username']:
+                templater.echo_template('session_invalid.jinja2', context)
+                raise click.Abort()
+
+            # 17.10.2026
+            # The token stays valid, even if the user has been deleted in the meantime. The "requires" decorator has
+            # already connected to the database at this point, if the command needs it.
+            resources: Resources = Resources.instance()
+            if 'database' in resources.provided and not user_exists(username):
+                templater.echo_template('user_not_exists.jinja2', context)
+                raise click.Abort()
 
         # Only if the user really truely is valid, the command is being executed
         return func(*args, **kwargs)
@@ -149,22 +353,199 @@ def login_required(func):
     return wrapper
 
 
+def user_exists(username: str) -> bool:
+    """
+    Returns whether a user with the given name exists within the database. Unlike "Rewardify.exists_user" this only
+    queries the existence and does not load the user.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param username:
+    :return:
+    """
+    from rewardify.models import User
+
+    return User.select().where(User.name == username).exists()
+
+
+class SessionToken:
+    """
+    This class issues and validates the session tokens, which are used to authenticate the logged in user for the
+    commands. The password of the user is only checked once by the login command, which then issues a session token.
+
+    A session token consists of two parts separated by a dot: The base64 encoded JSON payload containing the username
+    and the unix timestamp, when the token expires and the hex HMAC signature of that payload. The signature is created
+    with a secret key, which is randomly generated once and stored in the config folder.
+
+    EXAMPLE:
+    >> token = SessionToken.issue("Jonas", 3600)
+    >> SessionToken.validate(token)
+    "Jonas"
+
+    CHANGELOG
+
+    Added 17.10.2026
+    """
+    SECRET_FILE_NAME = '.cli_secret'
+
+    # The default lifetime of a token in seconds: One week
+    DEFAULT_LIFETIME = 7 * 24 * 60 * 60
+
+    @classmethod
+    def issue(cls, username: str, lifetime: int = DEFAULT_LIFETIME) -> str:
+        """
+        Given the username and the lifetime of the token in seconds, this method returns a new signed session token.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param username:
+        :param lifetime:
+        :return:
+        """
+        payload = {
+            'username':     username,
+            'expires':      int(time.time()) + lifetime
+        }
+        payload_string = base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii')
+        return '{}.{}'.format(payload_string, cls.sign(payload_string))
+
+    @classmethod
+    def validate(cls, token: str) -> str:
+        """
+        Given a session token, this method returns the username of the user, to which the token belongs. If the token
+        is malformed, has an invalid signature or is expired, a ValueError is risen.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :raises: ValueError
+
+        :param token:
+        :return:
+        """
+        payload_string, _, signature = token.partition('.')
+
+        # The comparison of the signature has to take the same time no matter how many characters are correct, so that
+        # the signature can not be guessed character by character
+        if not hmac.compare_digest(signature, cls.sign(payload_string)):
+            raise ValueError('The session token has an invalid signature!')
+
+        payload = cls.payload(token)
+        if payload['expires'] < time.time():
+            raise ValueError('The session token has expired!')
+
+        return payload['username']
+
+    @classmethod
+    def payload(cls, token: str) -> Dict:
+        """
+        Returns the payload dict of the given token WITHOUT validating it. Raises a ValueError if the token is
+        malformed.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :raises: ValueError
+
+        :param token:
+        :return:
+        """
+        payload_string = token.partition('.')[0]
+        try:
+            return json.loads(base64.urlsafe_b64decode(payload_string.encode('ascii')).decode('utf-8'))
+        except (binascii.Error, UnicodeError, json.JSONDecodeError):
+            raise ValueError('The session token is malformed!')
+
+    @classmethod
+    def sign(cls, payload_string: str) -> str:
+        """
+        Returns the hex HMAC signature for the given payload string
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param payload_string:
+        :return:
+        """
+        return hmac.new(cls.get_secret(), payload_string.encode('utf-8'), hashlib.sha256).hexdigest()
+
+    @classmethod
+    def get_secret(cls) -> bytes:
+        """
+        Returns the secret key for the signatures. If the secret file does not exist yet within the config folder, a
+        new random secret is created.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        Changed 17.10.2026
+        The new secret is written into a temporary file first, which is then linked into place. This way two processes
+        creating the secret at the same time agree on a single one and no process can read a half written secret.
+
+        :raises click.ClickException: If the secret file is empty
+        :return:
+        """
+        config: EnvironmentConfig = EnvironmentConfig.instance()
+        secret_path = os.path.join(config.folder_path, cls.SECRET_FILE_NAME)
+
+        if not os.path.exists(secret_path):
+            # Only the owner of the file should be able to read the secret, as it could be used to forge tokens
+            temp_path = '{}.{}.{}.tmp'.format(secret_path, os.getpid(), secrets.token_hex(4))
+            try:
+                descriptor = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                with os.fdopen(descriptor, mode='w') as file:
+                    file.write(secrets.token_hex(32))
+                    file.flush()
+                    os.fsync(file.fileno())
+                # Unlike a rename, the link fails if the file exists, so the secret of a process, which was faster, is
+                # never replaced. Tokens may already have been signed with it.
+                os.link(temp_path, secret_path)
+            except FileExistsError:
+                pass
+            finally:
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+
+        with open(secret_path, mode='r') as file:
+            secret = file.read().strip()
+
+        if not secret:
+            raise click.ClickException('The secret file "{}" is empty. Delete it to create a new one'.format(
+                secret_path
+            ))
+
+        return secret.encode('ascii')
+
+
 @Singleton
 class UserCredentials:
     """
     This is a singleton for easy access to the credentials of the currently logged in user.
-    To access username and password just use the instance as a dict like object with the keys "username" and
-    "password"
+    To access username and session token just use the instance as a dict like object with the keys "username" and
+    "token"
 
     CHANGELOG
 
     Added 14.06.2019
+
+    Changed 17.10.2026
+    Instead of the plain text password, the credentials now contain the session token issued by the login command.
+    The credentials from the file can also be overridden by a session token given directly with the "use_session"
+    method.
     """
     FILE_NAME = '.cli_login.txt'
 
     DEFAULT_CREDENTIALS = {
         'username':     '22e12933a058d3c0082a2899e20465582b9af176e2de4a4369206c3c450a6e8b',
-        'password':     '09d1de35fbcc581d960ab74ab8f7e0c1f8bf6851c2800672253852d84e7eed5e'
+        'token':        '09d1de35fbcc581d960ab74ab8f7e0c1f8bf6851c2800672253852d84e7eed5e'
     }
 
     def __init__(self):
@@ -216,17 +597,42 @@ class UserCredentials:
 
         with open(self.get_path(), mode='r') as file:
             content = file.read()
-            # The file contains the username and the password ins plain text, separated by a comma, with the username
-            # being the first value and the password being the second
+            # The file contains the username and the session token in plain text, separated by a comma, with the
+            # username being the first value and the token being the second
             content_split = content.split(',')
             self.credentials = {
                 'username':     content_split[0],
-                'password':     content_split[1]
+                'token':        content_split[1]
             }
 
-    def save(self, username: str, password: str):
+    def use_session(self, token: str):
+        """
+        Given a session token, this method will use the credentials described by this token instead of the ones from
+        the credentials file (without changing the file). This way multiple users can work on the same machine at the
+        same time.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param token:
+        :return:
+        """
+        # The username is taken from the token without validating it here, the validation is the job of the
+        # "login_required" decorator. A malformed token does not belong to any user.
+        try:
+            username = SessionToken.payload(token)['username']
+        except (ValueError, KeyError, TypeError):
+            username = ''
+
+        self.credentials = {
+            'username':     username,
+            'token':        token
+        }
+
+    def save(self, username: str, token: str):
         """
-        Given the username and the password, this method will write a new credential file using these values
+        Given the username and the session token, this method will write a new credential file using these values
 
         CHANGELOG
 
@@ -236,13 +642,18 @@ class UserCredentials:
         After the changes are being saved to the file the load() method is being called, so that the changes are also
         made to the program instance.
 
+        Changed 17.10.2026
+        The file contains the session token instead of the password.
+
+        Changed 17.10.2026
+        The file is written atomically, so that another process never reads a half written credentials file.
+
         :param username:
-        :param password:
+        :param token:
         :return:
         """
-        with open(self.get_path(), mode='w') as file:
-            content = '{},{}'.format(username, password)
-            file.write(content)
+        content = '{},{}'.format(username, token)
+        atomic_write(self.get_path(), content)
 
         # 16.06.2019
         # After the save method is called the new changes have to be loaded from the file into the credentials object,
@@ -283,3 +694,194 @@ class UserCredentials:
 
     def __setitem__(self, key, value):
         self.credentials[key] = value
+
+
+# #################
+# COMMAND RESOURCES
+# #################
+
+# The keys are the names of the resources, which a command can require, and the values are the lists of the other
+# resources, which have to be provided before them. The order of this dict is also the order, in which the resources
+# are provided.
+RESOURCES = {
+    'config':       [],
+    'database':     ['config'],
+    'backend':      ['config', 'database']
+}
+
+
+@Singleton
+class Resources:
+    """
+    This singleton keeps track of the resources, which have already been initialized within the current process, and
+    initializes the ones, which are required by a command (see the "requires" decorator):
+    - "config": Loading the config values (from the compiled config cache, if possible)
+    - "database": Connecting to the database and installing the inventory counters
+    - "backend": Making sure, that the backend class from the config can actually be used for an update
+
+    Commands, which only read the config (like the listings), this way never open the database at all. A process, which
+    executes many commands (like the daemon or a batch), only initializes every resource once.
+
+    CHANGELOG
+
+    Added 17.10.2026
+    """
+    def __init__(self):
+        """
+        The constructor.
+
+        CHANGELOG
+
+        Added 17.10.2026
+        """
+        self.provided = set()
+
+    def provide(self, *resources: str):
+        """
+        Initializes all the given resources (and the resources they depend on), which have not been initialized yet.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :raises: ValueError if one of the resources is unknown
+
+        :param resources:
+        :return:
+        """
+        required = set(resources)
+        for resource in resources:
+            if resource not in RESOURCES:
+                raise ValueError('"{}" is not a resource! Use one of: {}'.format(resource, ', '.join(RESOURCES)))
+            required.update(RESOURCES[resource])
+
+        for resource in RESOURCES.keys():
+            if resource in required and resource not in self.provided:
+                # Every resource is its own phase of the timings
+                with phase(resource):
+                    getattr(self, 'provide_{}'.format(resource))()
+                self.provided.add(resource)
+
+    def mark_provided(self, *resources: str):
+        """
+        Marks the given resources as already initialized, without actually initializing them. This is used by the
+        tests, which set up their own config and database.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :param resources:
+        :return:
+        """
+        self.provided.update(resources)
+
+    def reset(self):
+        """
+        Forgets about all the initialized resources, so that they will be initialized again when they are required.
+
+        CHANGELOG
+
+        Added 17.10.2026
+
+        :return:
+        """
+        self.provided = set()
+
+    # HELPER METHODS
+    # --------------
+
+    def provide_config(self):
+        # The import is done here, because the config module imports this module
+        from rewardifycli.config import load_config
+
+        # The config is loaded from the compiled config cache, if the config file has not changed since
+        environment_config: EnvironmentConfig = EnvironmentConfig.instance()
+        load_config(environment_config)
+
+    def provide_database(self):
+        from rewardify.models import DATABASE_PROXY
+        from rewardifycli import models
+        from rewardifycli import counters
+        from rewardifycli import concurrency
+
+        environment_config: EnvironmentConfig = EnvironmentConfig.instance()
+        environment_config.init()
+
+        # The WAL mode and the busy timeout make the database usable by multiple processes at the same time
+        concurrency.configure_database(DATABASE_PROXY.obj)
+
+        # Making sure, that the inventory counters and the triggers, which maintain them, exist within the database
+        # as well as the other additional tables of the cli
+        counters.install()
+        models.install()
+
+    def provide_backend(self):
+        from rewardify.backends import AbstractBackend
+
+        environment_config: EnvironmentConfig = EnvironmentConfig.instance()
+        backend_class = getattr(environment_config, 'BACKEND', None)
+        if not (isinstance(backend_class, type) and issubclass(backend_class, AbstractBackend)):
+            raise click.ClickException('The BACKEND of the config "{}" is not a backend class!'.format(backend_class))
+
+
+def requires(*resources: str):
+    """
+    This is a decorator for the cli commands. It declares the resources ("config", "database" or "backend"), which the
+    command needs and makes sure, that exactly these resources are initialized before the command is executed.
+
+    !NOTE: Like "login_required", this decorator has to be applied after the click options and arguments, which means,
+    that it has to be below them. If the command also uses "login_required", this decorator has to be above it.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param resources:
+    :return:
+    """
+    def decorator(func):
+
+        def wrapper(*args, **kwargs):
+            resources_instance: Resources = Resources.instance()
+            resources_instance.provide(*resources)
+            # Every command uses this decorator, which makes it the place to measure the command itself
+            with phase('command'):
+                return func(*args, **kwargs)
+
+        # The doc string is needed for the help text of the command and the declared resources are kept for
+        # introspection
+        wrapper.__doc__ = func.__doc__
+        wrapper.__name__ = func.__name__
+        wrapper.resources = resources
+
+        return wrapper
+
+    return decorator
+
+
+def write_locked(func):
+    """
+    This is a decorator for the cli commands, which change the data of the logged in user. The whole command is
+    executed within a single write transaction, while holding the advisory lock for the user (see
+    "rewardifycli.concurrency.write_transaction"). This way concurrent commands for the same user can not overwrite
+    each other's changes, while the commands for different users do not wait for each other's locks.
+
+    !NOTE: This decorator has to be below "login_required", so that the lock is only acquired for a valid user.
+
+    CHANGELOG
+
+    Added 17.10.2026
+
+    :param func:
+    :return:
+    """
+    def wrapper(*args, **kwargs):
+        credentials: UserCredentials = UserCredentials.instance()
+        with write_transaction(credentials['username']):
+            return func(*args, **kwargs)
+
+    wrapper.__doc__ = func.__doc__
+    wrapper.__name__ = func.__name__
+
+    return wrapper
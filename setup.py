@@ -11,7 +11,7 @@ with open('README.rst') as readme_file:
 with open('HISTORY.rst') as history_file:
     history = history_file.read()
 
-requirements = ['Click>=6.0', 'rewardify']
+requirements = ['Click>=8.0', 'rewardify']
 
 setup_requirements = ['pytest-runner', ]
 
@@ -37,6 +37,7 @@ setup(
     entry_points={
         'console_scripts': [
             'rewardify=rewardifycli.main:cli',
+            'rewardify-client=rewardifycli.client:main',
         ],
     },
     install_requires=requirements,
@@ -0,0 +1,39 @@
+# standard library
+import os
+import sys
+import json
+import tempfile
+import subprocess
+import unittest
+
+# local
+from benchmarks.run import ROOT_PATH, compare
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_benchmarks_run_with_a_tiny_environment(self):
+        # The benchmarks change the config folder and the database of the process, which is why they are run in their
+        # own process and not within the one of the tests
+        with tempfile.TemporaryDirectory() as folder_path:
+            output_path = os.path.join(folder_path, 'results.json')
+            command = [sys.executable, '-m', 'benchmarks.run', '--sizes', '20', '--repeat', '1', '--users', '3',
+                       '--catalog', '20', '--output', output_path]
+            process = subprocess.run(command, cwd=ROOT_PATH, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            self.assertEqual(process.returncode, 0, process.stderr.decode())
+
+            with open(output_path, mode='r') as file:
+                results = json.load(file)
+
+        self.assertEqual(len(results['results']), 7)
+        self.assertIn('packs_open_all[20]', results['results'])
+
+    def test_compare_with_baseline(self):
+        baseline = {'results': {'inventory[10]': {'median': 0.1}, 'update[10]': {'median': 0.1}}}
+        results = {'results': {'inventory[10]': {'median': 0.11}, 'update[10]': {'median': 0.2},
+                               'rewards_list[10]': {'median': 0.1}}}
+
+        comparisons = {comparison['name']: comparison for comparison in compare(results, baseline, 0.25)}
+        self.assertEqual(set(comparisons.keys()), {'inventory[10]', 'update[10]'})
+        self.assertFalse(comparisons['inventory[10]']['regressed'])
+        self.assertTrue(comparisons['update[10]']['regressed'])
@@ -0,0 +1,245 @@
+# standard library
+import datetime
+
+# third party
+from rewardify.main import Rewardify
+
+from rewardify.models import Pack, Reward
+
+from rewardify.rarity import Rarity
+
+# local
+from rewardifycli.__internal.tests import RewardifycliTestCase
+from rewardifycli.__internal.tests import MockConfigContext, StandardUserContext
+
+from rewardifycli import bulk
+
+
+# One reward for every rarity, so that every possible outcome of a pack opening is covered
+REWARD_PARAMETERS = [
+    {
+        'name': 'Common Reward',
+        'description': 'for testing',
+        'rarity': 'common',
+        'cost': 100,
+        'recycle': 10
+    },
+    {
+        'name': 'Uncommon Reward',
+        'description': 'for testing',
+        'rarity': 'uncommon',
+        'cost': 100,
+        'recycle': 20
+    },
+    {
+        'name': 'Rare Reward',
+        'description': 'for testing',
+        'rarity': 'rare',
+        'cost': 100,
+        'recycle': 30
+    },
+    {
+        'name': 'Legendary Reward',
+        'description': 'for testing',
+        'rarity': 'legendary',
+        'cost': 100,
+        'recycle': 40
+    }
+]
+
+PACK_PARAMETERS = [
+    {
+        'name': 'Mixed Pack',
+        'cost': 10,
+        'description': 'For testing',
+        'slot1': [1, 0, 0, 0],
+        'slot2': [1, 0, 0, 0],
+        'slot3': [0, 1, 0, 0],
+        'slot4': [0, 0, 1, 0],
+        'slot5': [0, 0, 0, 1],
+    }
+]
+
+
+class TestOpenPacks(RewardifycliTestCase):
+
+    def test_open_packs_creates_rewards_and_removes_packs(self):
+        with MockConfigContext(self, packs=PACK_PARAMETERS, rewards=REWARD_PARAMETERS) as mock_context, \
+                StandardUserContext() as user_context:
+            facade: Rewardify = Rewardify.instance()
+            facade.user_add_gold(user_context.username, 30)
+            for i in range(3):
+                facade.user_buy_pack(user_context.username, 'Mixed Pack')
+
+            new_rewards = bulk.open_packs(user_context.username, 'Mixed Pack', 2)
+            user_context.update()
+
+            self.assertEqual(len(new_rewards), 10)
+            self.assertEqual(len(user_context.user.packs), 1)
+            self.assertEqual(len(user_context.user.rewards), 10)
+
+            # The slots of the pack are deterministic, so the exact distribution of the rarities is known
+            rarities = [str(reward.rarity) for reward in user_context.user.rewards]
+            self.assertEqual(rarities.count(Rarity.COMMON), 4)
+            self.assertEqual(rarities.count(Rarity.UNCOMMON), 2)
+            self.assertEqual(rarities.count(Rarity.RARE), 2)
+            self.assertEqual(rarities.count(Rarity.LEGENDARY), 2)
+
+            # The returned rewards have to be exactly the ones, that were added to the inventory
+            self.assertEqual(
+                sorted(reward.name for reward in new_rewards),
+                sorted(reward.name for reward in user_context.user.rewards)
+            )
+
+    def test_open_packs_not_enough_packs(self):
+        with MockConfigContext(self, packs=PACK_PARAMETERS, rewards=REWARD_PARAMETERS) as mock_context, \
+                StandardUserContext() as user_context:
+            facade: Rewardify = Rewardify.instance()
+            facade.user_add_gold(user_context.username, 10)
+            facade.user_buy_pack(user_context.username, 'Mixed Pack')
+
+            with self.assertRaises(LookupError):
+                bulk.open_packs(user_context.username, 'Mixed Pack', 2)
+
+            # Nothing at all must have been changed by the failed operation
+            user_context.update()
+            self.assertEqual(len(user_context.user.packs), 1)
+            self.assertEqual(len(user_context.user.rewards), 0)
+
+    def test_open_many_packs(self):
+        with MockConfigContext(self, packs=PACK_PARAMETERS, rewards=REWARD_PARAMETERS) as mock_context, \
+                StandardUserContext() as user_context:
+            user_id = user_context.user.id
+            rows = [
+                {
+                    'name': 'Mixed Pack',
+                    'slug': 'mixed_pack',
+                    'description': '',
+                    'gold_cost': 10,
+                    'date_obtained': datetime.datetime.now(),
+                    'slot1': [0.25, 0.25, 0.25, 0.25],
+                    'slot2': [0.25, 0.25, 0.25, 0.25],
+                    'slot3': [0.25, 0.25, 0.25, 0.25],
+                    'slot4': [0.25, 0.25, 0.25, 0.25],
+                    'slot5': [0.25, 0.25, 0.25, 0.25],
+                    'user': user_id
+                }
+            ] * 1000
+            for batch in bulk.chunked(rows, bulk.INSERT_BATCH_SIZE):
+                Pack.insert_many(batch).execute()
+            self.assertEqual(bulk.count_packs(user_context.username, 'Mixed Pack'), 1000)
+
+            bulk.open_packs(user_context.username, 'Mixed Pack', 1000)
+
+            self.assertEqual(bulk.count_packs(user_context.username, 'Mixed Pack'), 0)
+            self.assertEqual(Reward.select().count(), 5000)
+            # With uniform probabilities, every rarity has to appear
+            rarities = {str(rarity) for (rarity, ) in Reward.select(Reward.rarity).distinct().tuples()}
+            self.assertEqual(rarities, set(Rarity.RARITIES))
+
+
+class TestUseRewards(RewardifycliTestCase):
+
+    EFFECT_REWARD_PARAMETERS = [
+        {
+            'name': 'Gold Reward',
+            'description': 'for testing',
+            'rarity': 'common',
+            'effect': 'gold(100)',
+            'cost': 10,
+            'recycle': 10
+        },
+        {
+            'name': 'Dust Reward',
+            'description': 'for testing',
+            'rarity': 'common',
+            'effect': 'dust(50)',
+            'cost': 10,
+            'recycle': 10
+        }
+    ]
+
+    def test_use_rewards_applies_all_effects(self):
+        with MockConfigContext(self, rewards=self.EFFECT_REWARD_PARAMETERS) as mock_context, \
+                StandardUserContext() as user_context:
+            facade: Rewardify = Rewardify.instance()
+            facade.user_add_dust(user_context.username, 50)
+            for i in range(3):
+                facade.user_buy_reward(user_context.username, 'Gold Reward')
+            for i in range(2):
+                facade.user_buy_reward(user_context.username, 'Dust Reward')
+
+            self.assertEqual(bulk.count_rewards(user_context.username, 'Gold Reward'), 3)
+            used = bulk.use_rewards(user_context.username, 'Gold Reward', 2)
+            bulk.use_rewards(user_context.username, 'Dust Reward', 2)
+            user_context.update()
+
+            self.assertEqual(used, 2)
+            self.assertEqual(user_context.user.gold, 200)
+            self.assertEqual(user_context.user.dust, 100)
+            self.assertEqual(bulk.count_rewards(user_context.username, 'Gold Reward'), 1)
+            self.assertEqual(bulk.count_rewards(user_context.username, 'Dust Reward'), 0)
+
+    def test_use_rewards_not_enough_rewards(self):
+        with MockConfigContext(self, rewards=self.EFFECT_REWARD_PARAMETERS) as mock_context, \
+                StandardUserContext() as user_context:
+            facade: Rewardify = Rewardify.instance()
+            facade.user_add_dust(user_context.username, 10)
+            facade.user_buy_reward(user_context.username, 'Gold Reward')
+
+            with self.assertRaises(LookupError):
+                bulk.use_rewards(user_context.username, 'Gold Reward', 2)
+
+            user_context.update()
+            self.assertEqual(user_context.user.gold, 0)
+            self.assertEqual(bulk.count_rewards(user_context.username, 'Gold Reward'), 1)
+
+
+class TestRecycleRewards(RewardifycliTestCase):
+
+    def buy_rewards(self, username: str, amounts: dict):
+        facade: Rewardify = Rewardify.instance()
+        facade.user_add_dust(username, 100 * sum(amounts.values()))
+        for name, amount in amounts.items():
+            for i in range(amount):
+                facade.user_buy_reward(username, name)
+
+    def test_recycle_duplicates(self):
+        with MockConfigContext(self, rewards=REWARD_PARAMETERS) as mock_context, \
+                StandardUserContext() as user_context:
+            self.buy_rewards(user_context.username, {'Common Reward': 3, 'Rare Reward': 2, 'Legendary Reward': 1})
+
+            recycled, dust = bulk.recycle_rewards(user_context.username, keep=1)
+            user_context.update()
+
+            self.assertDictEqual(recycled, {'Common Reward': 2, 'Rare Reward': 1})
+            self.assertEqual(dust, 2 * 10 + 30)
+            self.assertEqual(user_context.user.dust, 50)
+            self.assertEqual(len(user_context.user.rewards), 3)
+
+    def test_recycle_rarity(self):
+        with MockConfigContext(self, rewards=REWARD_PARAMETERS) as mock_context, \
+                StandardUserContext() as user_context:
+            self.buy_rewards(user_context.username, {'Common Reward': 3, 'Rare Reward': 2})
+
+            recycled, dust = bulk.recycle_rewards(user_context.username, rarity='common')
+            user_context.update()
+
+            self.assertDictEqual(recycled, {'Common Reward': 3})
+            self.assertEqual(dust, 30)
+            self.assertEqual(bulk.count_rewards(user_context.username, 'Common Reward'), 0)
+            self.assertEqual(bulk.count_rewards(user_context.username, 'Rare Reward'), 2)
+
+    def test_recycle_dry_run(self):
+        with MockConfigContext(self, rewards=REWARD_PARAMETERS) as mock_context, \
+                StandardUserContext() as user_context:
+            self.buy_rewards(user_context.username, {'Uncommon Reward': 4})
+
+            recycled, dust = bulk.recycle_rewards(user_context.username, keep=2, dry_run=True)
+            user_context.update()
+
+            self.assertDictEqual(recycled, {'Uncommon Reward': 2})
+            self.assertEqual(dust, 40)
+            # A dry run must not change anything
+            self.assertEqual(user_context.user.dust, 0)
+            self.assertEqual(bulk.count_rewards(user_context.username, 'Uncommon Reward'), 4)
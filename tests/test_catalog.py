@@ -0,0 +1,132 @@
+# local
+from rewardifycli.__internal.tests import RewardifycliTestCase
+from rewardifycli.__internal.tests import MockConfigContext, StandardUserContext
+
+from rewardifycli.catalog import Catalog, get_catalog, paginate
+
+from rewardifycli.login import login
+from rewardifycli.rewards import rewards
+from rewardifycli.packs import packs
+
+from test_bulk import REWARD_PARAMETERS
+
+
+CATALOG_REWARDS = {
+    'Golden Apple':     {'cost': 400, 'recycle': 100, 'description': '', 'rarity': 'legendary'},
+    'Golden Pear':      {'cost': 300, 'recycle': 100, 'description': '', 'rarity': 'rare'},
+    'Silver Apple':     {'cost': 200, 'recycle': 50, 'description': '', 'rarity': 'rare'},
+    'Apple Pie':        {'cost': 50, 'recycle': 10, 'description': '', 'rarity': 'common'},
+    'Bread':            {'cost': 10, 'recycle': 1, 'description': '', 'rarity': 'common'},
+}
+
+
+class TestCatalog(RewardifycliTestCase):
+
+    def test_default_order(self):
+        catalog = Catalog('reward', CATALOG_REWARDS)
+        names = [entry['name'] for entry in catalog.filter()]
+        # By rarity first and then by the cost in descending order
+        self.assertEqual(names, ['Golden Apple', 'Golden Pear', 'Silver Apple', 'Apple Pie', 'Bread'])
+
+    def test_filters(self):
+        catalog = Catalog('reward', CATALOG_REWARDS)
+
+        names = [entry['name'] for entry in catalog.filter(rarity='rare')]
+        self.assertEqual(names, ['Golden Pear', 'Silver Apple'])
+
+        names = [entry['name'] for entry in catalog.filter(max_cost=200)]
+        self.assertEqual(names, ['Silver Apple', 'Apple Pie', 'Bread'])
+
+        names = [entry['name'] for entry in catalog.filter(min_cost=200)]
+        self.assertEqual(names, ['Golden Apple', 'Golden Pear', 'Silver Apple'])
+
+        names = [entry['name'] for entry in catalog.filter(min_cost=50, max_cost=200)]
+        self.assertEqual(names, ['Silver Apple', 'Apple Pie'])
+
+        names = [entry['name'] for entry in catalog.filter(search='apple')]
+        self.assertEqual(names, ['Golden Apple', 'Silver Apple', 'Apple Pie'])
+
+        # Short search terms are matched as the prefix
+        names = [entry['name'] for entry in catalog.filter(search='go')]
+        self.assertEqual(names, ['Golden Apple', 'Golden Pear'])
+
+        # All the filters combined
+        names = [entry['name'] for entry in catalog.filter(rarity='rare', max_cost=250, search='apple')]
+        self.assertEqual(names, ['Silver Apple'])
+
+        self.assertEqual(catalog.filter(search='banana'), [])
+
+    def test_suggestions(self):
+        catalog = Catalog('reward', CATALOG_REWARDS)
+
+        self.assertEqual(catalog.suggest('golden appel')[0], 'Golden Apple')
+        self.assertEqual(catalog.suggest('Bred'), ['Bread'])
+        self.assertEqual(catalog.suggest('xyz'), [])
+
+    def test_paginate(self):
+        entries, page_count = paginate(list(range(5)), 2, 2)
+        self.assertEqual(entries, [2, 3])
+        self.assertEqual(page_count, 3)
+
+        entries, page_count = paginate([], 1, 10)
+        self.assertEqual(entries, [])
+        self.assertEqual(page_count, 1)
+
+    def test_catalog_rebuilt_for_new_config(self):
+        with MockConfigContext(self) as mock_context:
+            catalog = get_catalog('reward')
+            self.assertIs(catalog, get_catalog('reward'))
+
+            mock_context.rewards = REWARD_PARAMETERS
+            mock_context.update()
+            self.assertIsNot(catalog, get_catalog('reward'))
+            self.assertIsNotNone(get_catalog('reward').get('Legendary Reward'))
+
+
+class TestCatalogCommands(RewardifycliTestCase):
+
+    def test_listing_with_filters(self):
+        with MockConfigContext(self, rewards=REWARD_PARAMETERS) as mock_context:
+            result = self.RUNNER.invoke(rewards, ['list', '--rarity', 'rare'])
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('Rare Reward', result.output)
+            self.assertNotIn('Common Reward', result.output)
+
+            result = self.RUNNER.invoke(rewards, ['list', '--search', 'reward', '--per-page', '2', '--page', '2'])
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('Uncommon Reward', result.output)
+            self.assertIn('Common Reward', result.output)
+            self.assertNotIn('Legendary Reward', result.output)
+            self.assertIn('of 2', result.output)
+
+            result = self.RUNNER.invoke(packs, ['list', '--search', 'basic'])
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('BasicPack', result.output)
+
+    def test_pack_listing_by_cost(self):
+        with MockConfigContext(self) as mock_context:
+            # The most expensive packs are listed first
+            entries = get_catalog('pack').filter()
+            costs = [entry['cost'] for entry in entries]
+            self.assertEqual(costs, sorted(costs, reverse=True))
+
+            result = self.RUNNER.invoke(packs, ['list', '--min-cost', str(costs[0])])
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn(entries[0]['name'], result.output)
+            self.assertNotIn(entries[-1]['name'], result.output)
+
+    def test_unknown_name_suggestions(self):
+        with MockConfigContext(self, rewards=REWARD_PARAMETERS) as mock_context, \
+                StandardUserContext() as user_context:
+            self.RUNNER.invoke(login, [user_context.username, user_context.password])
+
+            result = self.RUNNER.invoke(rewards, ['buy', 'Rare Reword'])
+            self.assertEqual(result.exit_code, 1)
+            self.assertIn('UNKNOWN REWARD', result.output)
+            self.assertIn('Did you mean', result.output)
+            self.assertIn('Rare Reward', result.output)
+
+            result = self.RUNNER.invoke(packs, ['buy', 'BasicPak'])
+            self.assertEqual(result.exit_code, 1)
+            self.assertIn('UNKNOWN PACK', result.output)
+            self.assertIn('BasicPack', result.output)
@@ -1,6 +1,14 @@
 # standard library
 import os
+import sys
+import json
+import stat
 import shutil
+import socket
+import threading
+import subprocess
+
+from io import StringIO
 
 # Third party
 from rewardify.env import EnvironmentInstaller
@@ -12,7 +20,7 @@ from rewardifycli.__internal.tests import CLITestCase
 from rewardifycli.__internal.tests import RewardifycliTestCase
 from rewardifycli.__internal.tests import StandardUserContext, MockConfigContext
 
-from rewardifycli.util import Templater, UserCredentials
+from rewardifycli.util import Templater, UserCredentials, SessionToken, Resources
 
 from rewardifycli.install import install, run
 
@@ -26,6 +34,126 @@ from rewardifycli.rewards import rewards
 
 from rewardifycli.users import users
 
+from rewardifycli.main import cli, COMMANDS
+
+from rewardifycli.daemon import CommandServer
+
+from rewardifycli.client import Client
+
+from rewardifycli.batch import batch
+
+
+class TestMain(CLITestCase):
+
+    def test_help_lists_all_commands(self):
+        result = self.RUNNER.invoke(cli, ['--help'])
+
+        self.assertEqual(result.exit_code, 0)
+        for name in COMMANDS.keys():
+            self.assertIn(name, result.output)
+
+    def test_lazy_command_is_loaded(self):
+        result = self.RUNNER.invoke(cli, ['--help'])
+        self.assertEqual(result.exit_code, 0)
+
+        # The command objects returned by the lazy group have to be the very same objects, that are defined in the
+        # modules of the sub commands
+        command = cli.get_command(None, 'packs')
+        self.assertIs(command, packs)
+
+    def test_help_does_not_import_commands(self):
+        # This has to be run in a separate process, because the modules in question are obviously already imported
+        # within the test process
+        code = '\n'.join([
+            'import sys',
+            'from click.testing import CliRunner',
+            'from rewardifycli.main import cli',
+            'CliRunner().invoke(cli, ["--help"])',
+            'print(",".join(m for m in ["jinja2", "rewardify.main", "rewardifycli.packs"] if m in sys.modules))'
+        ])
+        output = subprocess.check_output([sys.executable, '-c', code], universal_newlines=True)
+        self.assertEqual(output.strip(), '')
+
+
+class TestDaemon(RewardifycliTestCase):
+
+    SOCKET_PATH = '/tmp/rewardify_test.sock'
+
+    def setUp(self):
+        RewardifycliTestCase.setUp(self)
+        self.server = CommandServer(self.SOCKET_PATH)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        RewardifycliTestCase.tearDown(self)
+
+    def test_help_through_client(self):
+        with MockConfigContext(self) as mock_context:
+            stdout, stderr = StringIO(), StringIO()
+            exit_code = Client(self.SOCKET_PATH).run(['--help'], stdout, stderr)
+
+            self.assertEqual(exit_code, 0)
+            self.assertIn('packs', stdout.getvalue())
+
+    def test_command_through_client(self):
+        with MockConfigContext(self) as mock_context:
+            stdout, stderr = StringIO(), StringIO()
+            exit_code = Client(self.SOCKET_PATH).run(['packs', 'list'], stdout, stderr)
+
+            self.assertEqual(exit_code, 0)
+            self.assertIn('AVAILABLE PACKS', stdout.getvalue())
+            self.assertIn('Standard Pack', stdout.getvalue())
+
+    def test_exit_code_of_failed_command(self):
+        with MockConfigContext(self) as mock_context:
+            stdout, stderr = StringIO(), StringIO()
+            # No user is logged in, so the login required command has to fail
+            exit_code = Client(self.SOCKET_PATH).run(['inventory'], stdout, stderr)
+
+            self.assertEqual(exit_code, 1)
+            self.assertIn('AUTHENTICATION FAILURE', stdout.getvalue())
+
+    def test_socket_permissions(self):
+        self.assertEqual(stat.S_IMODE(os.stat(self.SOCKET_PATH).st_mode), 0o600)
+
+    def test_client_without_daemon(self):
+        stdout, stderr = StringIO(), StringIO()
+        with self.assertRaises(OSError):
+            Client('/tmp/rewardify_not_existing.sock').run(['--help'], stdout, stderr)
+
+    def test_client_with_broken_daemon(self):
+        # A daemon, which receives the request but answers with garbage, must not make the client raise an OSError,
+        # because then the command would be executed a second time by the fallback
+        socket_path = '/tmp/rewardify_broken.sock'
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(socket_path)
+        listener.listen(1)
+
+        def answer():
+            connection, _ = listener.accept()
+            connection.makefile(mode='r').readline()
+            connection.sendall(b'garbage\n')
+            connection.close()
+
+        thread = threading.Thread(target=answer)
+        thread.start()
+        try:
+            stdout, stderr = StringIO(), StringIO()
+            exit_code = Client(socket_path).run(['--help'], stdout, stderr)
+        finally:
+            thread.join()
+            listener.close()
+            os.remove(socket_path)
+
+        self.assertEqual(exit_code, 1)
+        self.assertIn('connection to the rewardify daemon failed', stderr.getvalue())
+
 
 class TestInstall(CLITestCase):
 
@@ -57,6 +185,9 @@ class TestInstall(CLITestCase):
         self.assertTrue(os.path.exists(config_file_path))
         database_file_path = installer.get_database_file_path()
         self.assertTrue(os.path.exists(database_file_path))
+        # The templates are precompiled into the bytecode cache during the installation
+        template_cache_path = os.path.join(config_folder_path, '.template_cache')
+        self.assertTrue(len(os.listdir(template_cache_path)) != 0)
 
     # HELPER METHODS
     # --------------
@@ -98,6 +229,45 @@ class TestLogin(RewardifycliTestCase):
             self.assertTrue('USER AUTHENTICATED' in result.output)
             self.assertEqual(user_context.username, credentials['username'])
 
+            # The password must not be stored anywhere in the credentials file
+            with open(credentials.get_path(), mode='r') as file:
+                self.assertNotIn(user_context.password, file.read())
+
+    def test_expired_session(self):
+        with MockConfigContext(self) as mock_context, StandardUserContext() as user_context:
+            credentials: UserCredentials = UserCredentials.instance()
+            credentials.save(user_context.username, SessionToken.issue(user_context.username, -1))
+
+            result = self.RUNNER.invoke(inventory, [])
+            self.assertEqual(result.exit_code, 1)
+            self.assertIn('SESSION', result.output)
+
+    def test_session_of_deleted_user(self):
+        with MockConfigContext(self) as mock_context:
+            # The token is valid, but there is no such user (anymore) within the database
+            credentials: UserCredentials = UserCredentials.instance()
+            credentials.save('Ghost', SessionToken.issue('Ghost'))
+
+            result = self.RUNNER.invoke(inventory, [])
+            self.assertEqual(result.exit_code, 1)
+            self.assertIn('DOES NOT EXIST', result.output)
+
+    def test_session_option(self):
+        with MockConfigContext(self) as mock_context, StandardUserContext() as user_context:
+            credentials: UserCredentials = UserCredentials.instance()
+
+            result = self.RUNNER.invoke(login, [user_context.username, user_context.password, '--print-token'])
+            self.assertEqual(result.exit_code, 0)
+            token = result.output.strip()
+
+            # Printing the token does not log in the user within the credentials file
+            credentials.load()
+            self.assertTrue(credentials.is_default())
+
+            result = self.RUNNER.invoke(cli, ['--session', token, 'inventory'])
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn(user_context.username, result.output)
+
 
 class TestPacks(RewardifycliTestCase):
 
@@ -348,6 +518,43 @@ class TestPacks(RewardifycliTestCase):
 
             self.assertTrue('PACK OPENING' in result.output)
 
+            # Without any packs left, opening all of them is an error
+            result = self.RUNNER.invoke(packs, ['open', '--all', 'Buy Me Pack'])
+            self.assertIn('YOU CAN NOT USE THAT', result.output)
+            self.assertNotIn('PACK OPENING', result.output)
+
+    def test_opening_count_packs(self):
+        with MockConfigContext(self) as mock_context, StandardUserContext() as user_context:
+            facade: Rewardify = Rewardify.instance()
+
+            facade.user_add_gold(user_context.username, 300)
+            for i in range(3):
+                facade.user_buy_pack(user_context.username, 'Standard Pack')
+
+            self.RUNNER.invoke(login, [user_context.username, user_context.password])
+            result = self.RUNNER.invoke(packs, ['open', '--count', '2', 'Standard Pack'])
+            user_context.update()
+
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('PACK OPENING', result.output)
+            self.assertEqual(len(user_context.user.packs), 1)
+            self.assertEqual(len(user_context.user.rewards), 10)
+
+    def test_opening_more_packs_than_owned(self):
+        with MockConfigContext(self) as mock_context, StandardUserContext() as user_context:
+            facade: Rewardify = Rewardify.instance()
+
+            facade.user_add_gold(user_context.username, 100)
+            facade.user_buy_pack(user_context.username, 'Standard Pack')
+
+            self.RUNNER.invoke(login, [user_context.username, user_context.password])
+            result = self.RUNNER.invoke(packs, ['open', '--count', '2', 'Standard Pack'])
+            user_context.update()
+
+            self.assertIn('YOU CAN NOT USE THAT', result.output)
+            self.assertEqual(len(user_context.user.packs), 1)
+            self.assertEqual(len(user_context.user.rewards), 0)
+
 
 class TestInventory(RewardifycliTestCase):
 
@@ -382,6 +589,69 @@ class TestInventory(RewardifycliTestCase):
             self.assertIn('YOUR INVENTORY', result.output)
             self.assertIn('Standard Pack', result.output)
 
+    def test_inventory_items(self):
+        with MockConfigContext(self) as mock_context, StandardUserContext() as user_context:
+            self.RUNNER.invoke(login, [user_context.username, user_context.password])
+
+            facade: Rewardify = Rewardify.instance()
+            facade.user_add_dust(user_context.username, 200)
+            facade.user_buy_reward(user_context.username, 'Standard Reward')
+            facade.user_buy_reward(user_context.username, 'Standard Reward')
+
+            result = self.RUNNER.invoke(inventory, ['--items'])
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('YOUR REWARDS', result.output)
+            self.assertEqual(result.output.count('Standard Reward'), 2)
+
+            # In the ndjson format, every single reward is its own line
+            result = self.RUNNER.invoke(cli, ['--format', 'ndjson', 'inventory', '--items'])
+            lines = result.output.strip().split('\n')
+            self.assertEqual(len(lines), 2)
+            self.assertEqual(json.loads(lines[0])['item']['rarity'], 'uncommon')
+
+            # In the json format, the whole output is a single array of these objects
+            result = self.RUNNER.invoke(cli, ['--format', 'json', 'inventory', '--items'])
+            data = json.loads(result.output)
+            self.assertEqual(len(data), 2)
+            self.assertEqual(data[0]['item']['rarity'], 'uncommon')
+
+    def test_inventory_json_output(self):
+        with MockConfigContext(self) as mock_context, StandardUserContext() as user_context:
+            self.RUNNER.invoke(login, [user_context.username, user_context.password])
+
+            facade: Rewardify = Rewardify.instance()
+            facade.user_add_dust(user_context.username, 100)
+            facade.user_buy_reward(user_context.username, 'Standard Reward')
+
+            result = self.RUNNER.invoke(cli, ['--format', 'json', 'inventory'])
+            self.assertEqual(result.exit_code, 0)
+
+            data = json.loads(result.output)
+            self.assertEqual(data['event'], 'inventory')
+            self.assertEqual(data['name'], user_context.username)
+            self.assertEqual(data['dust'], 0)
+
+            self.assertEqual(data['rewards'], {'Standard Reward': 1})
+            self.assertEqual(data['rarities']['Standard Reward'], 'uncommon')
+
+    def test_ndjson_output(self):
+        with MockConfigContext(self) as mock_context, StandardUserContext() as user_context:
+            result = self.RUNNER.invoke(cli, ['--format', 'ndjson', 'packs', 'list'])
+            self.assertEqual(result.exit_code, 0)
+
+            # Every event is one JSON object in a single line, and there are no ANSI codes
+            lines = result.output.strip().split('\n')
+            self.assertEqual(len(lines), 1)
+            data = json.loads(lines[0])
+            self.assertEqual(data['event'], 'pack_list')
+            self.assertIn('Standard Pack', [pack['name'] for pack in data['packs']])
+            self.assertNotIn('\033', result.output)
+
+            # The messages of the commands are events as well
+            result = self.RUNNER.invoke(cli, ['--format', 'ndjson', 'login', user_context.username,
+                                              user_context.password])
+            self.assertEqual(json.loads(result.output)['event'], 'login_success')
+
 
 class TestUsers(RewardifycliTestCase):
 
@@ -508,6 +778,39 @@ class TestRewards(RewardifycliTestCase):
             self.assertEqual(len(user_context.user.rewards), 0)
             self.assertEqual(user_context.user.gold, 200)
 
+            # Without any rewards left, using all of them is an error
+            result = self.RUNNER.invoke(rewards, ['use', '--all', 'Gold Reward'])
+            self.assertIn('YOU CAN NOT USE THAT', result.output)
+            self.assertNotIn('REWARD USED', result.output)
+
+    def test_using_count_rewards(self):
+        reward_parameters = [
+            {
+                'name': 'Gold Reward',
+                'description': 'for testing',
+                'rarity': 'common',
+                'effect': 'gold(100)',
+                'cost': 100,
+                'recycle': 100
+            },
+        ]
+        with MockConfigContext(self, rewards=reward_parameters) as mock_context, StandardUserContext() as user_context:
+            facade: Rewardify = Rewardify.instance()
+
+            facade.user_add_dust(user_context.username, 300)
+            for i in range(3):
+                facade.user_buy_reward(user_context.username, 'Gold Reward')
+
+            self.RUNNER.invoke(login, [user_context.username, user_context.password])
+            result = self.RUNNER.invoke(rewards, ['use', '--count', '2', 'Gold Reward'])
+            user_context.update()
+
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('REWARD USED', result.output)
+
+            self.assertEqual(len(user_context.user.rewards), 1)
+            self.assertEqual(user_context.user.gold, 200)
+
     def test_recycle_reward(self):
         reward_parameters = [
             {
@@ -532,3 +835,161 @@ class TestRewards(RewardifycliTestCase):
             self.assertEqual(result.exit_code, 0)
             self.assertIn('REWARD RECYCLED', result.output)
             self.assertEqual(user_context.user.dust, 100)
+
+    def test_recycle_duplicates(self):
+        with MockConfigContext(self) as mock_context, StandardUserContext() as user_context:
+            facade: Rewardify = Rewardify.instance()
+
+            facade.user_add_dust(user_context.username, 300)
+            for i in range(3):
+                facade.user_buy_reward(user_context.username, 'Standard Reward')
+
+            self.RUNNER.invoke(login, [user_context.username, user_context.password])
+            result = self.RUNNER.invoke(rewards, ['recycle', '--duplicates'])
+            user_context.update()
+
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('REWARDS RECYCLED', result.output)
+            self.assertEqual(len(user_context.user.rewards), 1)
+            self.assertEqual(user_context.user.dust, 200)
+
+    def test_recycle_dry_run(self):
+        with MockConfigContext(self) as mock_context, StandardUserContext() as user_context:
+            facade: Rewardify = Rewardify.instance()
+
+            facade.user_add_dust(user_context.username, 200)
+            for i in range(2):
+                facade.user_buy_reward(user_context.username, 'Standard Reward')
+
+            self.RUNNER.invoke(login, [user_context.username, user_context.password])
+            result = self.RUNNER.invoke(rewards, ['recycle', '--rarity', 'uncommon', '--dry-run'])
+            user_context.update()
+
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('RECYCLING PREVIEW', result.output)
+            self.assertIn('200 dust', result.output)
+            self.assertEqual(len(user_context.user.rewards), 2)
+            self.assertEqual(user_context.user.dust, 0)
+
+    def test_recycle_without_name_or_policy(self):
+        with MockConfigContext(self) as mock_context, StandardUserContext() as user_context:
+            self.RUNNER.invoke(login, [user_context.username, user_context.password])
+            result = self.RUNNER.invoke(rewards, ['recycle'])
+
+            self.assertEqual(result.exit_code, 2)
+
+
+class TestBatch(RewardifycliTestCase):
+
+    BATCH = '\n'.join([
+        '# Buying some packs',
+        'rewardify packs buy "Standard Pack"',
+        'packs buy "Standard Pack"',
+        '',
+        'packs buy "Standard Pack"',
+    ])
+
+    def test_batch_executes_all_commands(self):
+        with MockConfigContext(self) as mock_context, StandardUserContext() as user_context:
+            facade: Rewardify = Rewardify.instance()
+            facade.user_add_gold(user_context.username, 300)
+
+            self.RUNNER.invoke(login, [user_context.username, user_context.password])
+            result = self.RUNNER.invoke(batch, ['-'], input=self.BATCH)
+            user_context.update()
+
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('BATCH FINISHED', result.output)
+            self.assertIn('PACK PURCHASE COMPLETED', result.output)
+            self.assertEqual(len(user_context.user.packs), 3)
+            self.assertEqual(user_context.user.gold, 0)
+
+    def test_batch_quiet(self):
+        with MockConfigContext(self) as mock_context, StandardUserContext() as user_context:
+            facade: Rewardify = Rewardify.instance()
+            facade.user_add_gold(user_context.username, 300)
+
+            self.RUNNER.invoke(login, [user_context.username, user_context.password])
+            result = self.RUNNER.invoke(batch, ['--quiet', '-'], input=self.BATCH)
+
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('BATCH FINISHED', result.output)
+            self.assertNotIn('PACK PURCHASE COMPLETED', result.output)
+
+    def test_batch_failing_command_is_reported(self):
+        with MockConfigContext(self) as mock_context, StandardUserContext() as user_context:
+            facade: Rewardify = Rewardify.instance()
+            facade.user_add_gold(user_context.username, 200)
+
+            self.RUNNER.invoke(login, [user_context.username, user_context.password])
+            result = self.RUNNER.invoke(batch, ['-'], input=self.BATCH)
+            user_context.update()
+
+            # Only the last one of the three purchases fails because of the missing gold, the other ones still have to
+            # be committed
+            self.assertEqual(result.exit_code, 1)
+            self.assertIn('line 5', result.output)
+            self.assertEqual(len(user_context.user.packs), 2)
+            self.assertEqual(user_context.user.gold, 0)
+
+    def test_batch_line_with_unbalanced_quotes(self):
+        with MockConfigContext(self) as mock_context, StandardUserContext() as user_context:
+            facade: Rewardify = Rewardify.instance()
+            facade.user_add_gold(user_context.username, 300)
+
+            self.RUNNER.invoke(login, [user_context.username, user_context.password])
+            batch_input = '\n'.join(['packs buy "Standard Pack"', 'rewards use "Foo', 'packs buy "Standard Pack"'])
+            result = self.RUNNER.invoke(batch, ['-'], input=batch_input)
+            user_context.update()
+
+            # Only the broken line fails, the commands before and after it are still executed
+            self.assertEqual(result.exit_code, 1)
+            self.assertIn('line 2', result.stdout)
+            self.assertIn('No closing quotation', result.stderr)
+            self.assertEqual(len(user_context.user.packs), 2)
+
+    def test_batch_atomic_rolls_back_everything(self):
+        with MockConfigContext(self) as mock_context, StandardUserContext() as user_context:
+            facade: Rewardify = Rewardify.instance()
+            facade.user_add_gold(user_context.username, 200)
+
+            self.RUNNER.invoke(login, [user_context.username, user_context.password])
+            result = self.RUNNER.invoke(batch, ['--atomic', '-'], input=self.BATCH)
+            user_context.update()
+
+            self.assertEqual(result.exit_code, 1)
+            self.assertIn('ROLLED BACK', result.output)
+            self.assertEqual(len(user_context.user.packs), 0)
+            self.assertEqual(user_context.user.gold, 200)
+
+
+class TestResources(RewardifycliTestCase):
+
+    def test_listing_does_not_open_the_database(self):
+        with MockConfigContext(self) as mock_context:
+            # If the listing were to connect to this database, it would fail, because the folder does not exist
+            mock_context.database_dict['host'] = os.path.join(self.FOLDER_PATH, 'missing', 'db.sqlite')
+            mock_context.update()
+
+            resources: Resources = Resources.instance()
+            resources.reset()
+
+            result = self.RUNNER.invoke(packs, ['list'])
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('Standard Pack', result.output)
+
+            result = self.RUNNER.invoke(rewards, ['list'])
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('Standard Reward', result.output)
+
+            self.assertEqual(resources.provided, {'config'})
+
+    def test_commands_declare_their_resources(self):
+        self.assertEqual(packs.commands['list'].callback.resources, ('config', ))
+        self.assertEqual(rewards.commands['list'].callback.resources, ('config', ))
+        self.assertEqual(packs.commands['buy'].callback.resources, ('config', 'database'))
+
+    def test_unknown_resource(self):
+        resources: Resources = Resources.instance()
+        with self.assertRaises(ValueError):
+            resources.provide('network')
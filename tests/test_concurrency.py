@@ -0,0 +1,181 @@
+# standard library
+import os
+import sys
+import stat
+import contextlib
+import multiprocessing
+
+from unittest import mock
+
+# third party
+from peewee import SqliteDatabase, OperationalError, fn
+
+from rewardify.env import EnvironmentConfig, DatabaseConfig
+
+from rewardify.models import User, Pack, Reward, DATABASE_PROXY
+
+# local
+from rewardifycli.__internal.tests import RewardifycliTestCase
+from rewardifycli.__internal.tests import MockConfigContext
+
+from rewardifycli.util import UserCredentials, SessionToken, Resources
+
+from rewardifycli.models import InventoryCounter
+
+from rewardifycli.main import invoke
+
+from rewardifycli import concurrency
+
+
+def buy_and_open_packs(token: str, count: int):
+    """
+    This is executed within the forked processes of the stress test. It buys and opens the given count of packs, one
+    command after another, just like a user would do it from the command line.
+    """
+    # The forked process has inherited the initialized resources of the test case, but it has to connect to the
+    # database on its own
+    resources: Resources = Resources.instance()
+    resources.reset()
+
+    failures = 0
+    with open(os.devnull, mode='w') as devnull, contextlib.redirect_stdout(devnull), \
+            contextlib.redirect_stderr(devnull):
+        for i in range(count):
+            failures += invoke(['--session', token, 'packs', 'buy', 'Standard Pack']) != 0
+            failures += invoke(['--session', token, 'packs', 'open', 'Standard Pack']) != 0
+
+    sys.exit(failures)
+
+
+class TestConcurrency(RewardifycliTestCase):
+
+    def setUp(self):
+        RewardifycliTestCase.setUp(self)
+        self.database_path = os.path.join(self.FOLDER_PATH, 'concurrency.db')
+        self.file_database = SqliteDatabase(self.database_path)
+
+    def tearDown(self):
+        self.file_database.close()
+        DATABASE_PROXY.initialize(self.TEST_DATABASE)
+        RewardifycliTestCase.tearDown(self)
+
+    def test_atomic_write(self):
+        with MockConfigContext(self):
+            path = os.path.join(self.FOLDER_PATH, 'atomic.txt')
+            concurrency.atomic_write(path, 'first')
+            concurrency.atomic_write(path, 'second')
+
+            with open(path, mode='r') as file:
+                self.assertEqual(file.read(), 'second')
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+            # No temporary files are left behind
+            self.assertEqual([name for name in os.listdir(self.FOLDER_PATH) if name.endswith('.tmp')], [])
+
+            # Bytes are written in binary mode
+            concurrency.atomic_write(path, b'\x00binary')
+            with open(path, mode='rb') as file:
+                self.assertEqual(file.read(), b'\x00binary')
+
+    def test_credentials_are_written_atomically(self):
+        with MockConfigContext(self):
+            credentials: UserCredentials = UserCredentials.instance()
+            credentials.save('Jonas', 'token')
+
+            self.assertEqual(stat.S_IMODE(os.stat(credentials.get_path()).st_mode), 0o600)
+            self.assertEqual(credentials['token'], 'token')
+
+    def test_user_lock_files(self):
+        with MockConfigContext(self):
+            self.assertNotEqual(concurrency.get_lock_path('Jonas'), concurrency.get_lock_path('Anna'))
+
+            with concurrency.user_lock('Jonas'):
+                self.assertTrue(os.path.exists(concurrency.get_lock_path('Jonas')))
+
+    def test_configure_database(self):
+        with MockConfigContext(self):
+            self.assertFalse(concurrency.configure_database(self.TEST_DATABASE))
+
+            self.file_database.connect()
+            self.assertTrue(concurrency.configure_database(self.file_database))
+            self.assertEqual(self.file_database.execute_sql('PRAGMA journal_mode').fetchone()[0], 'wal')
+
+    def test_write_transaction_retries_while_locked(self):
+        with MockConfigContext(self):
+            environment_config: EnvironmentConfig = EnvironmentConfig.instance()
+            environment_config.DATABASE_BUSY_TIMEOUT = 10
+            environment_config.DATABASE_WRITE_RETRIES = 3
+
+            DATABASE_PROXY.initialize(self.file_database)
+            self.file_database.connect()
+            concurrency.configure_database(self.file_database)
+
+            # Another connection holds the write lock of the database
+            blocker = SqliteDatabase(self.database_path)
+            blocker.connect()
+            blocker.begin('IMMEDIATE')
+
+            try:
+                # The database stays locked, so the transaction fails after all the retries
+                with mock.patch('rewardifycli.concurrency.time.sleep') as sleep:
+                    with self.assertRaises(OperationalError):
+                        with concurrency.write_transaction():
+                            pass
+                    self.assertEqual(sleep.call_count, 3)
+
+                # The lock is released during the first retry, so the second attempt succeeds
+                with mock.patch('rewardifycli.concurrency.time.sleep', side_effect=lambda _: blocker.commit()):
+                    with concurrency.write_transaction():
+                        self.file_database.execute_sql('CREATE TABLE "test" ("id" INTEGER)')
+            finally:
+                blocker.close()
+                del environment_config.DATABASE_BUSY_TIMEOUT
+                del environment_config.DATABASE_WRITE_RETRIES
+
+            self.assertTrue(self.file_database.table_exists('test'))
+
+    def test_concurrent_processes_keep_balances_consistent(self):
+        usernames = ['Jonas', 'Anna', 'Lisa', 'Paul']
+        processes_per_user = 2
+        packs_per_process = 5
+        start_gold = 10000
+
+        with MockConfigContext(self, mock_users=usernames) as mock_context:
+            mock_context.database_dict['host'] = self.database_path
+            mock_context.update()
+
+            models = DatabaseConfig.MODELS
+            with self.file_database.bind_ctx(models):
+                self.file_database.create_tables(models)
+                for username in usernames:
+                    User.create(name=username, password='secret', gold=start_gold, dust=0)
+            self.file_database.close()
+
+            # Every process runs the commands for one user. Two processes always share the same user, which is the
+            # case, where updates could be lost.
+            context = multiprocessing.get_context('fork')
+            processes = []
+            for username in usernames:
+                token = SessionToken.issue(username)
+                for i in range(processes_per_user):
+                    process = context.Process(target=buy_and_open_packs, args=(token, packs_per_process))
+                    processes.append(process)
+
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join(timeout=120)
+                self.assertEqual(process.exitcode, 0)
+
+            packs_per_user = processes_per_user * packs_per_process
+            with self.file_database.bind_ctx(models + [InventoryCounter]):
+                for username in usernames:
+                    user = User.get(User.name == username)
+                    self.assertEqual(user.gold, start_gold - 100 * packs_per_user)
+                    self.assertEqual(Pack.select().where(Pack.user == user).count(), 0)
+                    self.assertEqual(Reward.select().where(Reward.user == user).count(), 5 * packs_per_user)
+
+                    # The counters maintained by the triggers did not miss any of the concurrent changes either
+                    query = InventoryCounter.select(fn.SUM(InventoryCounter.count)).where(
+                        (InventoryCounter.user == user) & (InventoryCounter.kind == 'reward')
+                    )
+                    self.assertEqual(query.scalar(), 5 * packs_per_user)
@@ -0,0 +1,89 @@
+# standard library
+import os
+
+from unittest import mock
+
+# third party
+from rewardify.env import EnvironmentConfig
+
+from rewardify.backends import MockBackend
+
+# local
+from rewardifycli.__internal.tests import RewardifycliTestCase
+from rewardifycli.__internal.tests import MockConfigContext
+
+from rewardifycli.config import ConfigCache, compile_config, load_config
+from rewardifycli.config import config
+
+from rewardifycli import catalog
+
+
+class TestConfigCache(RewardifycliTestCase):
+
+    def test_compiled_config_is_loaded(self):
+        with MockConfigContext(self) as mock_context:
+            environment_config: EnvironmentConfig = EnvironmentConfig.instance()
+            compile_config(environment_config)
+
+            cache = ConfigCache(self.FOLDER_PATH)
+            values = cache.load()
+            self.assertIsNotNone(values)
+
+            self.assertEqual(values['REWARDS'], environment_config.REWARDS)
+            self.assertEqual(values['PACKS'], environment_config.PACKS)
+            self.assertEqual(values['MOCK_BACKEND_USERS'], ['Jonas'])
+            # Classes are imported again and not copied
+            self.assertIs(values['BACKEND'], MockBackend)
+
+    def test_changed_config_invalidates_cache(self):
+        with MockConfigContext(self) as mock_context:
+            environment_config: EnvironmentConfig = EnvironmentConfig.instance()
+            compile_config(environment_config)
+
+            mock_context.users = ['Jonas', 'Joana']
+            mock_context.update()
+
+            cache = ConfigCache(self.FOLDER_PATH)
+            self.assertIsNone(cache.load())
+
+            # Loading the config again rebuilds the cache with the new values
+            load_config(environment_config)
+            self.assertEqual(environment_config.MOCK_BACKEND_USERS, ['Jonas', 'Joana'])
+            self.assertEqual(cache.load()['MOCK_BACKEND_USERS'], ['Jonas', 'Joana'])
+
+    def test_catalogs_are_cached(self):
+        with MockConfigContext(self) as mock_context:
+            environment_config: EnvironmentConfig = EnvironmentConfig.instance()
+            compile_config(environment_config)
+
+            # This is what a new process would start with
+            catalog.CATALOGS.clear()
+            catalog.CACHED_CATALOGS.clear()
+            load_config(environment_config)
+
+            # The catalog is unpickled from the cache and not built again
+            with mock.patch.object(catalog.Catalog, '__init__', side_effect=AssertionError('built again')):
+                pack_catalog = catalog.get_catalog('pack')
+            self.assertIn('Standard Pack', [entry['name'] for entry in pack_catalog.filter()])
+
+    def test_config_with_own_classes_not_cached(self):
+        with MockConfigContext(self) as mock_context:
+            # The import statements are the first lines of the config file, so the class can be defined there
+            mock_context.imports = ['class OwnBackend(MockBackend): pass']
+            mock_context.backend = 'OwnBackend'
+            mock_context.update()
+
+            environment_config: EnvironmentConfig = EnvironmentConfig.instance()
+            compile_config(environment_config)
+
+            cache = ConfigCache(self.FOLDER_PATH)
+            self.assertFalse(os.path.exists(cache.path))
+            self.assertIsNone(cache.load())
+
+    def test_compile_command(self):
+        with MockConfigContext(self) as mock_context:
+            result = self.RUNNER.invoke(config, ['compile'])
+
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('CONFIG COMPILED', result.output)
+            self.assertTrue(os.path.exists(ConfigCache(self.FOLDER_PATH).path))
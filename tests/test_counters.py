@@ -0,0 +1,95 @@
+# standard library
+from collections import defaultdict
+
+# third party
+from rewardify.main import Rewardify
+
+from rewardify.models import User, Reward
+
+# local
+from rewardifycli.__internal.tests import RewardifycliTestCase
+from rewardifycli.__internal.tests import MockConfigContext, StandardUserContext
+
+from rewardifycli.models import InventoryCounter
+
+from rewardifycli.db import db
+
+from rewardifycli import counters
+from rewardifycli import bulk
+
+from test_bulk import REWARD_PARAMETERS, PACK_PARAMETERS
+
+
+class TestInventoryCounters(RewardifycliTestCase):
+
+    def test_counters_follow_facade_writes(self):
+        with MockConfigContext(self, packs=PACK_PARAMETERS, rewards=REWARD_PARAMETERS) as mock_context, \
+                StandardUserContext() as user_context:
+            facade: Rewardify = Rewardify.instance()
+            facade.user_add_gold(user_context.username, 20)
+            facade.user_add_dust(user_context.username, 200)
+
+            facade.user_buy_pack(user_context.username, 'Mixed Pack')
+            facade.user_buy_pack(user_context.username, 'Mixed Pack')
+            facade.user_buy_reward(user_context.username, 'Common Reward')
+            facade.user_buy_reward(user_context.username, 'Rare Reward')
+
+            self.assertEqual(counters.get_counts(user_context.username, 'pack'), {'Mixed Pack': 2})
+            self.assertEqual(
+                counters.get_counts(user_context.username, 'reward'),
+                {'Common Reward': 1, 'Rare Reward': 1}
+            )
+
+            # Items, which are not owned anymore, do not appear at all
+            facade.user_recycle_reward(user_context.username, 'Rare Reward')
+            self.assertEqual(counters.get_counts(user_context.username, 'reward'), {'Common Reward': 1})
+            self.assertEqual(counters.get_count(user_context.username, 'reward', 'Rare Reward'), 0)
+
+    def test_counters_follow_bulk_writes(self):
+        with MockConfigContext(self, packs=PACK_PARAMETERS, rewards=REWARD_PARAMETERS) as mock_context, \
+                StandardUserContext() as user_context:
+            facade: Rewardify = Rewardify.instance()
+            facade.user_add_gold(user_context.username, 30)
+            for i in range(3):
+                facade.user_buy_pack(user_context.username, 'Mixed Pack')
+
+            bulk.open_packs(user_context.username, 'Mixed Pack', 2)
+            self.assertEqual(counters.get_count(user_context.username, 'pack', 'Mixed Pack'), 1)
+            self.assertCountersCorrect(user_context.username)
+
+            bulk.use_rewards(user_context.username, 'Legendary Reward', 1)
+            self.assertEqual(counters.get_count(user_context.username, 'reward', 'Legendary Reward'), 1)
+            self.assertCountersCorrect(user_context.username)
+
+            bulk.recycle_rewards(user_context.username, keep=0)
+            self.assertEqual(counters.get_counts(user_context.username, 'reward'), {})
+
+    def test_rebuild_counters(self):
+        with MockConfigContext(self, rewards=REWARD_PARAMETERS) as mock_context, \
+                StandardUserContext() as user_context:
+            facade: Rewardify = Rewardify.instance()
+            facade.user_add_dust(user_context.username, 200)
+            facade.user_buy_reward(user_context.username, 'Common Reward')
+            facade.user_buy_reward(user_context.username, 'Common Reward')
+
+            # Simulating a drift of the counters, which the rebuild command has to repair
+            InventoryCounter.update(count=10).execute()
+            self.assertEqual(counters.get_count(user_context.username, 'reward', 'Common Reward'), 10)
+
+            result = self.RUNNER.invoke(db, ['rebuild-counters'])
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('COUNTERS REBUILT', result.output)
+
+            self.assertEqual(counters.get_count(user_context.username, 'reward', 'Common Reward'), 2)
+            self.assertEqual(Reward.select().count(), 2)
+
+    # HELPER METHODS
+    # --------------
+
+    def assertCountersCorrect(self, username: str):
+        # The counters have to be exactly what counting the actual rewards of the user results in
+        expected_counts = defaultdict(int)
+        for reward in Reward.select().join(User).where(User.name == username):
+            expected_counts[reward.name] += 1
+
+        self.assertEqual(counters.get_counts(username, 'reward'), dict(expected_counts))
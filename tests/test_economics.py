@@ -0,0 +1,82 @@
+# standard library
+import os
+
+# third party
+import numpy as np
+
+# local
+from rewardifycli.__internal.tests import RewardifycliTestCase
+from rewardifycli.__internal.tests import MockConfigContext
+
+from rewardifycli.packs import packs
+
+from rewardifycli.simulation import PackModel, simulate_set_completion
+
+from rewardifycli.economics import StatsCache, get_count_distributions, get_expected_set_packs, calculate_pack_stats
+from rewardifycli.economics import get_pack_stats, get_config_digest
+
+from test_simulation import SIMULATION_REWARDS, SLOT_PROBABILITIES
+
+
+class TestEconomics(RewardifycliTestCase):
+
+    def test_count_distributions(self):
+        distributions = get_count_distributions(np.array(SLOT_PROBABILITIES, dtype=float))
+
+        # The legendary rewards can only be contained in the last slot
+        self.assertEqual(list(distributions[3]), [0.5, 0.5, 0, 0, 0, 0])
+        self.assertAlmostEqual(distributions[0][4], 0.9 ** 4)
+        for distribution in distributions:
+            self.assertAlmostEqual(distribution.sum(), 1)
+
+    def test_expected_set_packs(self):
+        # With a single slot and rewards of the same probability, this is the classic coupon collector problem
+        expected = get_expected_set_packs(np.array([[1.0, 0, 0, 0]]), np.array([10, 0, 0, 0]))
+        self.assertAlmostEqual(expected, 10 * sum(1 / index for index in range(1, 11)))
+
+        # The exact expectation matches the simulation
+        model = PackModel(SLOT_PROBABILITIES, SIMULATION_REWARDS)
+        expected = get_expected_set_packs(model.probability_matrix, model.counts)
+        simulated = simulate_set_completion(model, 20000, np.random.default_rng(1))['mean']
+        self.assertAlmostEqual(expected, simulated, delta=0.05 * expected)
+
+    def test_pack_stats(self):
+        model = PackModel(SLOT_PROBABILITIES, SIMULATION_REWARDS)
+        stats = calculate_pack_stats(model, 100)
+        rarities = {item['rarity']: item for item in stats['rarities']}
+
+        self.assertAlmostEqual(rarities['common']['per_pack'], 3.6)
+        self.assertAlmostEqual(rarities['legendary']['packs_per_reward'], 2)
+        self.assertIsNone(rarities['uncommon']['packs_per_reward'])
+        self.assertAlmostEqual(stats['dust']['mean'], 3.6 * 6 + 0.9 * 50 + 0.5 * 100)
+        self.assertAlmostEqual(stats['dust']['per_gold'], stats['dust']['mean'] / 100)
+        self.assertEqual(stats['set']['size'], 4)
+
+    def test_stats_command(self):
+        pack = {'name': 'Apple Pack', 'cost': 100, 'description': ''}
+        pack.update({'slot{}'.format(index): SLOT_PROBABILITIES[index - 1] for index in range(1, 6)})
+        rewards = [{'name': name, **parameters} for name, parameters in SIMULATION_REWARDS.items()]
+
+        with MockConfigContext(self, packs=[pack], rewards=rewards):
+            result = self.RUNNER.invoke(packs, ['stats', '--reward', 'Golden Apple', 'Apple Pack'])
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertIn('Exact statistics of the pack type Apple Pack', result.output)
+            self.assertNotIn('from the cache', result.output)
+            self.assertIn('Golden Apple (legendary): 50.0000 % per pack, 2.0 packs (200 gold) expected', result.output)
+            self.assertTrue(os.path.exists(os.path.join(self.FOLDER_PATH, StatsCache.FILE_NAME)))
+
+            # The second call for the unchanged config is answered from the cache
+            result = self.RUNNER.invoke(packs, ['stats', 'Apple Pack'])
+            self.assertIn('from the cache', result.output)
+            result = self.RUNNER.invoke(packs, ['stats', '--no-cache', 'Apple Pack'])
+            self.assertNotIn('from the cache', result.output)
+            digest = get_config_digest('Apple Pack')
+
+        # A change of the slot probabilities results in a new hash
+        pack.update({'slot5': [0, 0, 0, 1]})
+        with MockConfigContext(self, packs=[pack], rewards=rewards):
+            self.assertNotEqual(get_config_digest('Apple Pack'), digest)
+            stats, cached = get_pack_stats('Apple Pack')
+            self.assertFalse(cached)
+            self.assertAlmostEqual(stats['rarities'][3]['at_least_one'], 1)
+            self.assertTrue(get_pack_stats('Apple Pack')[1])
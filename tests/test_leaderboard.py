@@ -0,0 +1,132 @@
+# standard library
+import datetime
+
+# third party
+from rewardify.models import User, Reward, DATABASE_PROXY
+
+# local
+from rewardifycli.__internal.tests import RewardifycliTestCase
+from rewardifycli.__internal.tests import MockConfigContext
+
+from rewardifycli.users import users
+
+from rewardifycli import leaderboard
+from rewardifycli import models
+
+
+def create_reward(user: User, rarity: str):
+    Reward.create(name='{} Reward'.format(rarity.capitalize()), slug='{}_reward'.format(rarity),
+                  description='for testing', rarity=rarity, dust_cost=100, dust_recycle=10, effect='',
+                  date_obtained=datetime.datetime.now(), user=user)
+
+
+class TestLeaderboard(RewardifycliTestCase):
+
+    def create_users(self):
+        # The gold of the users has ties, to check that the ranks are shared and the order is still stable
+        golds = {'Anna': 300, 'Bert': 100, 'Carl': 300, 'Dora': 0, 'Emil': 200}
+        for name, gold in golds.items():
+            User.create(name=name, password='secret', gold=gold, dust=len(name))
+
+        create_reward(User.get(User.name == 'Dora'), 'legendary')
+        create_reward(User.get(User.name == 'Dora'), 'common')
+        create_reward(User.get(User.name == 'Bert'), 'legendary')
+        create_reward(User.get(User.name == 'Emil'), 'common')
+
+    def test_listing_pages_through_all_users(self):
+        with MockConfigContext(self):
+            self.create_users()
+
+            first = list(leaderboard.iter_users(per_page=2))
+            self.assertEqual([record.name for record in first], ['Anna', 'Bert'])
+
+            second = list(leaderboard.iter_users(after=first[-1].cursor, per_page=2))
+            third = list(leaderboard.iter_users(after=second[-1].cursor, per_page=2))
+            self.assertEqual([record.name for record in second + third], ['Carl', 'Dora', 'Emil'])
+            self.assertEqual(third[0].gold, 200)
+
+            with self.assertRaises(ValueError):
+                leaderboard.iter_users(after='not a cursor')
+
+    def test_ranking_by_gold_with_ties(self):
+        with MockConfigContext(self):
+            self.create_users()
+
+            records = []
+            cursor = None
+            while True:
+                page = list(leaderboard.iter_ranking('gold', after=cursor, per_page=2))
+                if not page:
+                    break
+                records += page
+                cursor = page[-1].cursor
+
+            self.assertEqual([(record.rank, record.name, record.score) for record in records], [
+                (1, 'Anna', 300),
+                (1, 'Carl', 300),
+                (3, 'Emil', 200),
+                (4, 'Bert', 100),
+                (5, 'Dora', 0)
+            ])
+
+            # A cursor of a ranking by another metric is rejected
+            with self.assertRaises(ValueError):
+                leaderboard.iter_ranking('dust', after=cursor)
+
+    def test_ranking_by_aggregates(self):
+        with MockConfigContext(self):
+            self.create_users()
+
+            records = list(leaderboard.iter_ranking('rewards'))
+            self.assertEqual([(record.name, record.score) for record in records][:3],
+                             [('Dora', 2), ('Bert', 1), ('Emil', 1)])
+            self.assertEqual(records[3].rank, 4)
+            self.assertEqual(len(records), 5)
+
+            first = list(leaderboard.iter_ranking('legendary', per_page=2))
+            rest = list(leaderboard.iter_ranking('legendary', after=first[-1].cursor, per_page=2))
+            self.assertEqual([(record.rank, record.name, record.score) for record in first + rest], [
+                (1, 'Bert', 1),
+                (1, 'Dora', 1),
+                (3, 'Anna', 0),
+                (3, 'Carl', 0)
+            ])
+
+    def test_gold_and_dust_indexes(self):
+        with MockConfigContext(self):
+            self.assertEqual(models.get_missing_indexes(), [])
+            index_names = {index.name for index in DATABASE_PROXY.get_indexes('user')}
+            self.assertTrue({'user_gold_name', 'user_dust_name'} <= index_names)
+
+    def test_top_command(self):
+        with MockConfigContext(self):
+            self.create_users()
+
+            result = self.RUNNER.invoke(users, ['top', '--by', 'gold', '--per-page', '2'])
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('TOP USERS BY GOLD', result.output)
+            self.assertIn('1. Carl: 300 gold', result.output)
+            self.assertIn('Next page: rewardify users top --by gold --per-page 2 --after ', result.output)
+
+            cursor = result.output.split('--after ')[-1].strip()
+            result = self.RUNNER.invoke(users, ['top', '--by', 'gold', '--per-page', '2', '--after', cursor])
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('3. Emil: 200 gold', result.output)
+
+            result = self.RUNNER.invoke(users, ['top', '--after', 'invalid'])
+            self.assertNotEqual(result.exit_code, 0)
+
+            # A valid cursor of the listing lacks the keys of a ranking cursor
+            cursor = leaderboard.encode_cursor({'name': 'Anna'})
+            result = self.RUNNER.invoke(users, ['top', '--by', 'gold', '--after', cursor])
+            self.assertEqual(result.exit_code, 2)
+            self.assertIn('is not valid', result.output)
+
+    def test_list_command(self):
+        with MockConfigContext(self):
+            self.create_users()
+
+            result = self.RUNNER.invoke(users, ['list'])
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('Anna: 300 gold, 4 dust', result.output)
+            self.assertNotIn('Next page', result.output)
@@ -0,0 +1,66 @@
+# standard library
+import os
+import json
+import time
+import pstats
+
+# local
+from rewardifycli.__internal.tests import RewardifycliTestCase
+from rewardifycli.__internal.tests import MockConfigContext, StandardUserContext
+
+from rewardifycli.login import login
+
+from rewardifycli.main import cli
+
+from rewardifycli.profiling import Timings
+
+
+class TestProfiling(RewardifycliTestCase):
+
+    def test_nested_phases_are_exclusive(self):
+        timings: Timings = Timings.instance()
+        with timings.isolated():
+            with timings.phase('command'):
+                time.sleep(0.02)
+                with timings.phase('render'):
+                    time.sleep(0.05)
+
+            self.assertGreaterEqual(timings.totals['render'], 0.05)
+            self.assertGreaterEqual(timings.totals['command'], 0.02)
+            self.assertLess(timings.totals['command'], 0.05)
+
+            report = timings.report()
+            self.assertIn('command', report)
+            self.assertIn('total', report)
+
+            # A nested measurement does not change the phases of the outer one
+            with timings.isolated():
+                with timings.phase('auth'):
+                    pass
+            self.assertNotIn('auth', timings.totals)
+
+    def test_timings_option(self):
+        with MockConfigContext(self), StandardUserContext() as user_context:
+            self.RUNNER.invoke(login, [user_context.username, user_context.password])
+
+            result = self.RUNNER.invoke(cli, ['--format', 'json', '--timings', 'inventory'])
+            self.assertEqual(result.exit_code, 0)
+
+            # The report goes to stderr, so the machine readable output stays intact
+            self.assertEqual(json.loads(result.stdout)['name'], user_context.username)
+            for phase in ['auth', 'command', 'render', 'total']:
+                self.assertIn(phase, result.stderr)
+
+    def test_profile_option(self):
+        with MockConfigContext(self), StandardUserContext() as user_context:
+            self.RUNNER.invoke(login, [user_context.username, user_context.password])
+            path = os.path.join(self.FOLDER_PATH, 'inventory.prof')
+
+            result = self.RUNNER.invoke(cli, ['--profile', path, '--profile-memory', 'inventory'])
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('PROFILE', result.stderr)
+            self.assertIn('MEMORY', result.stderr)
+
+            # The dumped file can be read by pstats and contains the command
+            stats = pstats.Stats(path)
+            self.assertTrue(any(function_name == 'inventory' for _, _, function_name in stats.stats.keys()))
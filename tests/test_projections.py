@@ -0,0 +1,46 @@
+# third party
+from rewardify.main import Rewardify
+
+# local
+from rewardifycli.__internal.tests import RewardifycliTestCase
+from rewardifycli.__internal.tests import MockConfigContext, StandardUserContext
+
+from rewardifycli.projections import RewardRecord
+from rewardifycli.projections import iter_rewards, group_by_rarity
+
+from test_bulk import REWARD_PARAMETERS, PACK_PARAMETERS
+
+
+class TestRecords(RewardifycliTestCase):
+
+    def test_records_are_slotted_and_read_only(self):
+        record = RewardRecord('Rare Reward', 'rare', None)
+
+        self.assertFalse(hasattr(record, '__dict__'))
+        with self.assertRaises(AttributeError):
+            record.name = 'Other Reward'
+
+        self.assertEqual(record.to_dict(), {'name': 'Rare Reward', 'rarity': 'rare', 'date_obtained': None})
+
+    def test_iterating_rewards(self):
+        with MockConfigContext(self, packs=PACK_PARAMETERS, rewards=REWARD_PARAMETERS) as mock_context, \
+                StandardUserContext() as user_context:
+            facade: Rewardify = Rewardify.instance()
+            facade.user_add_gold(user_context.username, 10)
+            facade.user_add_dust(user_context.username, 300)
+            facade.user_buy_pack(user_context.username, 'Mixed Pack')
+            facade.user_buy_reward(user_context.username, 'Rare Reward')
+            facade.user_buy_reward(user_context.username, 'Rare Reward')
+            facade.user_buy_reward(user_context.username, 'Common Reward')
+
+            records = list(iter_rewards(user_context.username))
+            self.assertEqual(len(records), 3)
+            self.assertTrue(all(isinstance(record, RewardRecord) for record in records))
+            self.assertEqual([record.name for record in records], ['Common Reward', 'Rare Reward', 'Rare Reward'])
+
+            rarity_records_map = group_by_rarity(records)
+            self.assertEqual(len(rarity_records_map['rare']), 2)
+            self.assertEqual(len(rarity_records_map['common']), 1)
+
+            # Filtering by the name
+            self.assertEqual(len(list(iter_rewards(user_context.username, 'Rare Reward'))), 2)
@@ -0,0 +1,129 @@
+# standard library
+import io
+
+from unittest import mock
+
+# third party
+from rewardify.main import Rewardify
+
+from rewardify.models import User, Pack, Reward
+
+# local
+from rewardifycli.__internal.tests import RewardifycliTestCase
+from rewardifycli.__internal.tests import MockConfigContext, StandardUserContext
+
+from rewardifycli.users import users
+
+from rewardifycli import provisioning
+
+
+CSV_CONTENT = (
+    'username,password,gold\n'
+    'Anna,secret1,100\n'
+    'Lisa,secret2,\n'
+    'Anna,secret3,0\n'
+    ',secret4,0\n'
+    'Paul,secret5,many\n'
+)
+
+NDJSON_CONTENT = (
+    '{"username": "Anna", "password": "secret1", "dust": 50}\n'
+    '\n'
+    'not json\n'
+    '{"name": "Lisa", "password": "secret2"}\n'
+)
+
+
+class TestProvisioning(RewardifycliTestCase):
+
+    def test_read_rows_detects_the_format(self):
+        rows = list(provisioning.read_rows(io.StringIO(CSV_CONTENT)))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0], (2, {'username': 'Anna', 'password': 'secret1', 'gold': '100'}, None))
+
+        rows = list(provisioning.read_rows(io.StringIO(NDJSON_CONTENT)))
+        self.assertEqual([line for line, _, _ in rows], [1, 3, 4])
+        self.assertIsNone(rows[1][1])
+        self.assertIn('Invalid JSON', rows[1][2])
+
+    def test_import_reports_failures_without_aborting(self):
+        with MockConfigContext(self), StandardUserContext():
+            content = CSV_CONTENT + 'Jonas,secret6,0\n'
+            user_import = provisioning.UserImport(workers=1, batch_size=2)
+            user_import.run(provisioning.read_rows(io.StringIO(content)))
+
+            self.assertEqual(user_import.created, 2)
+            self.assertEqual([failure['line'] for failure in user_import.failures], [4, 5, 6, 7])
+            # The duplicate within the file and the already existing user are reported as such
+            self.assertIn('more than once', user_import.failures[0]['error'])
+            self.assertEqual(user_import.failures[3]['username'], 'Jonas')
+            self.assertIn('already exists', user_import.failures[3]['error'])
+
+            self.assertEqual(User.get(User.name == 'Anna').gold, 100)
+            self.assertEqual(User.get(User.name == 'Lisa').gold, 0)
+
+            # The imported users can be used just like the ones created by the facade
+            facade: Rewardify = Rewardify.instance()
+            self.assertTrue(facade.user_check_password('Anna', 'secret1'))
+            self.assertFalse(facade.user_check_password('Lisa', 'secret1'))
+
+    def test_import_command_with_process_pool(self):
+        with MockConfigContext(self):
+            result = self.RUNNER.invoke(users, ['import', '--workers', '2', '-'], input=NDJSON_CONTENT)
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('USERS IMPORTED', result.output)
+            self.assertIn('Created 2 of 3 users', result.output)
+            self.assertIn('line 3: Invalid JSON', result.output)
+
+            self.assertEqual(User.get(User.name == 'Anna').dust, 50)
+            facade: Rewardify = Rewardify.instance()
+            self.assertTrue(facade.user_check_password('Lisa', 'secret2'))
+
+    def test_delete_users(self):
+        with MockConfigContext(self), StandardUserContext() as user_context:
+            facade: Rewardify = Rewardify.instance()
+            facade.user_add_gold(user_context.username, 100)
+            facade.user_buy_pack(user_context.username, 'Standard Pack')
+            User.create(name='Anna', password='secret', gold=0, dust=0)
+
+            # A dry run does not change anything and does not even take the write lock
+            with mock.patch('rewardifycli.provisioning.write_transaction') as write_transaction:
+                result = provisioning.delete_users(['Jonas', 'Anna', 'Lisa', 'Anna'], dry_run=True)
+            write_transaction.assert_not_called()
+            self.assertEqual(result['deleted'], ['Jonas', 'Anna'])
+            self.assertEqual(result['unknown'], ['Lisa'])
+            self.assertEqual(result['packs'], 1)
+            self.assertEqual(User.select().count(), 2)
+            self.assertEqual(Pack.select().count(), 1)
+
+            # Reading the usernames from stdin leaves nobody to answer the confirmation prompt
+            result = self.RUNNER.invoke(users, ['delete', 'Lisa', '--file', '-'], input='username\nJonas\nAnna\n')
+            self.assertEqual(result.exit_code, 2)
+            self.assertEqual(User.select().count(), 2)
+
+            result = self.RUNNER.invoke(users, ['delete', 'Lisa', '--file', '-', '--yes'],
+                                        input='username\nJonas\nAnna\n')
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('Deleted 2 users', result.output)
+            self.assertIn('Lisa', result.output)
+
+            self.assertEqual(User.select().count(), 0)
+            self.assertEqual(Pack.select().count(), 0)
+            self.assertEqual(Reward.select().count(), 0)
+
+    def test_delete_needs_confirmation(self):
+        with MockConfigContext(self):
+            User.create(name='Jonas', password='secret', gold=0, dust=0)
+
+            result = self.RUNNER.invoke(users, ['delete', 'Jonas'], input='n\n')
+            self.assertEqual(result.exit_code, 1)
+            self.assertEqual(User.select().count(), 1)
+
+            result = self.RUNNER.invoke(users, ['delete', 'Jonas'], input='y\n')
+            self.assertEqual(result.exit_code, 0)
+            self.assertEqual(User.select().count(), 0)
+
+    def test_delete_needs_usernames(self):
+        with MockConfigContext(self):
+            result = self.RUNNER.invoke(users, ['delete'])
+            self.assertNotEqual(result.exit_code, 0)
@@ -0,0 +1,75 @@
+# third party
+import numpy as np
+
+# local
+from rewardifycli.__internal.tests import RewardifycliTestCase
+from rewardifycli.__internal.tests import MockConfigContext
+
+from rewardifycli.packs import packs
+
+from rewardifycli.simulation import PackModel, simulate_packs, simulate_set_completion, simulate
+
+
+SIMULATION_REWARDS = {
+    'Golden Apple':     {'cost': 400, 'recycle': 100, 'description': '', 'rarity': 'legendary'},
+    'Silver Apple':     {'cost': 200, 'recycle': 50, 'description': '', 'rarity': 'rare'},
+    'Apple Pie':        {'cost': 50, 'recycle': 10, 'description': '', 'rarity': 'common'},
+    'Bread':            {'cost': 10, 'recycle': 2, 'description': '', 'rarity': 'common'},
+}
+
+SLOT_PROBABILITIES = [[0.9, 0, 0.1, 0]] * 4 + [[0, 0, 0.5, 0.5]]
+
+
+class TestSimulation(RewardifycliTestCase):
+
+    def test_pack_statistics(self):
+        model = PackModel(SLOT_PROBABILITIES, SIMULATION_REWARDS)
+        statistics = simulate_packs(model, 200000, np.random.default_rng(1))
+        rarities = {item['rarity']: item for item in statistics['rarities']}
+
+        self.assertAlmostEqual(rarities['common']['per_pack'], 3.6, delta=0.02)
+        self.assertAlmostEqual(rarities['rare']['per_pack'], 0.9, delta=0.02)
+        self.assertAlmostEqual(rarities['legendary']['at_least_one'], 0.5, delta=0.01)
+        self.assertEqual(rarities['uncommon']['per_pack'], 0)
+
+        # Every common slot is worth 6 dust on average, every rare 50 and every legendary 100
+        self.assertAlmostEqual(statistics['dust']['mean'], 3.6 * 6 + 0.9 * 50 + 0.5 * 100, delta=1.0)
+        percentiles = [item['value'] for item in statistics['dust']['percentiles']]
+        self.assertEqual(percentiles, sorted(percentiles))
+
+    def test_set_completion(self):
+        # With a single reward in every slot, the set is always complete with the first pack
+        model = PackModel([[1, 0, 0, 0]] * 5, {'Bread': SIMULATION_REWARDS['Bread']})
+        completion = simulate_set_completion(model, 10, np.random.default_rng(1))
+        self.assertEqual(completion['completed'], 10)
+        self.assertEqual(completion['mean'], 1)
+
+        # The collectors stop after the maximum amount of packs
+        model = PackModel(SLOT_PROBABILITIES, SIMULATION_REWARDS)
+        completion = simulate_set_completion(model, 10, np.random.default_rng(1), max_packs=1)
+        self.assertEqual(completion['size'], 4)
+        self.assertLess(completion['completed'], 10)
+        self.assertIsNone(completion['mean'])
+
+    def test_simulate_command(self):
+        pack = {'name': 'Apple Pack', 'cost': 100, 'description': ''}
+        pack.update({'slot{}'.format(index): SLOT_PROBABILITIES[index - 1] for index in range(1, 6)})
+        rewards = [{'name': name, **parameters} for name, parameters in SIMULATION_REWARDS.items()]
+
+        with MockConfigContext(self, packs=[pack], rewards=rewards):
+            # The same seed results in exactly the same simulation
+            self.assertEqual(simulate('Apple Pack', 1000, 10, seed=7), simulate('Apple Pack', 1000, 10, seed=7))
+
+            result = self.RUNNER.invoke(packs, ['simulate', '--n', '1000', '--seed', '7', '--sets', '10', 'Apple Pack'])
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertIn('Simulated 1000 packs of the type Apple Pack', result.output)
+            self.assertIn('seed: 7', result.output)
+            # The config of the tests always contains the common reward "Nothing" as well
+            self.assertIn('SET COMPLETION (5 rewards, 10 collectors)', result.output)
+
+            # A pack needs rewards for all of its rarities
+            pack.update({'slot1': [0, 1, 0, 0]})
+            with MockConfigContext(self, packs=[pack], rewards=rewards):
+                result = self.RUNNER.invoke(packs, ['simulate', 'Apple Pack'])
+                self.assertNotEqual(result.exit_code, 0)
+                self.assertIn('uncommon', result.output)
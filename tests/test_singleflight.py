@@ -0,0 +1,105 @@
+# standard library
+import threading
+
+from unittest import mock
+
+# local
+from rewardifycli.__internal.tests import RewardifycliTestCase
+from rewardifycli.__internal.tests import MockConfigContext, StandardUserContext
+
+from rewardifycli.login import login
+
+from rewardifycli.update import update
+
+from rewardifycli.concurrency import file_lock
+
+from rewardifycli import singleflight
+
+
+def result(username: str):
+    return {'username': username, 'status': 'updated', 'actions': 1, 'gold': 10, 'dust': 0, 'error': None}
+
+
+class TestSingleFlight(RewardifycliTestCase):
+
+    def test_stamp_and_max_age(self):
+        with MockConfigContext(self):
+            self.assertIsNone(singleflight.get_age())
+
+            results, performed = singleflight.single_flight(lambda: [result('Jonas')])
+            self.assertTrue(performed)
+            self.assertLess(singleflight.get_age(), 5)
+
+            # The last update is still fresh enough, so the function is not executed
+            run = mock.Mock(return_value=[])
+            results, performed = singleflight.single_flight(run, max_age=60)
+            self.assertFalse(performed)
+            self.assertEqual(results, [result('Jonas')])
+            run.assert_not_called()
+
+            # Without a max age, the update is always executed
+            results, performed = singleflight.single_flight(run)
+            self.assertTrue(performed)
+            run.assert_called_once()
+
+    def test_concurrent_updates_coalesce(self):
+        with MockConfigContext(self):
+            started = threading.Event()
+            release = threading.Event()
+
+            def slow_run():
+                started.set()
+                release.wait(timeout=10)
+                return [result('Jonas')]
+
+            thread = threading.Thread(target=singleflight.single_flight, args=(slow_run, ))
+            thread.start()
+            started.wait(timeout=10)
+
+            # The second update starts while the first one is still running. It waits for it and then reports its
+            # results without running on its own.
+            threading.Timer(0.2, release.set).start()
+            run = mock.Mock(return_value=[])
+            results, performed = singleflight.single_flight(run)
+            thread.join()
+
+            self.assertFalse(performed)
+            self.assertEqual(results, [result('Jonas')])
+            run.assert_not_called()
+
+    def test_refresh_in_background(self):
+        with MockConfigContext(self), mock.patch('rewardifycli.singleflight.subprocess.Popen') as popen:
+            # There has not been any update yet
+            self.assertTrue(singleflight.refresh_in_background(60, 'token'))
+            command = popen.call_args[0][0]
+            self.assertEqual(command[-3:], ['update', '--max-age', '60'])
+            self.assertTrue(popen.call_args[1]['start_new_session'])
+
+            # The session token must not be visible within the arguments of the process
+            self.assertNotIn('token', command)
+            self.assertEqual(popen.call_args[1]['env']['REWARDIFY_SESSION'], 'token')
+
+            # A fresh update does not need to be refreshed
+            popen.reset_mock()
+            singleflight.single_flight(lambda: [])
+            self.assertFalse(singleflight.refresh_in_background(60))
+            popen.assert_not_called()
+
+            # An update, which is running right now, is not started a second time
+            with file_lock(singleflight.get_path(singleflight.LOCK_FILE_NAME)):
+                self.assertFalse(singleflight.refresh_in_background(0))
+            popen.assert_not_called()
+
+    def test_update_command_with_max_age(self):
+        with MockConfigContext(self), StandardUserContext() as user_context:
+            self.RUNNER.invoke(login, [user_context.username, user_context.password])
+            self.RUNNER.invoke(update, [])
+
+            result = self.RUNNER.invoke(update, ['--max-age', '3600'])
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('The last backend update finished', result.output)
+            self.assertIn('+100 gold', result.output)
+
+            # The mock backend grants gold with every single update, so the second one was really skipped
+            user_context.update()
+            self.assertEqual(user_context.user.gold, 100)
@@ -0,0 +1,43 @@
+# standard library
+import json
+import unittest
+
+# local
+from benchmarks.startup import DEFAULT_BUDGET_PATH, parse_import_times, get_heavy_modules, get_command_names
+from benchmarks.startup import check_command, format_report, MAIN_NAME
+
+
+IMPORT_TIMES = '\n'.join([
+    'import time: self [us] | cumulative | imported package',
+    'import time:       100 |        100 |     peewee',
+    'import time:        50 |        150 |   rewardify.models',
+    'import time:        20 |        170 | rewardify.env',
+    'import time:        30 |         30 | click'
+])
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_parse_import_times(self):
+        entries = {entry['name']: entry for entry in parse_import_times(IMPORT_TIMES)}
+
+        self.assertEqual(set(entries.keys()), {'peewee', 'rewardify.models', 'rewardify.env', 'click'})
+        self.assertEqual(entries['peewee']['self'], 100)
+        self.assertEqual(entries['rewardify.env']['cumulative'], 170)
+        self.assertEqual(entries['peewee']['chain'], ['rewardify.env', 'rewardify.models', 'peewee'])
+        self.assertEqual(entries['click']['chain'], ['click'])
+        self.assertEqual(get_heavy_modules(entries.values()), ['peewee'])
+
+    def test_heavy_modules_within_budget(self):
+        # Every command is run in a new python process, because the modules are already imported within this one.
+        # The import times depend too much on the machine, so they are only checked by "make startup".
+        with open(DEFAULT_BUDGET_PATH, mode='r') as file:
+            budget = json.load(file)
+
+        results = [check_command(name, None, repeat=1, top=5) for name in get_command_names()]
+        for result in results:
+            name = '' if result['name'] == MAIN_NAME else result['name']
+            self.assertIn(name, budget['commands'], format_report(results))
+            # The set of the eagerly imported heavy modules may not grow beyond the one of the budget
+            heavy_modules = set(budget['commands'][name]['heavy_modules'])
+            self.assertLessEqual(set(result['heavy']), heavy_modules, format_report(results))
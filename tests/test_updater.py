@@ -0,0 +1,131 @@
+# standard library
+import sys
+import time
+import subprocess
+
+from typing import Dict, List
+
+# third party
+from rewardify.backends import AbstractBackend
+
+from rewardify.models import User
+
+# local
+from rewardifycli.__internal.tests import RewardifycliTestCase
+from rewardifycli.__internal.tests import MockConfigContext, StandardUserContext
+
+from rewardifycli.models import UpdateCheckpoint
+
+from rewardifycli.login import login
+
+from rewardifycli.update import update
+
+from rewardifycli.updater import Updater, summarize
+
+
+class IncrementalBackend(AbstractBackend):
+    """
+    A backend implementing the incremental interface. The cursor is simply the number of actions of the user, which
+    have already been returned.
+    """
+    def __init__(self, activities: Dict[str, List[Dict]], delays: Dict[str, float] = None, failing: List[str] = None):
+        self.activities = activities
+        self.delays = delays or {}
+        self.failing = failing or []
+        self.calls = []
+
+    def get_user_update(self, username: str, cursor, timeout: float):
+        self.calls.append((username, cursor))
+        time.sleep(self.delays.get(username, 0))
+        if username in self.failing:
+            raise ConnectionError('backend not reachable')
+
+        actions = self.activities.get(username, [])
+        return actions[cursor or 0:], len(actions)
+
+
+def action(gold: int, dust: int = 0) -> Dict:
+    return {'name': 'Test', 'description': 'for testing', 'gold': gold, 'dust': dust}
+
+
+class TestUpdater(RewardifycliTestCase):
+
+    def test_incremental_update_uses_checkpoints(self):
+        with MockConfigContext(self), StandardUserContext() as user_context:
+            User.create(name='Anna', password='secret', gold=0, dust=0)
+            backend = IncrementalBackend({
+                'Jonas':    [action(10), action(20, dust=5)],
+                'Anna':     [action(1)]
+            })
+
+            results = Updater(backend, workers=2).run()
+            self.assertEqual([result['status'] for result in results], ['updated', 'updated'])
+            self.assertEqual(summarize(results)['gold'], 31)
+            self.assertEqual(summarize(results)['dust'], 5)
+
+            user_context.update()
+            self.assertEqual(user_context.user.gold, 30)
+            self.assertEqual(user_context.user.dust, 5)
+
+            # The second update only asks for the actions after the checkpoints and grants only the new one
+            backend.activities['Jonas'].append(action(100))
+            backend.calls = []
+            results = Updater(backend, workers=2).run()
+
+            self.assertEqual(sorted(backend.calls), [('Anna', 1), ('Jonas', 2)])
+            self.assertEqual({result['username']: result['status'] for result in results},
+                             {'Anna': 'unchanged', 'Jonas': 'updated'})
+            user_context.update()
+            self.assertEqual(user_context.user.gold, 130)
+            self.assertEqual(UpdateCheckpoint.select().count(), 2)
+
+    def test_timeouts_and_errors_are_isolated(self):
+        with MockConfigContext(self), StandardUserContext() as user_context:
+            User.create(name='Anna', password='secret', gold=0, dust=0)
+            User.create(name='Lisa', password='secret', gold=0, dust=0)
+            backend = IncrementalBackend(
+                {'Jonas': [action(10)], 'Anna': [action(10)], 'Lisa': [action(10)]},
+                delays={'Anna': 1.0},
+                failing=['Lisa']
+            )
+
+            results = Updater(backend, workers=3, timeout=0.2).run()
+            statuses = {result['username']: result['status'] for result in results}
+            self.assertEqual(statuses, {'Jonas': 'updated', 'Anna': 'timeout', 'Lisa': 'error'})
+
+            # Neither gold nor a checkpoint was saved for the users, which failed, so the next update tries again
+            self.assertEqual(User.get(User.name == 'Anna').gold, 0)
+            self.assertEqual(User.get(User.name == 'Lisa').gold, 0)
+            self.assertEqual(UpdateCheckpoint.select().count(), 1)
+
+    def test_timed_out_queries_do_not_block_the_exit(self):
+        # The threads of the abandoned queries would only show up at the exit of the interpreter, which is why this
+        # has to be run in a separate process. The backend never answers within the lifetime of the test.
+        code = '\n'.join([
+            'import time',
+            'from rewardifycli.updater import Updater',
+            'class SlowBackend:',
+            '    def get_user_update(self, username, cursor, timeout):',
+            '        time.sleep(60)',
+            'updater = Updater(SlowBackend(), workers=2, timeout=0.2)',
+            'updater.user_ids = {"Jonas": 1, "Anna": 2, "Lisa": 3}',
+            'updater.load_cursors = lambda: {}',
+            'updater.run_incremental()',
+            'print(",".join(sorted(result["status"] for result in updater.results)))'
+        ])
+        start = time.monotonic()
+        output = subprocess.check_output([sys.executable, '-c', code], universal_newlines=True, timeout=30)
+        self.assertEqual(output.strip(), 'timeout,timeout,timeout')
+        # Two workers, whose queries time out one after another, and the start up of the interpreter
+        self.assertLess(time.monotonic() - start, 10)
+
+    def test_update_command_with_complete_backend(self):
+        with MockConfigContext(self), StandardUserContext() as user_context:
+            self.RUNNER.invoke(login, [user_context.username, user_context.password])
+            result = self.RUNNER.invoke(update, ['--workers', '2'])
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('REWARDIFY UPDATED', result.output)
+            self.assertIn('+100 gold', result.output)
+
+            user_context.update()
+            self.assertEqual(user_context.user.gold, 100)
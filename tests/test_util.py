@@ -1,7 +1,11 @@
 # standard library
 import os
+import stat
+import threading
 
 # third party
+import click
+
 from rewardify.models import User
 
 from rewardify.main import Rewardify
@@ -10,7 +14,10 @@ from rewardify.main import Rewardify
 from rewardifycli.__internal.tests import RewardifycliTestCase
 from rewardifycli.__internal.tests import MockConfigContext, StandardUserContext
 
-from rewardifycli.util import UserCredentials
+from rewardifycli.util import UserCredentials, SessionToken
+from rewardifycli.util import Templater
+
+from rewardifycli.templating import TemplateBytecodeCache
 from rewardifycli.util import login_required
 
 
@@ -53,11 +60,109 @@ class TestUserCredentials(RewardifycliTestCase):
     def test_saving_new_credentials(self):
         with MockConfigContext(self) as mock_context:
             credentials: UserCredentials = UserCredentials.instance()
-            credentials.save('Jonas', 'secret')
+            credentials.save('Jonas', 'token')
             credentials.load()
 
             self.assertTrue(credentials.exists())
             self.assertEqual(credentials['username'], 'Jonas')
-            self.assertEqual(credentials['password'], 'secret')
+            self.assertEqual(credentials['token'], 'token')
 
             self.assertFalse(credentials.is_default())
+
+    def test_use_session(self):
+        with MockConfigContext(self) as mock_context:
+            credentials: UserCredentials = UserCredentials.instance()
+            token = SessionToken.issue('Joana')
+            credentials.use_session(token)
+
+            self.assertEqual(credentials['username'], 'Joana')
+            self.assertEqual(credentials['token'], token)
+
+            # The override must not touch the credentials file
+            credentials.load()
+            self.assertTrue(credentials.is_default())
+
+
+class TestSessionToken(RewardifycliTestCase):
+
+    def test_valid_token(self):
+        with MockConfigContext(self) as mock_context:
+            token = SessionToken.issue('Jonas', 60)
+            self.assertEqual(SessionToken.validate(token), 'Jonas')
+
+            # The secret must only be readable by the owner
+            secret_path = os.path.join(self.FOLDER_PATH, SessionToken.SECRET_FILE_NAME)
+            self.assertEqual(stat.S_IMODE(os.stat(secret_path).st_mode), 0o600)
+
+    def test_secret_created_concurrently(self):
+        with MockConfigContext(self) as mock_context:
+            secrets = []
+            threads = [threading.Thread(target=lambda: secrets.append(SessionToken.get_secret())) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            # All of them have to agree on the single secret, which has been linked into place first
+            self.assertEqual(len(secrets), 8)
+            self.assertEqual(len(set(secrets)), 1)
+            self.assertEqual([name for name in os.listdir(self.FOLDER_PATH) if name.endswith('.tmp')], [])
+
+    def test_empty_secret(self):
+        with MockConfigContext(self) as mock_context:
+            with open(os.path.join(self.FOLDER_PATH, SessionToken.SECRET_FILE_NAME), mode='w'):
+                pass
+
+            with self.assertRaises(click.ClickException):
+                SessionToken.issue('Jonas', 60)
+
+    def test_expired_token(self):
+        with MockConfigContext(self) as mock_context:
+            token = SessionToken.issue('Jonas', -1)
+            with self.assertRaises(ValueError):
+                SessionToken.validate(token)
+
+    def test_tampered_token(self):
+        with MockConfigContext(self) as mock_context:
+            token = SessionToken.issue('Jonas', 60)
+            _, signature = token.split('.')
+            forged_token = '{}.{}'.format(SessionToken.issue('Joana', 60).split('.')[0], signature)
+
+            with self.assertRaises(ValueError):
+                SessionToken.validate(forged_token)
+
+            with self.assertRaises(ValueError):
+                SessionToken.validate('garbage')
+
+
+class TestTemplater(RewardifycliTestCase):
+
+    def test_compile_fills_bytecode_cache(self):
+        with MockConfigContext(self) as mock_context:
+            templater: Templater = Templater.instance()
+            template_count = templater.compile()
+
+            cache_path = os.path.join(self.FOLDER_PATH, TemplateBytecodeCache.FOLDER_NAME)
+            self.assertTrue(os.path.isdir(cache_path))
+            self.assertEqual(len(os.listdir(cache_path)), template_count)
+
+            # Rendering the templates has to work with the cached bytecode just the same
+            content = templater.use_template('no_user.jinja2', {})
+            self.assertIn('NO USER IS LOGGED IN', content)
+
+    def test_cache_without_config_folder(self):
+        templater: Templater = Templater.instance()
+        folder_path = os.path.join(self.FOLDER_PATH, 'not_existing')
+
+        # Without a config folder, the templates are simply not cached instead of raising an error
+        templater.compile(folder_path)
+        self.assertFalse(os.path.exists(folder_path))
+
+    def test_serialize_models(self):
+        with StandardUserContext() as user_context:
+            templater: Templater = Templater.instance()
+            data = templater.serialize(user_context.user)
+
+            # The password hash of the user must never be part of the JSON output
+            self.assertEqual(data['name'], user_context.username)
+            self.assertNotIn('password', data)